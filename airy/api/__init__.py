@@ -1,20 +1,62 @@
+import hmac
+
 from starlette.applications import Starlette
 from starlette.requests import Request
-from starlette.responses import PlainTextResponse
+from starlette.responses import JSONResponse, PlainTextResponse
 
 from starlette.routing import Route
 
 
 from airy.api.middleware import middlewares
+from airy.etc.settings import api_settings
+
+# Clients allowed to read the statistics when no token is configured
+_LOCAL_HOSTS = frozenset(("127.0.0.1", "::1", "localhost"))
 
 
-async def health(_: Request) -> PlainTextResponse:
-    """For the health endpoint, reply with a simple plain text message."""
+async def health(request: Request) -> PlainTextResponse | JSONResponse:
+    """For the health endpoint, reply with a simple plain text message, or a 503 while the database is down."""
+    bot = getattr(request.app.state, "bot", None)
+    if bot is not None and not await bot.db.check_health():
+        return JSONResponse({"detail": "The database is unavailable.", "database": bot.db.health()}, status_code=503)
+
     return PlainTextResponse(content="The bot is still running fine :)")
 
+
+def _is_authorized(request: Request) -> bool:
+    """Whether the request carries the statistics token, or comes from this host if none is configured."""
+    if not api_settings.stats_token:
+        return request.client is not None and request.client.host in _LOCAL_HOSTS
+
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(token.encode(), api_settings.stats_token.encode())
+
+
+async def db_stats(request: Request) -> JSONResponse:
+    """Reply with the statistics of the busiest database queries, `?sort=` and `?limit=` are optional.
+
+    Queries reveal the schema, so they are only served with the token from `ApiSettings`.
+    """
+    if not _is_authorized(request):
+        return JSONResponse({"detail": "Not authorized."}, status_code=401, headers={"WWW-Authenticate": "Bearer"})
+
+    bot = getattr(request.app.state, "bot", None)
+    if bot is None:
+        return JSONResponse({"detail": "The bot is not running."}, status_code=503)
+
+    stats = bot.db.stats
+    sort = request.query_params.get("sort", "total")
+    if sort not in ("total", "calls", "p99", "rows", "acquire_p99"):
+        return JSONResponse({"detail": f"Cannot sort by {sort!r}."}, status_code=400)
+
+    limit = int(request.query_params["limit"]) if request.query_params.get("limit", "").isdigit() else 25
+    return JSONResponse({"pool_acquire": stats.pool_acquire.summary(), "queries": stats.top(limit, key=sort)})
+
+
 starlette_app = Starlette(
     routes=[
         Route("/healthcheck", health, methods=["GET"]),
+        Route("/stats/db", db_stats, methods=["GET"]),
     ],
     middleware=middlewares
 )
@@ -0,0 +1,85 @@
+"""
+Tuning options, read from environment variables and the `.env` file, see `.env.example`.
+
+Every option has a default, so none of them has to be set. Credentials and the rest of the bot
+configuration live in the `config` module.
+"""
+
+from __future__ import annotations
+
+from pydantic import BaseSettings
+
+__all__ = ("ApiSettings",
+           "DatabaseSettings",
+           "SchedulerSettings",
+           "api_settings",
+           "database_settings",
+           "scheduler_settings")
+
+
+class DatabaseSettings(BaseSettings):
+    """Pool, statistics and resilience options of `Database`, prefixed with `POSTGRES_`."""
+
+    slow_query_threshold: float = 0.5
+    """Statements taking longer than this amount of seconds are logged."""
+    pool_min_size: int = 10
+    pool_max_size: int = 10
+    pool_max_inactive_lifetime: float = 300.0
+    """Seconds after which idle connections above `pool_min_size` are closed."""
+    statement_cache_size: int = 100
+    """The amount of prepared statements kept per connection, queries are prepared on their first use."""
+    command_timeout: float | None = None
+    """The default timeout of statements in seconds, None waits forever."""
+    retry_attempts: int = 3
+    """The maximum amount of attempts of a statement failing with transient errors, including the first one."""
+    breaker_threshold: int = 5
+    """The amount of consecutive transient failures that open the circuit breaker."""
+    breaker_reset_timeout: float = 10.0
+    """The amount of seconds the circuit breaker stays open before a trial statement is let through."""
+
+    class Config:
+        env_prefix = "POSTGRES_"
+        env_file = ".env"
+
+
+class SchedulerSettings(BaseSettings):
+    """Options of the timer scheduler, prefixed with `SCHEDULER_`."""
+
+    lease: bool = False
+    """Lease timers to the process running their guild's shard, for running several processes on one database."""
+    lease_owner: str | None = None
+    """The name this process leases timers under, defaults to `<hostname>:<pid>`. Must be unique among processes."""
+    lease_ttl: float = 300.0
+    """Seconds after which the timers of a process that stopped renewing its leases are picked up by others."""
+    notify: bool = False
+    """Have the database announce timer changes with NOTIFY instead of reloading timers every hour."""
+    dispatch_concurrency: int = 8
+    """The amount of timer events handled at the same time."""
+    dispatch_rate: float = 25.0
+    """The maximum amount of timer events dispatched per second."""
+    dispatch_guild_rate: float = 1.0
+    """The maximum amount of timer events dispatched per second for a single guild."""
+    dispatch_guild_burst: int = 5
+    """The amount of timer events a single guild may dispatch at once before being limited."""
+    dispatch_max_pending: int = 1000
+    """The maximum amount of due timer events waiting to be dispatched."""
+
+    class Config:
+        env_prefix = "SCHEDULER_"
+        env_file = ".env"
+
+
+class ApiSettings(BaseSettings):
+    """Options of the web API, prefixed with `API_`."""
+
+    stats_token: str | None = None
+    """The bearer token `/stats/db` requires. Without one, the statistics are only served to local clients."""
+
+    class Config:
+        env_prefix = "API_"
+        env_file = ".env"
+
+
+database_settings = DatabaseSettings()
+scheduler_settings = SchedulerSettings()
+api_settings = ApiSettings()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import ast
+import json
 import shlex
 import subprocess
 import textwrap
@@ -15,6 +16,8 @@ from miru.ext import nav
 from airy.models.context import AiryPrefixContext
 from airy.models.views import AuthorOnlyNavigator, AuthorOnlyView
 from airy.models.db import DatabaseBlacklist
+from airy.services.scheduler import SchedulerService
+from airy.utils import cache
 from airy.utils.embed import RespondEmbed
 
 dev = lightbulb.Plugin("Development")
@@ -275,6 +278,56 @@ async def run_sql(ctx: AiryPrefixContext) -> None:
     await send_paginated(ctx, ctx.channel_id, str(return_value), prefix="```sql\n", suffix="```")
 
 
+@dev.command
+@lightbulb.option("reset", "If True, resets the collected metrics after showing them.", type=bool, required=False)
+@lightbulb.command("timers", "Show scheduler metrics.", pass_options=True)
+@lightbulb.implements(lightbulb.PrefixCommand)
+async def timer_stats_cmd(ctx: AiryPrefixContext, reset: bool | None = None) -> None:
+    stats = SchedulerService.stats()
+    if reset:
+        SchedulerService.metrics.reset()
+
+    await send_paginated(ctx, ctx.channel_id, json.dumps(stats, indent=2), prefix="```json\n", suffix="```")
+
+
+@dev.command
+@lightbulb.option("reset", "If True, resets the collected statistics after showing them.", type=bool, required=False)
+@lightbulb.option("sort", "The column to sort by: total, calls, p99, rows or acquire_p99.", type=str, required=False)
+@lightbulb.command("dbstats", "Show the busiest database queries.", pass_options=True)
+@lightbulb.implements(lightbulb.PrefixCommand)
+async def db_stats_cmd(ctx: AiryPrefixContext, sort: str | None = None, reset: bool | None = None) -> None:
+    stats = ctx.bot.db.stats
+    sort = sort or "total"
+    if sort not in ("total", "calls", "p99", "rows", "acquire_p99"):
+        await ctx.event.message.add_reaction("❌")
+        await ctx.respond(f"❌ Cannot sort by `{sort}`")
+        return
+
+    lines = [f"pool acquire p99: {stats.pool_acquire.quantile(0.99) * 1000:.2f}ms, {len(stats)} statements", ""]
+    for entry in stats.top(15, key=sort):
+        lines.append(
+            f"{entry['calls']:>7} calls {entry['total']:>8.2f}s total  p50 {entry['p50'] * 1000:.1f}ms  "
+            f"p95 {entry['p95'] * 1000:.1f}ms  p99 {entry['p99'] * 1000:.1f}ms  rows {entry['rows']}  "
+            f"wait p99 {entry['acquire_p99'] * 1000:.1f}ms\n{entry['query']}\n"
+        )
+    if reset:
+        stats.reset()
+
+    await send_paginated(ctx, ctx.channel_id, "\n".join(lines), prefix="```sql\n", suffix="```")
+
+
+@dev.command
+@lightbulb.option("reset", "If True, resets the collected counters after showing them.", type=bool, required=False)
+@lightbulb.command("caches", "Show cache hit rates.", pass_options=True)
+@lightbulb.implements(lightbulb.PrefixCommand)
+async def cache_stats_cmd(ctx: AiryPrefixContext, reset: bool | None = None) -> None:
+    stats = cache.stats()
+    if reset:
+        cache.reset_stats()
+
+    await send_paginated(ctx, ctx.channel_id, json.dumps(stats, indent=2), prefix="```json\n", suffix="```")
+
+
 @dev.command
 @lightbulb.command("shutdown", "Shut down the bot.")
 @lightbulb.implements(lightbulb.PrefixCommand)
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import json
 import typing
 
 from datetime import timedelta
@@ -13,12 +12,14 @@ from loguru import logger
 
 from airy.models.context import AirySlashContext
 from airy.models.plugin import AiryPlugin
-from airy.models.views import AuthorOnlyNavigator
 from airy.models.bot import Airy
 from airy.services.scheduler import SchedulerService, TimerEnum, DatabaseTimer
 from airy.etc import ColorEnum
 from airy.services.scheduler.events import ReminderEvent
-from airy.utils import RespondEmbed, formats, utcnow
+from airy.services.scheduler.recurrence import Recurrence
+from airy.utils import AiryPages, RespondEmbed, formats, utcnow
+
+from .menu import ReminderPageSource
 
 
 class ReminderPlugin(AiryPlugin):
@@ -31,6 +32,12 @@ class ReminderPlugin(AiryPlugin):
 reminders = ReminderPlugin()
 reminders.add_checks(lightbulb.guild_only)
 
+REPEAT_INTERVALS = {
+    "Hourly": timedelta(hours=1),
+    "Daily": timedelta(days=1),
+    "Weekly": timedelta(weeks=1),
+}
+
 
 class SnoozeSelect(miru.TextSelect):
     def __init__(self) -> None:
@@ -224,13 +231,16 @@ async def reminder(_: AirySlashContext) -> None:
 
 
 @reminder.child()
+@lightbulb.option("repeat", "Repeat this reminder after it expires.", choices=list(REPEAT_INTERVALS), required=False)
 @lightbulb.option("message", "The message that should be sent to you when this reminder expires.")
 @lightbulb.option(
     "when", "When this reminder should expire. Examples: 'in 10 minutes', 'tomorrow at 20:00', '2022-04-01'"
 )
 @lightbulb.command("create", "Create a new reminder.", pass_options=True)
 @lightbulb.implements(lightbulb.SlashSubCommand)
-async def reminder_create(ctx: AirySlashContext, when: str, message: typing.Optional[str] = None) -> None:
+async def reminder_create(
+        ctx: AirySlashContext, when: str, message: typing.Optional[str] = None, repeat: typing.Optional[str] = None
+) -> None:
     assert ctx.guild_id is not None
 
     if message and len(message) >= 1000:
@@ -285,12 +295,14 @@ async def reminder_create(ctx: AirySlashContext, when: str, message: typing.Opti
         user=ctx.author,
         channel=ctx.channel_id,
         extra=reminder_data,
+        recurrence=Recurrence.every(REPEAT_INTERVALS[repeat]) if repeat else None,
     )
 
     proxy = await ctx.respond(
         embed=RespondEmbed.success(
             title="Reminder set",
             description=f"Reminder set for: {formats.format_dt(time)} ({formats.format_dt(time, style='R')})"
+                        f"{f', repeating {repeat.lower()}' if repeat else ''}"
                         f"\n\n**Message:**\n{message}",
         ).set_footer(f"Reminder ID: {timer.id}"),
         components=miru.View().add_item(miru.Button(label="Remind me too!", emoji="✉️", custom_id=f"RMAR:{timer.id}")),
@@ -332,14 +344,12 @@ async def reminder_del(ctx: AirySlashContext, id: int) -> None:
 @lightbulb.command("list", "List your currently pending reminders.")
 @lightbulb.implements(lightbulb.SlashSubCommand)
 async def reminder_list(ctx: AirySlashContext) -> None:
-    records = await ctx.app.db.fetch(
-        """SELECT * FROM timer WHERE guild_id = $1 AND user_id = $2 AND event = $3 ORDER BY expires""",
-        ctx.guild_id,
-        ctx.author.id,
-        TimerEnum.REMINDER
-    )
+    assert ctx.guild_id is not None
+
+    source = ReminderPageSource(ctx.app.db, ctx.guild_id, ctx.author.id)
+    await source.prepare_once()
 
-    if not records:
+    if not source.count:
         await ctx.respond(
             embed=hikari.Embed(
                 title="✉️ No pending reminders!",
@@ -349,27 +359,8 @@ async def reminder_list(ctx: AirySlashContext) -> None:
         )
         return
 
-    reminders = []
-
-    for record in records:
-        time = record.get("expires")
-        notes = json.loads(record["extra"])["message"].replace("\n", " ")
-        if len(notes) > 50:
-            notes = notes[:47] + "..."
-
-        reminders.append(
-            f"**ID: {record.get('id')}** - {formats.format_dt(time)} ({formats.format_dt(time, style='R')})\n{notes}\n"
-        )
-
-    reminders = [reminders[i * 10: (i + 1) * 10] for i in range((len(reminders) + 10 - 1) // 10)]
-
-    pages = [
-        hikari.Embed(title="✉️ Your reminders:", description="\n".join(content), color=ColorEnum.EMBED_BLUE)
-        for content in reminders
-    ]
-    # TODO: wtf
-    navigator = AuthorOnlyNavigator(ctx, pages=pages, timeout=600)
-    await navigator.send(ctx.interaction)
+    pages = AiryPages(source=source, ctx=ctx)
+    await pages.send(ctx.interaction)
 
 
 @reminders.listener(ReminderEvent, bind=True)
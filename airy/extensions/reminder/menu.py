@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import datetime
+import typing
+
+import hikari
+
+from airy.etc import ColorEnum
+from airy.services.scheduler import TimerEnum
+from airy.utils import formats
+from airy.utils.paginator import menus
+
+if typing.TYPE_CHECKING:
+    from airy.models.db.impl import Database
+
+# The message is truncated in SQL, the rest of `extra` is never sent over the wire
+_count_reminders_sql = """SELECT count(*) FROM timer WHERE guild_id = $1 AND user_id = $2 AND event = $3"""
+_fetch_first_reminders_sql = """SELECT id, expires,
+                                       left(replace(coalesce(extra->>'message', ''), E'\\n', ' '), 51) AS message
+                                FROM timer
+                                WHERE guild_id = $1 AND user_id = $2 AND event = $3
+                                ORDER BY expires, id
+                                LIMIT $4"""
+# Continues after the (expires, id) of the last reminder of the previous page
+_fetch_next_reminders_sql = """SELECT id, expires,
+                                      left(replace(coalesce(extra->>'message', ''), E'\\n', ' '), 51) AS message
+                               FROM timer
+                               WHERE guild_id = $1 AND user_id = $2 AND event = $3 AND (expires, id) > ($4, $5)
+                               ORDER BY expires, id
+                               LIMIT $6"""
+
+
+class ReminderPageSource(menus.PageSource):
+    """
+    A page source over the pending reminders of a member.
+
+    Pages are fetched with keyset pagination on `(expires, id)` when they are navigated to,
+    the position after every visited page is remembered so moving forward never rescans earlier rows.
+    """
+
+    def __init__(self, db: Database, guild_id: hikari.Snowflake, user_id: hikari.Snowflake, *, per_page: int = 10):
+        self.db: Database = db
+        self.guild_id: hikari.Snowflake = guild_id
+        self.user_id: hikari.Snowflake = user_id
+        self.per_page: int = per_page
+        self.count: int = 0
+        # Page number -> (expires, id) of the last reminder before that page
+        self._cursors: dict[int, tuple[datetime.datetime, int] | None] = {0: None}
+
+    async def prepare(self) -> None:
+        self.count = await self.db.fetchval(_count_reminders_sql, self.guild_id, self.user_id, TimerEnum.REMINDER)
+
+    def is_paginating(self) -> bool:
+        return self.count > self.per_page
+
+    def get_max_pages(self) -> int:
+        return max(1, -(-self.count // self.per_page))
+
+    async def get_page(self, page_number: int) -> list[typing.Any]:
+        # Walk forward from the closest page we know the position of, pages are never skipped with an offset
+        start = max(page for page in self._cursors if page <= page_number)
+        records: list[typing.Any] = []
+
+        for page in range(start, page_number + 1):
+            records = await self._fetch_after(self._cursors[page])
+            if len(records) < self.per_page:
+                break  # The last page, reminders may have expired since counting them
+            self._cursors[page + 1] = (records[-1]["expires"], records[-1]["id"])
+
+        return records
+
+    async def _fetch_after(self, cursor: tuple[datetime.datetime, int] | None) -> list[typing.Any]:
+        if cursor is None:
+            return await self.db.fetch(
+                _fetch_first_reminders_sql, self.guild_id, self.user_id, TimerEnum.REMINDER, self.per_page
+            )
+
+        return await self.db.fetch(
+            _fetch_next_reminders_sql, self.guild_id, self.user_id, TimerEnum.REMINDER, *cursor, self.per_page
+        )
+
+    async def format_page(self, menu, records: list[typing.Any]) -> hikari.Embed:
+        reminders = []
+
+        for record in records:
+            time = record["expires"]
+            notes = record["message"]
+            if len(notes) > 50:
+                notes = notes[:47] + "..."
+
+            reminders.append(
+                f"**ID: {record['id']}** - {formats.format_dt(time)} ({formats.format_dt(time, style='R')})\n{notes}\n"
+            )
+
+        embed = hikari.Embed(title="✉️ Your reminders:", description="\n".join(reminders), color=ColorEnum.EMBED_BLUE)
+        if self.is_paginating():
+            embed.set_footer(f"Page {menu.current_page + 1}/{self.get_max_pages()} ({self.count} reminders)")
+        return embed
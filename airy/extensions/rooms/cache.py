@@ -50,9 +50,3 @@ class Cache:
         self._cache[channel_id].pop(category.id)
         if len(self._cache[channel_id]) == 0:
             self.remove_creator(channel_id)
-
-    async def load_from_redis(self):
-        pass
-
-    async def upload_to_redis(self):
-        pass
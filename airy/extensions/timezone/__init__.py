@@ -11,6 +11,7 @@ from fuzzywuzzy import process
 
 from airy.models.context import AirySlashContext
 from airy.models.db import DatabaseUser
+from airy.services.scheduler import SchedulerService
 
 from airy.etc import ColorEnum
 from airy.utils import SimplePages, RespondEmbed, format_dt
@@ -78,6 +79,7 @@ async def tz_set_cmd(ctx: AirySlashContext):
         else:
             return await ctx.edit_last_response(RespondEmbed.error("Timeout..."), components=[])
     await DatabaseUser(id=ctx.author.id, tz=tz_).update()
+    SchedulerService.parser.invalidate_timezone(ctx.author.id)
     await ctx.edit_last_response(RespondEmbed.success("Timezone setup successfully."), components=[])
 
 
@@ -302,6 +302,7 @@ class Airy(lightbulb.BotApp, ABC):
         # loop.create_task(self.http_server.start())
         await self.db.connect()
         await Tortoise.init(config.tortoise_config)
+        self.db.bind_tortoise()
         self.load_services_from("./airy/services")
         self.load_extensions_from("./airy/extensions")
 
@@ -332,14 +333,15 @@ class Airy(lightbulb.BotApp, ABC):
     async def on_lightbulb_started(self, _: lightbulb.LightbulbStartedEvent) -> None:
 
         # Insert all guilds the bot is member of into the db global config on startup
-        async with self.db.acquire() as con:
-            await con.executemany(
-                """ INSERT INTO guild (guild_id) VALUES ($1)
-                    ON CONFLICT (guild_id) DO NOTHING""",
-                [(guild_id, ) for guild_id in self._initial_guilds],
-            )
-            logger.info(f"Connected to {len(self._initial_guilds)} guilds.")
-            self._initial_guilds = []
+        added = await self.db.insert_many(
+            "guild",
+            ("guild_id",),
+            ("bigint",),
+            [(guild_id,) for guild_id in self._initial_guilds],
+            conflict=("guild_id",),
+        )
+        logger.info(f"Connected to {len(self._initial_guilds)} guilds, {added} of them are new.")
+        self._initial_guilds = []
 
         # Set this here so all guild_ids are in DB
         self._started.set()
@@ -6,6 +6,13 @@ import hikari
 import attr
 
 from airy.models.db.impl import DatabaseModel
+from airy.models.db.impl.cache import ModelCache, guild_tag
+from airy.models.db.impl.statements import statement
+
+_fetch_guild = statement(
+    """select guild_id, re_assigns_roles from guild where guild_id=$1""",
+    lambda record: DatabaseGuild(guild_id=hikari.Snowflake(record[0]), re_assigns_roles=record[1]),
+)
 
 
 @attr.define()
@@ -15,6 +22,11 @@ class DatabaseGuild(DatabaseModel):
     guild_id: hikari.Snowflake
     re_assigns_roles: bool
 
+    cache: typing.ClassVar[ModelCache[hikari.Snowflake, DatabaseGuild]] = ModelCache()
+
+    def cache_keys(self) -> tuple[hikari.Snowflake]:
+        return (self.guild_id,)
+
     @classmethod
     async def create(
             cls,
@@ -26,6 +38,7 @@ class DatabaseGuild(DatabaseModel):
         await cls.db.fetch("""insert into guild (guild_id, re_assigns_roles) values ($1, $2)""",
                            guild_id,
                            re_assigns_roles)
+        cls.cache.invalidate(guild_id)
 
         return DatabaseGuild(guild_id=guild_id, re_assigns_roles=re_assigns_roles)
 
@@ -47,13 +60,8 @@ class DatabaseGuild(DatabaseModel):
             guild: hikari.SnowflakeishOr[hikari.PartialGuild],
     ) -> typing.Optional[DatabaseGuild]:
         guild_id = hikari.Snowflake(guild)
+        return await cls.cache.get(guild_id, lambda: cls._fetch(guild_id), tags=(guild_tag(guild_id),))
 
-        record = await cls.db.fetchrow("""select * from guild where guild_id=$1""",
-                                       guild_id)
-
-        if not record:
-            return None
-
-        return DatabaseGuild(guild_id=guild_id,
-                             re_assigns_roles=record.get("re_assigns_roles")
-                             )
+    @classmethod
+    async def _fetch(cls, guild_id: hikari.Snowflake) -> typing.Optional[DatabaseGuild]:
+        return await cls.db.fetch_one(_fetch_guild, guild_id)
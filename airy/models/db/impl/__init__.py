@@ -1,30 +1,85 @@
 from __future__ import annotations
 
 import abc
+import asyncio
+import contextvars
+import functools
+import inspect
+import time
 import typing as t
 from contextlib import asynccontextmanager
 
 import asyncpg  # type: ignore
 import hikari
+import orjson
 
 from loguru import logger
+from tortoise import connections
 
+from airy.etc.settings import DatabaseSettings, database_settings
+from airy.models.db.impl.cache import ModelCache, guild_tag
+from airy.models.db.impl.resilience import BreakerState, CircuitBreaker, RetryPolicy, is_transient
+from airy.models.db.impl.statements import Statement
+from airy.models.db.impl.stats import QueryStatsCollector
 from airy.models.errors import DatabaseStateConflictError
+from airy.utils import cache
 
-import config
 
 if t.TYPE_CHECKING:
     from airy.models.bot import Airy
 
+T = t.TypeVar("T")
+
+# The connection of the transaction the current task is in, see `Database.transaction`
+_transaction_connection: contextvars.ContextVar[asyncpg.Connection | None] = contextvars.ContextVar(
+    "_transaction_connection", default=None
+)
+
+# Methods whose statements are retried after transient errors, as long as they only read
+_READ_METHODS = frozenset(("fetch", "fetchrow", "fetchval"))
+
+_delete_guild_timers_sql = """DELETE FROM timer WHERE guild_id = $1"""
+_delete_guild_sql = """DELETE FROM guild WHERE guild_id = $1"""
+_insert_guild_sql = """INSERT INTO guild (guild_id) VALUES ($1)"""
+
+
+def _encode_json(value: t.Any) -> str:
+    # Values that are already serialized are passed through as they are
+    if isinstance(value, str):
+        return value
+    return orjson.dumps(value).decode()
+
+
+def share_pool_with_tortoise(pool: asyncpg.Pool | None) -> None:
+    """Make every initialized Tortoise ORM connection run on the given pool instead of opening its own.
+
+    Call this after `Tortoise.init` and before the first ORM query. Passing None detaches the pool again,
+    which has to happen before `Tortoise.close_connections` so the shared pool is not closed twice.
+    """
+    for client in connections.all():
+        # Tortoise opens its pool lazily on first use, and skips that when `_pool` is already set
+        if hasattr(client, "_pool"):
+            client._pool = pool
+
 
 class Database:
     """A database object that wraps an asyncpg pool and provides additional methods for convenience."""
 
     def __init__(self, app: Airy) -> None:
         self._app: Airy = app
-        self._config = config.database
+        self._settings: DatabaseSettings = database_settings
         self._pool: t.Optional[asyncpg.Pool] = None
         self._is_closed: bool = False
+        self._shares_pool: bool = False  # Whether Tortoise runs on the pool, see `bind_tortoise`
+        self.stats: QueryStatsCollector = QueryStatsCollector(slow_threshold=self._settings.slow_query_threshold)
+        """Per-statement call counts, latencies and pool wait times."""
+        self.retry: RetryPolicy = RetryPolicy(attempts=self._settings.retry_attempts)
+        """How statements failing with transient errors are retried."""
+        self.breaker: CircuitBreaker = CircuitBreaker(
+            failure_threshold=self._settings.breaker_threshold,
+            reset_timeout=self._settings.breaker_reset_timeout,
+        )
+        """Fails statements fast while the database is down."""
 
         DatabaseModel.db = self
         DatabaseModel.app = self.app
@@ -34,6 +89,13 @@ class Database:
         """The currently running application."""
         return self._app
 
+    @property
+    def _config(self) -> t.Any:
+        # Imported on first use, the deployment secrets are only needed to connect to Postgres
+        import config
+
+        return config.database
+
     @property
     def user(self) -> str:
         """The currently authenticated database user."""
@@ -70,8 +132,32 @@ class Database:
             raise DatabaseStateConflictError("The database is closed.")
 
         logger.info("Connecting to Database...")
-        self._pool = await asyncpg.create_pool(dsn=self.dsn)
-        logger.info("Connected to Database.")
+        self._pool = await asyncpg.create_pool(
+            dsn=self.dsn,
+            min_size=self._settings.pool_min_size,
+            max_size=self._settings.pool_max_size,
+            max_inactive_connection_lifetime=self._settings.pool_max_inactive_lifetime,
+            statement_cache_size=self._settings.statement_cache_size,
+            command_timeout=self._settings.command_timeout,
+            init=self._init_connection,
+        )
+        # The pool opens `min_size` connections right away, so none of them is set up during the first events
+        logger.info("Connected to Database ({} connections ready).", self._pool.get_size())
+
+    @staticmethod
+    async def _init_connection(con: asyncpg.Connection) -> None:
+        """Set up a new pooled connection, registering codecs."""
+        await con.set_type_codec("jsonb", schema="pg_catalog", encoder=_encode_json, decoder=orjson.loads)
+        await con.set_type_codec("json", schema="pg_catalog", encoder=_encode_json, decoder=orjson.loads)
+
+    def bind_tortoise(self) -> None:
+        """Run Tortoise ORM on this pool, so both database layers share the same connections."""
+        if not self._pool:
+            raise DatabaseStateConflictError("The database is not connected.")
+
+        share_pool_with_tortoise(self._pool)
+        self._shares_pool = True
+        logger.info("Tortoise ORM is using the shared connection pool.")
 
     async def close(self) -> None:
         """Close the connection pool."""
@@ -80,6 +166,8 @@ class Database:
         if self._is_closed:
             raise DatabaseStateConflictError("The database is closed.")
 
+        if self._shares_pool:
+            share_pool_with_tortoise(None)
         await self._pool.close()
         self._is_closed = True
         logger.info("Closed database connection.")
@@ -91,21 +179,169 @@ class Database:
         if self._is_closed:
             raise DatabaseStateConflictError("The database is closed.")
 
+        if self._shares_pool:
+            share_pool_with_tortoise(None)
         self._pool.terminate()
         self._is_closed = True
 
     @asynccontextmanager
     async def acquire(self) -> t.AsyncIterator[asyncpg.Connection]:
-        """Acquire a database connection from the connection pool."""
+        """Acquire a database connection from the connection pool.
+
+        Inside of `transaction`, this is the connection of the transaction.
+        """
         if not self._pool:
             raise DatabaseStateConflictError("The database is not connected.")
 
-        con = await self._pool.acquire()
+        con = _transaction_connection.get()
+        if con is not None:
+            yield con
+            return
+
+        self.breaker.before_call()
+        started = time.perf_counter()
+        try:
+            con = await self._pool.acquire()
+        except BaseException as error:
+            self._record_error(error)
+            raise
+        self.stats.pool_acquire.observe(time.perf_counter() - started)
         try:
             yield con
+        except BaseException as error:
+            self._record_error(error)
+            raise
+        else:
+            # Only statements that went through tell that the database is up, a pooled connection may be stale
+            self.breaker.record_success()
         finally:
             await self._pool.release(con)
 
+    @asynccontextmanager
+    async def transaction(self) -> t.AsyncIterator[asyncpg.Connection]:
+        """Run every query of the current task in one transaction, committed when the block exits without error.
+
+        All methods of the database, including `acquire`, use the connection of the transaction
+        while inside the block. Nested blocks become savepoints of the outer transaction.
+        Tasks started inside the block inherit the transaction, so do not run queries concurrently in them.
+        Loads of `AsyncCache` are the exception, they run outside of it and never see its uncommitted changes.
+
+        Example
+        -------
+        ```py
+        async with db.transaction():
+            await db.execute(...)
+            await db.execute(...)
+        ```
+        """
+        if not self._pool:
+            raise DatabaseStateConflictError("The database is not connected.")
+
+        con = _transaction_connection.get()
+        if con is not None:
+            async with con.transaction():
+                yield con
+            return
+
+        async with self.acquire() as con:
+            async with con.transaction():
+                token = _transaction_connection.set(con)
+                try:
+                    yield con
+                finally:
+                    _transaction_connection.reset(token)
+
+    @property
+    def is_healthy(self) -> bool:
+        """Whether the database is connected and not failing."""
+        return self._pool is not None and not self._is_closed and self.breaker.is_closed
+
+    async def check_health(self) -> bool:
+        """Whether the database is connected and not failing, probing it once the circuit breaker allows a trial.
+
+        Without traffic no statement would close the breaker again, and an idle bot would stay unhealthy.
+        """
+        if self.breaker.state is BreakerState.HALF_OPEN:
+            try:
+                await self.fetchval("SELECT 1", timeout=5.0)
+            except Exception as error:
+                logger.debug("Database health probe failed: {!r}", error)
+
+        return self.is_healthy
+
+    def health(self) -> dict[str, t.Any]:
+        """The state of the connection pool and the circuit breaker, as reported by the healthcheck."""
+        return {
+            "healthy": self.is_healthy,
+            "breaker": self.breaker.summary(),
+            "pool_size": self._pool.get_size() if self._pool else 0,
+            "pool_idle": self._pool.get_idle_size() if self._pool else 0,
+        }
+
+    def _record_error(self, error: BaseException) -> None:
+        """Tell the circuit breaker about a failed statement."""
+        if is_transient(error) or isinstance(error, asyncio.TimeoutError):
+            self.breaker.record_failure(error)
+        elif isinstance(error, asyncpg.PostgresError):
+            # The server answered, it is only the statement that failed
+            self.breaker.record_success()
+        else:
+            # Cancelled or timed out, says nothing about the database
+            self.breaker.release_trial()
+
+    async def _run(self, method: str, query: str, *args, **kwargs) -> t.Any:
+        """Run a query with the given connection method, recording its statistics.
+
+        Statements that could not get a connection are retried, and reads are also retried
+        when they fail with a transient error. Nothing is retried inside of a transaction.
+        """
+        if not self._pool:
+            raise DatabaseStateConflictError("The database is not connected.")
+
+        con = _transaction_connection.get()
+        in_transaction = con is not None
+        attempts = 1 if in_transaction else self.retry.attempts
+        is_read = method in _READ_METHODS and query.lstrip()[:6].lower() == "select"
+
+        for attempt in range(1, attempts + 1):
+            self.breaker.before_call()
+            started = time.perf_counter()
+            if not in_transaction:
+                try:
+                    con = await self._pool.acquire()
+                except BaseException as error:
+                    self._record_error(error)
+                    if attempt == attempts or not is_transient(error):
+                        raise
+                    logger.warning("Could not acquire a database connection, retrying: {!r}", error)
+                    await self.retry.sleep(attempt - 1)
+                    continue
+
+            acquired = time.perf_counter()
+            result = None
+            failed = True
+            try:
+                result = await getattr(con, method)(query, *args, **kwargs)
+                failed = False
+            except BaseException as error:
+                self._record_error(error)
+                # A write may have been applied before the connection broke, so only reads are repeated
+                if attempt == attempts or not is_read or not is_transient(error):
+                    raise
+                logger.warning("Database read failed, retrying: {!r}", error)
+            else:
+                self.breaker.record_success()
+                return result
+            finally:
+                elapsed = time.perf_counter() - acquired
+                if not in_transaction:
+                    await self._pool.release(con)
+                self.stats.record(
+                    query, elapsed, acquire=acquired - started, rows=_count_rows(method, result, args), failed=failed
+                )
+
+            await self.retry.sleep(attempt - 1)
+
     async def execute(self, query: str, *args, timeout: t.Optional[float] = None) -> str:
         """Execute an SQL command.
 
@@ -127,10 +363,7 @@ class Database:
             The application is not connected to the database server.
         """
 
-        if not self._pool:
-            raise DatabaseStateConflictError("The database is not connected.")
-
-        return await self._pool.execute(query, *args, timeout=timeout)  # type: ignore
+        return await self._run("execute", query, *args, timeout=timeout)
 
     async def fetch(self, query: str, *args, timeout: t.Optional[float] = None) -> t.List[asyncpg.Record]:
         """Run a query and return the results as a list of `Record`.
@@ -152,10 +385,7 @@ class Database:
         DatabaseStateConflictError
             The application is not connected to the database server.
         """
-        if not self._pool:
-            raise DatabaseStateConflictError("The database is not connected.")
-
-        return await self._pool.fetch(query, *args, timeout=timeout)
+        return await self._run("fetch", query, *args, timeout=timeout)
 
     async def executemany(self, command: str, args: t.Iterable[t.Any], *, timeout: t.Optional[float] = None) -> str:
         """Execute an SQL command for each sequence of arguments in `args`.
@@ -179,10 +409,7 @@ class Database:
         DatabaseStateConflictError
             The application is not connected to the database server.
         """
-        if not self._pool:
-            raise DatabaseStateConflictError("The database is not connected.")
-
-        return await self._pool.executemany(command, args, timeout=timeout)  # type: ignore
+        return await self._run("executemany", command, list(args), timeout=timeout)
 
     async def fetchrow(self, query: str, *args, timeout: t.Optional[float] = None) -> asyncpg.Record:
         """Run a query and return the first row that matched query parameters.
@@ -204,10 +431,7 @@ class Database:
         DatabaseStateConflictError
             The application is not connected to the database server.
         """
-        if not self._pool:
-            raise DatabaseStateConflictError("The database is not connected.")
-
-        return await self._pool.fetchrow(query, *args, timeout=timeout)
+        return await self._run("fetchrow", query, *args, timeout=timeout)
 
     async def fetchval(self, query: str, *args, column: int = 0, timeout: t.Optional[float] = None) -> t.Any:
         """Run a query and return a value in the first row that matched query parameters.
@@ -230,19 +454,180 @@ class Database:
         DatabaseStateConflictError
             The application is not connected to the database server.
         """
-        if not self._pool:
-            raise DatabaseStateConflictError("The database is not connected.")
+        return await self._run("fetchval", query, *args, column=column, timeout=timeout)
+
+    async def fetch_one(self, stmt: Statement[T], *args: t.Any, timeout: t.Optional[float] = None) -> T | None:
+        """Run a statement and map its first row.
+
+        Parameters
+        ----------
+        stmt : Statement[T]
+            The statement to run.
+        timeout : Optional[float], optional
+            The timeout in seconds, by default None
+
+        Returns
+        -------
+        Optional[T]
+            The mapped row, or None if nothing matched.
 
-        return await self._pool.fetchval(query, *args, column=column, timeout=timeout)
+        Raises
+        ------
+        DatabaseStateConflictError
+            The application is not connected to the database server.
+        """
+        record = await self._run("fetchrow", stmt.query, *args, timeout=timeout)
+        return stmt.mapper(record) if record is not None else None
+
+    async def fetch_many(self, stmt: Statement[T], *args: t.Any, timeout: t.Optional[float] = None) -> t.List[T]:
+        """Run a statement and map every row.
+
+        Parameters
+        ----------
+        stmt : Statement[T]
+            The statement to run.
+        timeout : Optional[float], optional
+            The timeout in seconds, by default None
+
+        Returns
+        -------
+        List[T]
+            The mapped rows.
+
+        Raises
+        ------
+        DatabaseStateConflictError
+            The application is not connected to the database server.
+        """
+        records = await self._run("fetch", stmt.query, *args, timeout=timeout)
+        return [stmt.mapper(record) for record in records]
+
+    async def insert_many(
+        self,
+        table: str,
+        columns: t.Sequence[str],
+        types: t.Sequence[str],
+        rows: t.Iterable[t.Sequence[t.Any]],
+        *,
+        conflict: t.Sequence[str] | None = None,
+        update: t.Sequence[str] = (),
+        timeout: t.Optional[float] = None,
+    ) -> int:
+        """Insert many rows with a single statement, by passing every column as one array and unnesting them.
+
+        Parameters
+        ----------
+        table : str
+            The table to insert into.
+        columns : Sequence[str]
+            The columns the values of each row are for.
+        types : Sequence[str]
+            The postgres type of each column, e.g. `bigint` or `timestamptz`.
+        rows : Iterable[Sequence[Any]]
+            The rows to insert, each holding one value per column.
+        conflict : Optional[Sequence[str]]
+            The conflict target. Conflicting rows are skipped, unless `update` is given.
+        update : Sequence[str]
+            The columns to overwrite with the new values on conflict.
+        timeout : Optional[float], optional
+            The timeout in seconds, by default None
+
+        Returns
+        -------
+        int
+            The amount of inserted or updated rows.
+
+        Raises
+        ------
+        DatabaseStateConflictError
+            The application is not connected to the database server.
+        """
+        if len(columns) != len(types):
+            raise ValueError("Every column needs a type.")
+
+        rows = list(rows)
+        if not rows:
+            return 0
+
+        arrays = [list(values) for values in zip(*rows)]
+        query = (
+            f"INSERT INTO {_quote(table)} ({', '.join(_quote(column) for column in columns)}) "
+            f"SELECT * FROM unnest({', '.join(f'${i}::{kind}[]' for i, kind in enumerate(types, 1))})"
+        )
+        if conflict is not None:
+            query += f" ON CONFLICT ({', '.join(_quote(column) for column in conflict)}) "
+            if update:
+                query += "DO UPDATE SET " + ", ".join(
+                    f"{_quote(column)} = EXCLUDED.{_quote(column)}" for column in update
+                )
+            else:
+                query += "DO NOTHING"
+
+        result = await self.execute(query, *arrays, timeout=timeout)
+        return _count_rows("execute", result, ())
 
     async def wipe_guild(self, guild: hikari.SnowflakeishOr[hikari.PartialGuild], *, keep_record: bool = True) -> None:
-        if not self._pool:
-            raise DatabaseStateConflictError("The database is not connected.")
+        """Atomically erase all data stored for a guild, and evict it from every cache.
 
-        async with self.acquire() as con:
-            await con.execute("""DELETE FROM guild WHERE guild_id = $1""", hikari.Snowflake(guild))
-            if keep_record:
-                await con.execute("""INSERT INTO guild (guild_id) VALUES ($1)""", hikari.Snowflake(guild))
+        Parameters
+        ----------
+        guild : hikari.SnowflakeishOr[hikari.PartialGuild]
+            The guild to erase.
+        keep_record : bool
+            If True, the guild is re-added with default settings.
+
+        Raises
+        ------
+        DatabaseStateConflictError
+            The application is not connected to the database server.
+        """
+        guild_id = hikari.Snowflake(guild)
+
+        try:
+            async with self.transaction():
+                # Timers have no foreign key on the guild, everything else is removed by the cascade
+                await self.execute(_delete_guild_timers_sql, guild_id)
+                await self.execute(_delete_guild_sql, guild_id)
+                if keep_record:
+                    await self.execute(_insert_guild_sql, guild_id)
+        finally:
+            cache.invalidate_tag(guild_tag(guild_id))
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _count_rows(method: str, result: t.Any, args: tuple[t.Any, ...]) -> int:
+    """Get the amount of rows a query returned or affected from its result."""
+    if result is None:
+        # executemany does not return a status, count the argument sets instead
+        return len(args[0]) if method == "executemany" and args else 0
+    if method == "fetch":
+        return len(result)
+    if method == "execute":
+        # Status tags end with the row count, e.g. "UPDATE 3" or "INSERT 0 1"
+        count = result.rpartition(" ")[2]
+        return int(count) if count.isdigit() else 0
+    return 1
+
+
+def _invalidates_cache(method: t.Callable[..., t.Awaitable[t.Any]]) -> t.Callable[..., t.Awaitable[t.Any]]:
+    """Wrap a model method writing to the database, so it evicts the model from its cache once it completed."""
+    if getattr(method, "__invalidates_cache__", False):
+        return method
+
+    @functools.wraps(method)
+    async def wrapper(self: DatabaseModel, *args: t.Any, **kwargs: t.Any) -> t.Any:
+        try:
+            return await method(self, *args, **kwargs)
+        finally:
+            # Also on failure, the write may have been applied before the error
+            if self.cache is not None:
+                self.cache.invalidate(*self.cache_keys())
+
+    wrapper.__invalidates_cache__ = True  # type: ignore
+    return wrapper
 
 
 class DatabaseModel(abc.ABC):
@@ -250,3 +635,21 @@ class DatabaseModel(abc.ABC):
 
     db: Database
     app: Airy
+
+    cache: t.ClassVar[ModelCache[t.Any, t.Any] | None] = None
+    """The read-through cache of this model, if it has one."""
+
+    def __init_subclass__(cls, **kwargs: t.Any) -> None:
+        super().__init_subclass__(**kwargs)
+
+        if cls.cache is None:
+            return
+
+        for name in ("update", "save", "delete"):
+            method = cls.__dict__.get(name)
+            if inspect.iscoroutinefunction(method):
+                setattr(cls, name, _invalidates_cache(method))
+
+    def cache_keys(self) -> tuple[t.Hashable, ...]:
+        """The keys this model is stored under in its cache."""
+        raise NotImplementedError
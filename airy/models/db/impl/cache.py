@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import typing as t
+
+import hikari
+
+from airy.utils.cache import AsyncCache
+
+__all__ = ("ModelCache", "guild_tag")
+
+K = t.TypeVar("K", bound=t.Hashable)
+M = t.TypeVar("M")
+
+
+def guild_tag(guild: hikari.SnowflakeishOr[hikari.PartialGuild]) -> str:
+    """The tag of everything cached for a guild, evict it with `airy.utils.cache.invalidate_tag`."""
+    return f"guild:{hikari.Snowflake(guild)}"
+
+
+class ModelCache(AsyncCache[K, M]):
+    """
+    A read-through cache of database models, keyed by whatever identifies a row.
+
+    Missing rows are cached as None for `negative_ttl` seconds, so repeated lookups of absent data
+    do not reach the database either. Models with a cache are invalidated automatically
+    when their `update`, `save` or `delete` methods complete, see `DatabaseModel.cache_keys`.
+    The cache is named after the model it is assigned to.
+    """
+
+    def __init__(self, *, maxsize: int = 1024, ttl: float | None = 3600.0, negative_ttl: float | None = 300.0) -> None:
+        """
+        Parameters
+        ----------
+        maxsize : int
+            The maximum amount of cached keys.
+        ttl : Optional[float]
+            The amount of seconds a cached model stays valid for, None to keep it until invalidated.
+        negative_ttl : Optional[float]
+            The amount of seconds a missing row is remembered for.
+        """
+        super().__init__(maxsize=maxsize, ttl=ttl, negative_ttl=negative_ttl)
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import enum
+import random
+import time
+import typing as t
+
+import asyncpg  # type: ignore
+import attr
+
+from loguru import logger
+
+from airy.models.errors import DatabaseUnavailableError
+
+__all__ = ("BreakerState", "CircuitBreaker", "RetryPolicy", "is_transient")
+
+# Errors after which the same statement can succeed on another connection or a bit later
+_TRANSIENT_ERRORS: tuple[type[BaseException], ...] = (
+    OSError,  # Includes ConnectionError, e.g. the server refusing or resetting connections
+    asyncpg.ConnectionDoesNotExistError,
+    asyncpg.PostgresConnectionError,  # Class 08, connection exceptions
+    asyncpg.CannotConnectNowError,  # The server is starting up or shutting down
+    asyncpg.AdminShutdownError,
+    asyncpg.CrashShutdownError,
+    asyncpg.TooManyConnectionsError,
+    asyncpg.SerializationError,
+    asyncpg.DeadlockDetectedError,
+)
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether an error is caused by the state of the database server rather than by the statement itself.
+
+    Timeouts are not, repeating a statement that timed out would only multiply the wait.
+    """
+    return isinstance(error, _TRANSIENT_ERRORS) and not isinstance(error, asyncio.TimeoutError)
+
+
+@attr.define()
+class RetryPolicy:
+    """How often and how late failed statements are retried, with exponential backoff and full jitter."""
+
+    attempts: int = 3
+    """The maximum amount of attempts, including the first one."""
+    base_delay: float = 0.1
+    max_delay: float = 2.0
+
+    def delay(self, attempt: int) -> float:
+        """The amount of seconds to wait before the retry following the given zero-based attempt."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    async def sleep(self, attempt: int) -> None:
+        await asyncio.sleep(self.delay(attempt))
+
+
+class BreakerState(str, enum.Enum):
+    CLOSED = "closed"
+    """Statements run as usual."""
+    OPEN = "open"
+    """The database is considered down, statements fail immediately."""
+    HALF_OPEN = "half_open"
+    """A single trial statement is let through to find out whether the database is back."""
+
+
+class CircuitBreaker:
+    """
+    Stops sending statements to a database that keeps failing with transient errors.
+
+    After `failure_threshold` consecutive transient failures the breaker opens and every statement
+    fails with `DatabaseUnavailableError` without waiting on the pool. After `reset_timeout` seconds
+    one trial statement is let through, its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, *, failure_threshold: int = 5, reset_timeout: float = 10.0) -> None:
+        """
+        Parameters
+        ----------
+        failure_threshold : int
+            The amount of consecutive transient failures that open the breaker.
+        reset_timeout : float
+            The amount of seconds the breaker stays open before a trial statement is let through.
+        """
+        self.failure_threshold: int = failure_threshold
+        self.reset_timeout: float = reset_timeout
+        self.failures: int = 0
+        """The amount of consecutive transient failures."""
+        self.last_error: BaseException | None = None
+        self._state: BreakerState = BreakerState.CLOSED
+        self._opened_at: float = 0.0
+        self._trial_running: bool = False
+
+    @property
+    def state(self) -> BreakerState:
+        if self._state is BreakerState.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            return BreakerState.HALF_OPEN
+        return self._state
+
+    @property
+    def is_closed(self) -> bool:
+        return self._state is BreakerState.CLOSED
+
+    def before_call(self) -> None:
+        """Raise `DatabaseUnavailableError` if the statement about to run may not reach the database."""
+        state = self.state
+        if state is BreakerState.CLOSED:
+            return
+
+        if state is BreakerState.HALF_OPEN and not self._trial_running:
+            self._trial_running = True
+            return
+
+        raise DatabaseUnavailableError(f"The database is unavailable: {self.last_error!r}")
+
+    def release_trial(self) -> None:
+        """Let another trial statement through, the current one ended without telling whether the database is up."""
+        self._trial_running = False
+
+    def record_success(self) -> None:
+        if self._state is not BreakerState.CLOSED:
+            logger.info("Database is reachable again, closing the circuit breaker")
+
+        self._state = BreakerState.CLOSED
+        self._trial_running = False
+        self.failures = 0
+
+    def record_failure(self, error: BaseException) -> None:
+        self.failures += 1
+        self.last_error = error
+        self._trial_running = False
+
+        if self._state is not BreakerState.CLOSED or self.failures >= self.failure_threshold:
+            if self._state is BreakerState.CLOSED:
+                logger.error("Database failed {} times in a row, opening the circuit breaker: {}", self.failures, error)
+            self._state = BreakerState.OPEN
+            self._opened_at = time.monotonic()
+
+    def summary(self) -> dict[str, t.Any]:
+        return {
+            "state": self.state.value,
+            "failures": self.failures,
+            "last_error": repr(self.last_error) if self.last_error else None,
+        }
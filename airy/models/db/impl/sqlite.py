@@ -0,0 +1,450 @@
+"""
+An in-process stand-in for `Database`, running on an in-memory SQLite database instead of Postgres.
+
+It exists so services can be tested and benchmarked without a Postgres server. Queries are written
+for Postgres and translated on the fly, which covers the subset of SQL this code base uses:
+
+- numbered parameters (`$1`) and casts (`$1::bigint[]`), which are dropped,
+- array parameters with `= ANY($1)` and `unnest($1, $2, ...) [AS v (a, b, ...)]`, arrays are passed as JSON,
+- `array_agg` and `array_remove(array_agg(...), NULL)`, returned as lists when the column has an alias,
+- `jsonb` columns and the `->`/`->>` operators, `timestamptz` columns, `ON CONFLICT`, `UPDATE ... FROM`
+  and `RETURNING`, where `RETURNING t.*` returns every column of the updated table,
+- row locks (`FOR UPDATE SKIP LOCKED`), which are dropped.
+
+Anything beyond that, e.g. `LISTEN`, PL/pgSQL or `now()`, fails with the error SQLite raises for it.
+Tortoise ORM models are not served by it, initialize Tortoise with `sqlite://:memory:` for those.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import functools
+import itertools
+import re
+import sqlite3
+import time
+import typing as t
+from contextlib import asynccontextmanager
+
+import orjson
+
+from airy.models.db.impl import Database, DatabaseModel, _count_rows, _transaction_connection
+from airy.models.db.impl.resilience import CircuitBreaker, RetryPolicy
+from airy.models.db.impl.stats import QueryStatsCollector
+from airy.models.errors import DatabaseStateConflictError
+
+if t.TYPE_CHECKING:
+    from airy.models.bot import Airy
+
+__all__ = ("Record", "SQLiteDatabase")
+
+# The tables of migrations/V1 to V4, without the Postgres-only parts
+_schema_sql = """
+CREATE TABLE guild (
+    guild_id bigint NOT NULL PRIMARY KEY,
+    re_assigns_roles bool DEFAULT FALSE
+);
+CREATE TABLE users (
+    id bigint NOT NULL PRIMARY KEY,
+    tz text NOT NULL
+);
+CREATE TABLE guild_users (
+    id integer PRIMARY KEY AUTOINCREMENT,
+    guild_id bigint NOT NULL REFERENCES guild (guild_id) ON DELETE CASCADE,
+    user_id bigint NOT NULL,
+    experience bigint DEFAULT 0,
+    UNIQUE (guild_id, user_id)
+);
+CREATE TABLE sectionrole (
+    id integer PRIMARY KEY AUTOINCREMENT,
+    guild_id bigint NOT NULL REFERENCES guild (guild_id) ON DELETE CASCADE,
+    role_id bigint NOT NULL UNIQUE,
+    hierarchy smallint NOT NULL DEFAULT 0,
+    UNIQUE (guild_id, role_id)
+);
+CREATE TABLE sectionrole_entry (
+    id integer PRIMARY KEY AUTOINCREMENT,
+    entry_id bigint NOT NULL,
+    role_id bigint NOT NULL REFERENCES sectionrole (role_id) ON DELETE CASCADE,
+    UNIQUE (role_id, entry_id)
+);
+CREATE TABLE autorole (
+    id integer PRIMARY KEY AUTOINCREMENT,
+    guild_id bigint NOT NULL REFERENCES guild (guild_id) ON DELETE CASCADE,
+    role_id bigint NOT NULL,
+    UNIQUE (guild_id, role_id)
+);
+CREATE TABLE autorole_for_member (
+    id integer PRIMARY KEY AUTOINCREMENT,
+    guild_id bigint NOT NULL REFERENCES guild (guild_id) ON DELETE CASCADE,
+    role_id bigint NOT NULL,
+    user_id bigint NOT NULL,
+    UNIQUE (guild_id, role_id)
+);
+CREATE TABLE reactionrole (
+    id integer PRIMARY KEY AUTOINCREMENT,
+    guild_id bigint NOT NULL REFERENCES guild (guild_id) ON DELETE CASCADE,
+    channel_id bigint NOT NULL,
+    message_id bigint NOT NULL,
+    type smallint NOT NULL DEFAULT 0,
+    max smallint NOT NULL DEFAULT 0,
+    UNIQUE (guild_id, channel_id, message_id)
+);
+CREATE TABLE reactionrole_entry (
+    id int REFERENCES reactionrole (id) ON DELETE CASCADE,
+    role_id bigint NOT NULL,
+    emoji text NOT NULL,
+    UNIQUE (id, role_id, emoji)
+);
+CREATE TABLE blacklist (
+    id integer PRIMARY KEY AUTOINCREMENT,
+    entry_id bigint NOT NULL
+);
+CREATE TABLE timer (
+    id integer PRIMARY KEY AUTOINCREMENT,
+    guild_id bigint NOT NULL,
+    user_id bigint NOT NULL,
+    channel_id bigint,
+    expires timestamptz NOT NULL,
+    created timestamptz DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    event smallint NOT NULL,
+    extra jsonb DEFAULT '{}',
+    lease_owner text,
+    lease_expires timestamptz,
+    recurrence text
+);
+CREATE INDEX reminders_expires_idx ON timer (expires);
+CREATE TABLE voice_rooms_creators (
+    id integer PRIMARY KEY AUTOINCREMENT,
+    guild_id bigint NOT NULL REFERENCES guild (guild_id) ON DELETE CASCADE,
+    channel_id bigint NOT NULL,
+    channel_name text NOT NULL,
+    user_limit smallint,
+    editable bool NOT NULL,
+    auto_inc bool NOT NULL,
+    sync_permissions bool NOT NULL,
+    additional_category_name text NOT NULL
+);
+"""
+
+_PARAMETER = re.compile(r"\$(\d+)")
+_CAST = re.compile(r"::\s*[a-z_]+(?:\s+with(?:out)?\s+time\s+zone)?(?:\s*\[\])?", re.IGNORECASE)
+_ANY = re.compile(r"=\s*ANY\s*\(\s*(\?\d+)\s*\)", re.IGNORECASE)
+_UNNEST = re.compile(r"unnest\s*\(([^()]*)\)(?:\s+AS\s+(\w+)\s*\(([^()]*)\))?", re.IGNORECASE)
+_ARRAY_AGG = re.compile(
+    r"(?:array_remove\s*\(\s*array_agg\s*\(([^()]*)\)\s*,\s*NULL\s*\)|array_agg\s*\(([^()]*)\))(\s+AS\s+(\w+))?",
+    re.IGNORECASE,
+)
+_CONFLICT = re.compile(r"\)\s+ON\s+CONFLICT", re.IGNORECASE)
+_LEFT = re.compile(r"(?<![\w.])left\s*\(", re.IGNORECASE)  # LEFT is a keyword in SQLite
+_LOCKING = re.compile(r"\s+FOR\s+(?:NO\s+KEY\s+)?UPDATE(?:\s+SKIP\s+LOCKED|\s+NOWAIT)?", re.IGNORECASE)
+_RETURNING = re.compile(r"RETURNING\s+\w+\.\*", re.IGNORECASE)  # SQLite only returns unqualified wildcards
+
+
+def _translate_unnest(match: re.Match[str], zipped: list[tuple[int, ...]], first: int) -> str:
+    arrays = [int(array.strip().lstrip("?")) for array in match.group(1).split(",")]
+    alias, names = match.group(2), match.group(3)
+    # SQLite has no column alias lists, `AS v (id, next)` names the columns of the subquery instead
+    names = [name.strip() for name in names.split(",")] if names else [f"column{i}" for i in range(len(arrays))]
+    # The arrays are zipped into one parameter of rows, joining a `json_each` per array runs as nested loops
+    parameter = first + len(zipped)
+    zipped.append(tuple(arrays))
+    columns = ", ".join(f"json_extract(value, '$[{i}]') AS {name}" for i, name in enumerate(names))
+    subquery = f"(SELECT {columns} FROM json_each(?{parameter}))"
+    return f"{subquery} AS {alias}" if alias else subquery
+
+
+def _translate_array_agg(match: re.Match[str]) -> str:
+    removes_null, value, _, alias = match.groups()
+    expression = f"json_group_array({removes_null}) FILTER (WHERE {removes_null} IS NOT NULL)" if removes_null \
+        else f"json_group_array({value})"
+    # The type in the column name is picked up by the `array` converter, see `sqlite3.PARSE_COLNAMES`
+    return f'{expression} AS "{alias} [array]"' if alias else expression
+
+
+@functools.lru_cache(maxsize=512)
+def translate(query: str) -> tuple[str, tuple[tuple[int, ...], ...]]:
+    """Rewrite a Postgres query into the SQLite dialect, as far as this module supports it.
+
+    Returns
+    -------
+    tuple[str, tuple[tuple[int, ...], ...]]
+        The query, and the numbers of the array parameters each `unnest` takes. The zipped rows of
+        these arrays are bound as extra parameters after the original ones, see `_bind`.
+    """
+    zipped: list[tuple[int, ...]] = []
+    first = max((int(number) for number in _PARAMETER.findall(query)), default=0) + 1
+    query = _PARAMETER.sub(r"?\1", query)
+    query = _CAST.sub("", query)
+    query = _ANY.sub(r"IN (SELECT value FROM json_each(\1))", query)
+    query = _LEFT.sub("pg_left(", query)
+    query = _RETURNING.sub("RETURNING *", query)
+    query = _LOCKING.sub("", query)  # A single connection never competes for rows
+    if _UNNEST.search(query):
+        query = _UNNEST.sub(lambda match: _translate_unnest(match, zipped, first), query)
+        # `FROM (...) ON CONFLICT` is read as a join constraint without a WHERE clause in between
+        query = _CONFLICT.sub(") WHERE true ON CONFLICT", query)
+    return _ARRAY_AGG.sub(_translate_array_agg, query), tuple(zipped)
+
+
+def _adapt_timestamp(value: datetime.datetime) -> str:
+    # Always with microseconds, so stored timestamps compare correctly as strings
+    return value.isoformat(timespec="microseconds")
+
+
+def _adapt_json(value: t.Any) -> str:
+    return orjson.dumps(value, default=_adapt_timestamp, option=orjson.OPT_PASSTHROUGH_DATETIME).decode()
+
+
+def _adapt(value: t.Any) -> t.Any:
+    if isinstance(value, datetime.datetime):
+        return _adapt_timestamp(value)
+    if isinstance(value, (list, tuple, dict)):
+        return _adapt_json(value)
+    return value
+
+
+def _bind(args: t.Sequence[t.Any], zipped: tuple[tuple[int, ...], ...]) -> tuple[t.Any, ...]:
+    """Convert the arguments of a statement into values SQLite can store, adding the zipped arrays of `translate`.
+
+    This happens per statement instead of with `sqlite3.register_adapter`, which would change
+    how every SQLite connection of the process stores lists, dicts and datetimes.
+    """
+    # Shorter arrays are padded with NULL, like `unnest` does
+    arrays = (list(itertools.zip_longest(*(args[number - 1] for number in numbers))) for numbers in zipped)
+    return tuple(_adapt(value) for value in (*args, *arrays))
+
+
+def _convert_timestamp(value: bytes) -> datetime.datetime:
+    return datetime.datetime.fromisoformat(value.decode())
+
+
+def _greatest(*values: t.Any) -> t.Any:
+    values = tuple(value for value in values if value is not None)
+    return max(values) if values else None
+
+
+def _least(*values: t.Any) -> t.Any:
+    values = tuple(value for value in values if value is not None)
+    return min(values) if values else None
+
+
+def _left(value: str | None, count: int) -> str | None:
+    return value[:count] if value is not None else None
+
+
+sqlite3.register_converter("timestamptz", _convert_timestamp)
+sqlite3.register_converter("jsonb", orjson.loads)
+sqlite3.register_converter("bool", lambda value: value not in (b"0", b""))
+sqlite3.register_converter("array", orjson.loads)
+
+
+class Record(t.Mapping[str, t.Any]):
+    """A result row, indexable by column name and position like `asyncpg.Record`."""
+
+    __slots__ = ("_keys", "_values")
+
+    def __init__(self, keys: tuple[str, ...], values: tuple[t.Any, ...]) -> None:
+        self._keys: tuple[str, ...] = keys
+        self._values: tuple[t.Any, ...] = values
+
+    def __getitem__(self, key: str | int) -> t.Any:
+        if isinstance(key, int):
+            return self._values[key]
+        try:
+            return self._values[self._keys.index(key)]
+        except ValueError:
+            raise KeyError(key) from None
+
+    def __iter__(self) -> t.Iterator[t.Any]:
+        # Like asyncpg, iterating a record yields its values, `keys()` yields the column names
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys
+
+    def keys(self) -> t.KeysView[str]:  # type: ignore[override]
+        return dict(zip(self._keys, self._values)).keys()
+
+    def values(self) -> t.ValuesView[t.Any]:  # type: ignore[override]
+        return dict(zip(self._keys, self._values)).values()
+
+    def items(self) -> t.ItemsView[str, t.Any]:  # type: ignore[override]
+        return dict(zip(self._keys, self._values)).items()
+
+    def __repr__(self) -> str:
+        return f"<Record {' '.join(f'{key}={value!r}' for key, value in zip(self._keys, self._values))}>"
+
+
+class SQLiteConnection:
+    """What `SQLiteDatabase.acquire` hands out, mirroring the methods of `asyncpg.Connection` that are used."""
+
+    def __init__(self, db: SQLiteDatabase) -> None:
+        self._db: SQLiteDatabase = db
+
+    async def execute(self, query: str, *args: t.Any, timeout: float | None = None) -> str:
+        return await self._db.execute(query, *args, timeout=timeout)
+
+    async def executemany(self, command: str, args: t.Iterable[t.Any], *, timeout: float | None = None) -> str:
+        return await self._db.executemany(command, args, timeout=timeout)
+
+    async def fetch(self, query: str, *args: t.Any, timeout: float | None = None) -> list[Record]:
+        return await self._db.fetch(query, *args, timeout=timeout)
+
+    async def fetchrow(self, query: str, *args: t.Any, timeout: float | None = None) -> Record | None:
+        return await self._db.fetchrow(query, *args, timeout=timeout)
+
+    async def fetchval(self, query: str, *args: t.Any, column: int = 0, timeout: float | None = None) -> t.Any:
+        return await self._db.fetchval(query, *args, column=column, timeout=timeout)
+
+    def transaction(self) -> t.AsyncContextManager[SQLiteConnection]:
+        return self._db.transaction()
+
+
+class SQLiteDatabase(Database):
+    """
+    A `Database` running on an in-memory SQLite database, for tests and offline benchmarks.
+
+    Statements run synchronously on a single connection, a transaction holds a lock
+    so statements of other tasks wait for it to finish instead of joining it.
+    """
+
+    def __init__(self, app: Airy | None = None) -> None:
+        self._app = app  # type: ignore
+        self._pool = None
+        self._is_closed: bool = False
+        self._con: sqlite3.Connection | None = None
+        self._connection: SQLiteConnection = SQLiteConnection(self)
+        self._lock: asyncio.Lock = asyncio.Lock()
+        self._savepoints: int = 0
+        self.stats: QueryStatsCollector = QueryStatsCollector()
+        self.retry: RetryPolicy = RetryPolicy(attempts=1)
+        self.breaker: CircuitBreaker = CircuitBreaker()
+
+        DatabaseModel.db = self
+        DatabaseModel.app = app  # type: ignore
+
+    @property
+    def dsn(self) -> str:
+        return "sqlite://:memory:"
+
+    async def connect(self) -> None:
+        """Open the in-memory database and create the schema."""
+        if self._is_closed:
+            raise DatabaseStateConflictError("The database is closed.")
+
+        self._con = sqlite3.connect(
+            ":memory:", isolation_level=None, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES
+        )
+        self._con.execute("PRAGMA foreign_keys = ON")
+        self._con.create_function("greatest", -1, _greatest, deterministic=True)
+        self._con.create_function("least", -1, _least, deterministic=True)
+        self._con.create_function("pg_left", 2, _left, deterministic=True)
+        self._con.executescript(_schema_sql)
+        self._pool = self._con  # type: ignore
+
+    def bind_tortoise(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        self.terminate()
+
+    def terminate(self) -> None:
+        if not self._con:
+            raise DatabaseStateConflictError("The database is not connected.")
+        if self._is_closed:
+            raise DatabaseStateConflictError("The database is closed.")
+
+        self._con.close()
+        self._is_closed = True
+
+    def health(self) -> dict[str, t.Any]:
+        return {"healthy": self.is_healthy, "breaker": self.breaker.summary(), "pool_size": 1, "pool_idle": 1}
+
+    @asynccontextmanager
+    async def acquire(self) -> t.AsyncIterator[SQLiteConnection]:  # type: ignore[override]
+        if not self._con:
+            raise DatabaseStateConflictError("The database is not connected.")
+
+        yield self._connection
+
+    @asynccontextmanager
+    async def transaction(self) -> t.AsyncIterator[SQLiteConnection]:  # type: ignore[override]
+        if not self._con:
+            raise DatabaseStateConflictError("The database is not connected.")
+
+        if _transaction_connection.get() is not None:
+            self._savepoints += 1
+            name = f"sp_{self._savepoints}"
+            self._con.execute(f"SAVEPOINT {name}")
+            try:
+                yield self._connection
+            except BaseException:
+                self._con.execute(f"ROLLBACK TO SAVEPOINT {name}")
+                raise
+            finally:
+                self._con.execute(f"RELEASE SAVEPOINT {name}")
+            return
+
+        async with self._lock:
+            self._con.execute("BEGIN")
+            token = _transaction_connection.set(self._connection)
+            try:
+                yield self._connection
+            except BaseException:
+                self._con.execute("ROLLBACK")
+                raise
+            else:
+                self._con.execute("COMMIT")
+            finally:
+                _transaction_connection.reset(token)
+
+    async def _run(self, method: str, query: str, *args: t.Any, column: int = 0, **kwargs: t.Any) -> t.Any:
+        if not self._con:
+            raise DatabaseStateConflictError("The database is not connected.")
+
+        started = time.perf_counter()
+        if _transaction_connection.get() is None and self._lock.locked():
+            # Another task is inside a transaction, wait for it instead of running as part of it
+            async with self._lock:
+                pass
+        acquired = time.perf_counter()
+
+        result = None
+        failed = True
+        try:
+            sql, zipped = translate(query)
+            args = ([_bind(row, zipped) for row in args[0]],) if method == "executemany" else _bind(args, zipped)
+            result = self._execute(method, sql, args, column)
+            failed = False
+            return result
+        finally:
+            self.stats.record(query, time.perf_counter() - acquired, acquire=acquired - started,
+                              rows=_count_rows(method, result, args), failed=failed)
+
+    def _execute(self, method: str, query: str, args: tuple[t.Any, ...], column: int) -> t.Any:
+        assert self._con is not None
+        if method == "executemany":
+            self._con.executemany(query, args[0])
+            return None
+
+        cursor = self._con.execute(query, args)
+        if method == "execute":
+            cursor.fetchall()
+            verb = query.lstrip().split(None, 1)[0].upper()
+            return f"{verb} 0 {cursor.rowcount}" if verb == "INSERT" else f"{verb} {max(cursor.rowcount, 0)}"
+
+        keys = tuple(description[0] for description in cursor.description or ())
+        if method == "fetch":
+            return [Record(keys, row) for row in cursor.fetchall()]
+
+        row = cursor.fetchone()
+        cursor.fetchall()
+        if row is None:
+            return None
+        return Record(keys, row) if method == "fetchrow" else row[column]
+
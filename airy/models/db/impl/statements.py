@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import typing as t
+
+import attr
+
+if t.TYPE_CHECKING:
+    import asyncpg  # type: ignore
+
+__all__ = ("Statement", "statement")
+
+T = t.TypeVar("T")
+
+
+@attr.frozen()
+class Statement(t.Generic[T]):
+    """A query with a mapper turning its rows into models.
+
+    Run it with `Database.fetch_one` or `Database.fetch_many`, or pass `query` to any other method of `Database`.
+    """
+
+    query: str
+    mapper: t.Callable[[asyncpg.Record], T] = attr.field(default=lambda record: record, eq=False)
+    """Builds the result of a row, reading its columns directly. Returns the record itself by default."""
+
+
+def statement(query: str, mapper: t.Callable[[asyncpg.Record], T] | None = None) -> Statement[T]:
+    """Pair a query with the mapper building its results.
+
+    Like every query, it is prepared on its first use on each pooled connection and kept in the statement cache
+    of the connection, there is no separate warm-up.
+
+    Parameters
+    ----------
+    query : str
+        The SQL query.
+    mapper : Optional[Callable[[asyncpg.Record], T]]
+        Builds the result of a row.
+    """
+    return Statement(query, mapper) if mapper else Statement(query)  # type: ignore
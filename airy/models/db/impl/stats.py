@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import functools
+import re
+import typing as t
+
+import attr
+
+from loguru import logger
+
+from airy.utils.metrics import Histogram
+
+__all__ = ("QueryStats", "QueryStatsCollector", "fingerprint")
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=1024)
+def fingerprint(query: str) -> str:
+    """Normalize a query so every call of the same statement maps to one key.
+
+    Comments and extra whitespace are removed and inline literals are replaced with `?`,
+    bound parameters (`$1`) are kept as they are.
+    """
+    query = _COMMENTS.sub(" ", query)
+    query = _STRINGS.sub("?", query)
+    query = _NUMBERS.sub("?", query)
+    query = _LISTS.sub("(?, ...)", query)
+    return _WHITESPACE.sub(" ", query).strip()
+
+
+@attr.define()
+class QueryStats:
+    """Statistics of a single statement fingerprint."""
+
+    query: str
+    """The fingerprint of the statement."""
+    calls: int = 0
+    errors: int = 0
+    rows: int = 0
+    """The total amount of rows returned or affected."""
+    latency: Histogram = attr.field(factory=Histogram)
+    """Seconds spent running the statement, excluding the wait for a connection."""
+    acquire: Histogram = attr.field(factory=Histogram)
+    """Seconds spent waiting for a connection from the pool."""
+
+    def summary(self) -> dict[str, t.Any]:
+        latency = self.latency.summary()
+        return {
+            "query": self.query,
+            "calls": self.calls,
+            "errors": self.errors,
+            "rows": self.rows,
+            "total": self.latency.total,
+            "p50": latency["p50"],
+            "p95": self.latency.quantile(0.95),
+            "p99": latency["p99"],
+            "max": latency["max"],
+            "acquire_p99": self.acquire.quantile(0.99),
+        }
+
+
+class QueryStatsCollector:
+    """Collects per-statement statistics of the queries ran through `Database`."""
+
+    def __init__(self, *, slow_threshold: float | None = 0.5, max_queries: int = 500) -> None:
+        """
+        Parameters
+        ----------
+        slow_threshold : Optional[float]
+            Queries running longer than this amount of seconds are logged, None disables the slow query log.
+        max_queries : int
+            The maximum amount of fingerprints to track, later ones are counted under a shared `<other>` entry.
+        """
+        self.slow_threshold: float | None = slow_threshold
+        self.max_queries: int = max_queries
+        self.pool_acquire: Histogram = Histogram()
+        """Seconds spent waiting for a connection from the pool, by queries and explicit acquires alike."""
+        self._stats: dict[str, QueryStats] = {}
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    def get(self, query: str) -> QueryStats | None:
+        return self._stats.get(fingerprint(query))
+
+    def record(self, query: str, elapsed: float, *, acquire: float = 0.0, rows: int = 0, failed: bool = False) -> None:
+        """Record a single run of a query."""
+        key = fingerprint(query)
+        stats = self._stats.get(key)
+        if stats is None:
+            if len(self._stats) >= self.max_queries:
+                key = "<other>"
+            stats = self._stats.setdefault(key, QueryStats(key))
+
+        stats.calls += 1
+        stats.rows += rows
+        stats.errors += failed
+        stats.latency.observe(elapsed)
+        stats.acquire.observe(acquire)
+        self.pool_acquire.observe(acquire)
+
+        if self.slow_threshold is not None and elapsed >= self.slow_threshold:
+            logger.warning("Slow query ({:.3f}s, waited {:.3f}s for a connection): {}", elapsed, acquire, key)
+
+    def top(self, count: int = 10, *, key: str = "total") -> list[dict[str, t.Any]]:
+        """Get the summaries of the `count` statements with the highest value of `key`."""
+        summaries = [stats.summary() for stats in self._stats.values()]
+        return sorted(summaries, key=lambda summary: summary[key], reverse=True)[:count]
+
+    def reset(self) -> None:
+        self.pool_acquire.reset()
+        self._stats.clear()
@@ -6,6 +6,13 @@ import hikari
 import attr
 
 from airy.models.db.impl import DatabaseModel
+from airy.models.db.impl.cache import ModelCache
+from airy.models.db.impl.statements import statement
+
+_fetch_user = statement(
+    """SELECT id, tz FROM users WHERE id = $1""",
+    lambda record: DatabaseUser(id=hikari.Snowflake(record[0]), tz=record[1]),
+)
 
 
 @attr.define()
@@ -19,6 +26,11 @@ class DatabaseUser(DatabaseModel):
     tz: str
     """The timezone this user is bound to."""
 
+    cache: typing.ClassVar[ModelCache[hikari.Snowflake, DatabaseUser]] = ModelCache(maxsize=4096)
+
+    def cache_keys(self) -> tuple[hikari.Snowflake]:
+        return (self.id,)
+
     async def update(self) -> None:
         """Update or insert this user into the database."""
 
@@ -50,15 +62,17 @@ class DatabaseUser(DatabaseModel):
             An object representing stored user data.
         """
 
-        record = await cls.db.fetchrow(
-            """SELECT * FROM users WHERE id = $1""",
-            hikari.Snowflake(user),
-        )
+        user_id = hikari.Snowflake(user)
+        model = await cls.cache.get(user_id, lambda: cls._fetch(user_id))
 
-        if not record:
-            return DatabaseUser(id=hikari.Snowflake(user), tz="UTC")
+        if not model:
+            return DatabaseUser(id=user_id, tz="UTC")
 
-        return DatabaseUser(id=hikari.Snowflake(record.get("user_id")), tz=record.get("tz"))
+        return model
+
+    @classmethod
+    async def _fetch(cls, user_id: hikari.Snowflake) -> typing.Optional[DatabaseUser]:
+        return await cls.db.fetch_one(_fetch_user, user_id)
 
     @classmethod
     async def fetch_all(cls) -> typing.List[DatabaseUser]:
@@ -73,12 +87,8 @@ class DatabaseUser(DatabaseModel):
             A list of objects representing stored user data.
         """
 
-        records = await cls.db.fetch("""SELECT * FROM users""")
-
-        if not records:
-            return []
-
-        return [DatabaseUser(id=hikari.Snowflake(record.get("user_id")), tz=record.get("tz")) for record in records]
+        records = await cls.db.fetch("""SELECT id, tz FROM users""")
+        return [_fetch_user.mapper(record) for record in records]
 
 
 @attr.define()
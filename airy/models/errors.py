@@ -7,6 +7,12 @@ class DatabaseStateConflictError(Exception):
     """
 
 
+class DatabaseUnavailableError(DatabaseStateConflictError):
+    """
+    Raised instead of running a statement while the database keeps failing, see `CircuitBreaker`.
+    """
+
+
 class AiryError(Exception):
     """
     Base Airy exception class. All errors raised by lightbulb will be a subclass
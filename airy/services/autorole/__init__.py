@@ -8,6 +8,7 @@ from loguru import logger
 
 from airy.models.bot import Airy
 from airy.models.db import DatabaseGuild
+from airy.models.errors import DatabaseUnavailableError
 from airy.services import BaseService
 from airy.utils import helpers
 
@@ -29,13 +30,20 @@ class AutoRolesService(BaseService):
     async def on_role_delete(cls, event: hikari.RoleDeleteEvent):
         await DatabaseAutoRole.db.execute("""delete from autorole where guild_id=$1 and role_id=$2""",
                                           event.guild_id, event.role_id)
+        DatabaseAutoRole.invalidate(event.guild_id, event.role_id)
 
     @classmethod
     async def on_member_join(cls, event: hikari.MemberCreateEvent):
         me = cls.bot.cache.get_member(event.guild_id, cls.bot.user_id)
         if not helpers.includes_permissions(lightbulb.utils.permissions_for(me), hikari.Permissions.MANAGE_ROLES):
             return
-        models = await cls.get_all_for_guild(event.guild_id)
+        try:
+            models = await cls.get_all_for_guild(event.guild_id)
+        except DatabaseUnavailableError:
+            logger.warning("Skipped AutoRoles for member {} in guild {}, the database is down",
+                           event.user_id,
+                           event.guild_id)
+            return
 
         if not models:
             return
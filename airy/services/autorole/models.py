@@ -1,16 +1,25 @@
 from __future__ import annotations
 
+import typing
+
 import attr
 import hikari
 
-from asyncpg import Record  # type: ignore
-from cashews import Cache
-
 from airy.models.db.impl import DatabaseModel
+from airy.models.db.impl.cache import ModelCache, guild_tag
+from airy.models.db.impl.statements import statement
 from airy.models import errors
 
-cache = Cache()
-cache.setup("mem://?size=1000", prefix="autorole")
+_fetch_autorole = statement(
+    """select id, guild_id, role_id from autorole where guild_id=$1 and role_id=$2""",
+    lambda record: DatabaseAutoRole(id=record[0],
+                                    guild_id=hikari.Snowflake(record[1]),
+                                    role_id=hikari.Snowflake(record[2])),
+)
+_fetch_guild_autoroles = statement(
+    """select id, guild_id, role_id from autorole where guild_id=$1""",
+    _fetch_autorole.mapper,
+)
 
 
 @attr.define()
@@ -19,12 +28,16 @@ class DatabaseAutoRole(DatabaseModel):
     guild_id: hikari.Snowflake
     role_id: hikari.Snowflake
 
+    # Keyed by (guild_id, role_id) for single roles and by guild_id for every role of a guild
+    cache: typing.ClassVar[ModelCache[typing.Any, typing.Any]] = ModelCache(ttl=86400)
+
+    def cache_keys(self) -> tuple[typing.Hashable, ...]:
+        return (self.guild_id, self.role_id), self.guild_id
+
     @classmethod
-    def _parse_record(cls, record: Record):
-        return DatabaseAutoRole(id=record.get("id"),
-                                guild_id=hikari.Snowflake(record.get("guild_id")),
-                                role_id=hikari.Snowflake(record.get("role_id"))
-                                )
+    def invalidate(cls, guild: hikari.Snowflake, role: hikari.Snowflake) -> None:
+        """Evict a role and the role list of its guild from the cache."""
+        cls.cache.invalidate((guild, role), guild)
 
     @classmethod
     async def create(cls, guild: hikari.Snowflake, role: hikari.Snowflake) -> DatabaseAutoRole | None:
@@ -39,8 +52,7 @@ class DatabaseAutoRole(DatabaseModel):
                                        guild,
                                        role)
 
-        await cache.delete(f"autorole:{guild}")
-        await cache.delete(f"autorole:{guild}:{role}")
+        cls.invalidate(guild, role)
 
         return DatabaseAutoRole(id=row_id, guild_id=guild, role_id=role)
 
@@ -50,29 +62,29 @@ class DatabaseAutoRole(DatabaseModel):
         await cls.db.execute("""delete from autorole where guild_id = $1 and role_id=$2""",
                              guild,
                              role)
-        await cache.delete(f"autorole:{guild}")
-        await cache.delete(f"autorole:{guild}:{role}")
+        cls.invalidate(guild, role)
         return model
 
     @classmethod
-    @cache(ttl="24h", key="autorole:{guild}:{role}")
     async def fetch(cls, guild: hikari.Snowflake, role: hikari.Snowflake) -> DatabaseAutoRole | None:
-        record = await cls.db.fetchrow("""select * from autorole where guild_id=$1 and role_id=$2""",
-                                       guild,
-                                       role)
+        model = await cls.cache.get((guild, role), lambda: cls._fetch(guild, role), tags=(guild_tag(guild),))
 
-        if not record:
+        if not model:
             raise errors.RoleDoesNotExist()
 
-        return cls._parse_record(record)
+        return model
+
+    @classmethod
+    async def _fetch(cls, guild: hikari.Snowflake, role: hikari.Snowflake) -> DatabaseAutoRole | None:
+        return await cls.db.fetch_one(_fetch_autorole, guild, role)
 
     @classmethod
-    @cache(ttl="24h", key="autorole:{guild}")
     async def fetch_all(cls, guild: hikari.Snowflake) -> list[DatabaseAutoRole]:
-        records = await cls.db.fetch("""select * from autorole where guild_id=$1""",
-                                     guild)
+        return await cls.cache.get(guild, lambda: cls._fetch_all(guild), tags=(guild_tag(guild),))
 
-        return [cls._parse_record(record) for record in records]
+    @classmethod
+    async def _fetch_all(cls, guild: hikari.Snowflake) -> list[DatabaseAutoRole]:
+        return await cls.db.fetch_many(_fetch_guild_autoroles, guild)
 
 
 @attr.define()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import typing
 
 import hikari
@@ -7,35 +8,141 @@ import lightbulb
 
 from loguru import logger
 
+from airy.models.errors import DatabaseUnavailableError
 from airy.services import BaseService
 from airy.utils import helpers
 
 from .models import DatabaseReactionRole, ReactionRoleType, DatabaseReactionRoleEntry
+from .mutations import RoleMutationBuffer
 
 if typing.TYPE_CHECKING:
     from airy.models.bot import Airy
 
 
+# Seconds between two sweeps for reaction roles of deleted channels, and the amount of rows checked per query
+_SWEEP_INTERVAL = 3600
+_SWEEP_BATCH_SIZE = 500
+
+
 class ReactionRolesServiceT(BaseService):
+    mutations: RoleMutationBuffer = RoleMutationBuffer()
+    _sweeper: asyncio.Task[None] | None = None
+
     @classmethod
     async def on_startup(cls, event: hikari.StartedEvent):
+        cls.mutations.start(cls.bot)
+
+        try:
+            count = await DatabaseReactionRole.load_index()
+            logger.info("Indexed {} reaction role messages", count)
+        except Exception as error:
+            # Every reaction is looked up in the database until the index is loaded
+            logger.error("Failed to load the reaction role index: {}", error)
+
         cls.bot.subscribe(hikari.MessageDeleteEvent, cls.on_delete_message)
+        cls.bot.subscribe(hikari.GuildBulkMessageDeleteEvent, cls.on_bulk_delete_messages)
+        cls.bot.subscribe(hikari.GuildChannelDeleteEvent, cls.on_delete_channel)
+        cls.bot.subscribe(hikari.GuildThreadDeleteEvent, cls.on_delete_thread)
         cls.bot.subscribe(hikari.ReactionAddEvent, cls._on_reaction_add)
         cls.bot.subscribe(hikari.ReactionDeleteEvent, cls._on_reaction_remove)
         cls.bot.subscribe(hikari.RoleDeleteEvent, cls.on_delete_role)
 
+        if cls._sweeper is None:
+            cls._sweeper = asyncio.create_task(cls._sweep_orphans())
+
     @classmethod
     async def on_shutdown(cls, event: hikari.StoppedEvent | None = None):
         cls.bot.unsubscribe(hikari.MessageDeleteEvent, cls.on_delete_message)
+        cls.bot.unsubscribe(hikari.GuildBulkMessageDeleteEvent, cls.on_bulk_delete_messages)
+        cls.bot.unsubscribe(hikari.GuildChannelDeleteEvent, cls.on_delete_channel)
+        cls.bot.unsubscribe(hikari.GuildThreadDeleteEvent, cls.on_delete_thread)
         cls.bot.unsubscribe(hikari.ReactionAddEvent, cls._on_reaction_add)
         cls.bot.unsubscribe(hikari.ReactionDeleteEvent, cls._on_reaction_remove)
         cls.bot.unsubscribe(hikari.RoleDeleteEvent, cls.on_delete_role)
+        cls.mutations.stop()
+
+        if cls._sweeper is not None:
+            cls._sweeper.cancel()
+            cls._sweeper = None
 
     @classmethod
     async def on_delete_message(cls, event: hikari.MessageDeleteEvent):
-        model = await DatabaseReactionRole.fetch(event.channel_id, event.message_id)
-        if model:
-            await model.delete()
+        # Messages without reaction roles are skipped by the index, without a query
+        await DatabaseReactionRole.delete_by_messages(event.channel_id, (event.message_id,))
+
+    @classmethod
+    async def on_bulk_delete_messages(cls, event: hikari.GuildBulkMessageDeleteEvent):
+        count = await DatabaseReactionRole.delete_by_messages(event.channel_id, event.message_ids)
+        if count:
+            logger.info("Remove {} Reaction role messages of a purge in guild {}", count, event.guild_id)
+
+    @classmethod
+    async def on_delete_channel(cls, event: hikari.GuildChannelDeleteEvent):
+        count = await DatabaseReactionRole.delete_by_channels((event.channel_id,))
+        if count:
+            logger.info("Remove {} Reaction role messages of a deleted channel in guild {}", count, event.guild_id)
+
+    @classmethod
+    async def on_delete_thread(cls, event: hikari.GuildThreadDeleteEvent):
+        count = await DatabaseReactionRole.delete_by_channels((event.thread_id,))
+        if count:
+            logger.info("Remove {} Reaction role messages of a deleted thread in guild {}", count, event.guild_id)
+
+    @classmethod
+    async def _sweep_orphans(cls) -> None:
+        """Periodically delete reaction roles in channels that were deleted while the bot was offline."""
+        while True:
+            await asyncio.sleep(_SWEEP_INTERVAL)
+            try:
+                count = await cls.sweep_orphans()
+            except DatabaseUnavailableError:
+                continue
+            except Exception as error:
+                logger.error("Failed to sweep orphaned reaction roles: {}", error)
+                continue
+
+            if count:
+                logger.info("Swept {} orphaned Reaction role messages", count)
+
+    @classmethod
+    async def sweep_orphans(cls) -> int:
+        """Delete the reaction roles of deleted channels and threads, in batches.
+
+        Only guilds that are cached and available are checked, a guild that is not cached says nothing
+        about its channels. Archived threads are not cached either, so a channel missing from the cache
+        is only treated as deleted once fetching it fails with `NotFoundError`.
+
+        Returns
+        -------
+        int
+            The amount of deleted reaction role messages.
+        """
+        count = 0
+        after = 0
+        while batch := await DatabaseReactionRole.fetch_batch(after, _SWEEP_BATCH_SIZE):
+            after = batch[-1][0]
+            missing = {
+                channel_id
+                for _, guild_id, channel_id in batch
+                if guild_id in cls.bot.cache.get_guilds_view()
+                and guild_id not in cls.bot.cache.get_unavailable_guilds_view()
+                and cls.bot.cache.get_guild_channel(channel_id) is None
+                and cls.bot.cache.get_thread(channel_id) is None
+            }
+            orphaned = [channel_id for channel_id in missing if await cls._is_deleted(channel_id)]
+            count += await DatabaseReactionRole.delete_by_channels(orphaned)
+
+        return count
+
+    @classmethod
+    async def _is_deleted(cls, channel_id: hikari.Snowflake) -> bool:
+        try:
+            await cls.bot.rest.fetch_channel(channel_id)
+        except hikari.NotFoundError:
+            return True
+        except hikari.HTTPError:
+            return False  # E.g. no access to the channel anymore, it may still exist
+        return False
 
     @classmethod
     async def on_delete_role(cls, event: hikari.RoleDeleteEvent):
@@ -47,9 +154,15 @@ class ReactionRolesServiceT(BaseService):
             event: hikari.ReactionAddEvent | hikari.ReactionDeleteEvent,
             added: bool = True
     ) -> None:
+        # Nearly all reactions are on messages without reaction roles, skip them before any other work
+        if not DatabaseReactionRole.has_message(event.channel_id, event.message_id):
+            return None
 
-        channel = cls.bot.cache.get_guild_channel(event.channel_id)
-        me = cls.bot.cache.get_member(channel.guild_id, cls.bot.user_id)  # type: ignore
+        if not isinstance(event, hikari.GuildReactionEvent):
+            return None
+
+        # Taken from the event, threads are not guild channels of the cache
+        me = cls.bot.cache.get_member(event.guild_id, cls.bot.user_id)
 
         if not me or cls.bot.user_id == event.user_id:
             return None
@@ -57,27 +170,35 @@ class ReactionRolesServiceT(BaseService):
         if not helpers.includes_permissions(lightbulb.utils.permissions_for(me), hikari.Permissions.MANAGE_ROLES):
             return None
 
-        if event.emoji_id:
-            emoji = hikari.Emoji.parse(f"<:{event.emoji_name}:{event.emoji_id}>")
-        else:
-            emoji = hikari.Emoji.parse(event.emoji_name)  # type: ignore
-
         action: bool | None = None  # None - do nothing, False - remove, True - add
 
-        model: DatabaseReactionRole = await DatabaseReactionRole.fetch(event.channel_id, event.message_id)
+        try:
+            model: DatabaseReactionRole = await DatabaseReactionRole.fetch(event.channel_id, event.message_id)
+        except DatabaseUnavailableError:
+            # Drop the reaction instead of queueing handlers up while the database is down
+            return
 
         if not model:
             return
 
-        member = cls.bot.cache.get_member(channel.guild_id, event.user_id)
-        role_id = model.get_role_by_emoji(emoji)
+        # Looked up by the raw event fields, custom emojis by id and unicode emojis by their string
+        role_id = model.get_role(event.emoji_id or event.emoji_name)  # type: ignore
+        if role_id is None:
+            return
+
+        member = cls.bot.cache.get_member(event.guild_id, event.user_id)
+        if not member:
+            return
+
+        # Includes changes that are still pending, so quick toggles are not checked against outdated roles
+        member_role_ids = cls.mutations.role_ids(member)
         roles_id = [entry.role_id for entry in model.entries]
 
         if model.type == ReactionRoleType.NORMAL:
             action = added
         elif model.type == ReactionRoleType.UNIQUE:
             for check_role_id in roles_id:
-                if check_role_id in member.role_ids:
+                if check_role_id in member_role_ids:
                     action = False
                     break
             else:
@@ -88,21 +209,12 @@ class ReactionRolesServiceT(BaseService):
             action = added and False
         elif model.type == ReactionRoleType.REVERSED:
             action = not added
-        d = role_id in member.role_ids
+        d = role_id in member_role_ids
         if d == action:
             return
 
-        try:
-            if action:
-                await cls.bot.rest.add_role_to_member(guild=model.guild_id, user=event.user_id, role=role_id,
-                                                      reason="Reaction role")
-                logger.info("Add Reaction role {} to user {} in guild {}", role_id, member.id, model.guild_id)
-            else:
-                await cls.bot.rest.remove_role_from_member(guild=model.guild_id, user=event.user_id, role=role_id,
-                                                           reason="Reaction role")
-                logger.info("Remove Reaction role {} from user {} in guild {}", role_id, member.id, model.guild_id)
-        except (hikari.ForbiddenError, hikari.NotFoundError):
-            pass
+        # Applied together with the other changes of the member in a single request
+        cls.mutations.put(model.guild_id, event.user_id, role_id, bool(action))
 
     @classmethod
     async def _on_reaction_add(cls, event: hikari.ReactionAddEvent):
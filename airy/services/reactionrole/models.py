@@ -3,25 +3,87 @@ from __future__ import annotations
 import enum
 import typing
 
+import attr
 import hikari
 
-from pydantic import BaseModel, validator
 from asyncpg import Record  # type:  ignore
-from cashews import Cache  # type:  ignore
 
 from airy.models.db.impl import DatabaseModel
+from airy.models.db.impl.cache import ModelCache, guild_tag
+from airy.models.db.impl.statements import statement
 
 __all__ = ("DatabaseReactionRole", "DatabaseReactionRoleEntry", "ReactionRoleType")
 
-cache = Cache()
-cache.setup("mem://?size=1000", prefix="reaction_role")
-
 _insert_base_sql = """insert into reactionrole 
                        (guild_id, channel_id, message_id, type, max) 
                        VALUES ($1, $2, $3, $4, $5) returning id"""
 
 _insert_entry_base_sql = """insert into reactionrole_entry (id, role_id, emoji) VALUES ($1, $2, $3)"""
 
+_fetch_index_sql = """select channel_id, message_id from reactionrole"""
+
+_fetch_batch_sql = """select id, guild_id, channel_id from reactionrole where id > $1 order by id limit $2"""
+
+_delete_messages_sql = """delete from reactionrole where channel_id=$1 and message_id = ANY($2::bigint[])
+                          returning guild_id, channel_id, message_id"""
+
+_delete_channels_sql = """delete from reactionrole where channel_id = ANY($1::bigint[])
+                          returning guild_id, channel_id, message_id"""
+
+
+EmojiKey = typing.Union[int, str]
+"""The id of a custom emoji or the string of a unicode emoji, as found in the fields of reaction events."""
+
+
+def emoji_key(emoji: hikari.Emoji) -> EmojiKey:
+    return emoji.id if isinstance(emoji, hikari.CustomEmoji) else emoji.name
+
+
+def _build_reaction_role(record: Record) -> DatabaseReactionRole:
+    entries = [DatabaseReactionRoleEntry(id=record["id"],
+                                         role_id=hikari.Snowflake(role_id),
+                                         emoji=hikari.Emoji.parse(emoji))
+               for role_id, emoji in zip(record["role_ids"], record["emojis"])]
+
+    return DatabaseReactionRole(id=record["id"],
+                                guild_id=hikari.Snowflake(record["guild_id"]),
+                                channel_id=hikari.Snowflake(record["channel_id"]),
+                                message_id=hikari.Snowflake(record["message_id"]),
+                                type=ReactionRoleType(record["type"]),
+                                max=record["max"],
+                                entries=entries)
+
+
+# A single row per message, with its entries aggregated into arrays in the same order
+_fetch_reaction_role = statement(
+    """select rr.id, rr.guild_id, rr.channel_id, rr.message_id, rr.type, rr.max,
+              array_remove(array_agg(re.role_id), NULL) AS role_ids,
+              array_remove(array_agg(re.emoji), NULL) AS emojis
+       from reactionrole rr left join reactionrole_entry re on rr.id = re.id
+       where rr.channel_id=$1 and rr.message_id=$2
+       group by rr.id""",
+    _build_reaction_role,
+)
+_fetch_reaction_roles_by_role = statement(
+    """select rr.id, rr.guild_id, rr.channel_id, rr.message_id, rr.type, rr.max,
+              array_remove(array_agg(re.role_id), NULL) AS role_ids,
+              array_remove(array_agg(re.emoji), NULL) AS emojis
+       from reactionrole rr left join reactionrole_entry re on rr.id = re.id
+       where rr.guild_id=$1 and rr.id in (select id from reactionrole_entry where role_id=$2)
+       group by rr.id""",
+    _build_reaction_role,
+)
+_fetch_guild_reaction_roles = statement(
+    """select rr.id, rr.guild_id, rr.channel_id, rr.message_id, rr.type, rr.max,
+              array_remove(array_agg(re.role_id), NULL) AS role_ids,
+              array_remove(array_agg(re.emoji), NULL) AS emojis
+       from reactionrole rr left join reactionrole_entry re on rr.id = re.id
+       where rr.guild_id=$1
+       group by rr.id
+       order by rr.id""",
+    _build_reaction_role,
+)
+
 
 class ReactionRoleType(enum.IntEnum):
     NORMAL = 0
@@ -38,23 +100,15 @@ class ReactionRoleType(enum.IntEnum):
     # """You can only choose one role and you can not swap between roles"""
 
 
-class DatabaseReactionRoleEntry(BaseModel, DatabaseModel):
+@attr.frozen()
+class DatabaseReactionRoleEntry(DatabaseModel):
     id: int
     role_id: hikari.Snowflake
     emoji: hikari.Emoji
 
-    class Config:
-        arbitrary_types_allowed = True
-
-    @classmethod
-    def serialize(cls, record: Record):
-        return DatabaseReactionRoleEntry(id=record.get("entry_id"),
-                                         role_id=hikari.Snowflake(record.get("role_id")),
-                                         emoji=hikari.Emoji.parse(record.get("emoji"))
-                                         )
 
-
-class DatabaseReactionRole(BaseModel, DatabaseModel):
+@attr.define()
+class DatabaseReactionRole(DatabaseModel):
     id: int
     guild_id: hikari.Snowflake
     channel_id: hikari.Snowflake
@@ -62,18 +116,62 @@ class DatabaseReactionRole(BaseModel, DatabaseModel):
     type: ReactionRoleType
     max: int
 
-    entries: list[DatabaseReactionRoleEntry] = []
+    entries: list[DatabaseReactionRoleEntry] = attr.field(factory=list)
+
+    roles_by_emoji: dict[EmojiKey, hikari.Snowflake] = attr.field(init=False, repr=False, eq=False)
+    """The role of every entry, keyed by `emoji_key` of its emoji. Rebuilt by `reindex`."""
+
+    # Keyed by (channel_id, message_id) for single messages and by guild_id for every message of a guild
+    cache: typing.ClassVar[ModelCache[typing.Any, typing.Any]] = ModelCache(ttl=86400)
+
+    # Every (channel_id, message_id) with reaction roles, None until `load_index` succeeded
+    index: typing.ClassVar[set[tuple[int, int]] | None] = None
+
+    def __attrs_post_init__(self) -> None:
+        self.reindex()
+
+    def cache_keys(self) -> tuple[typing.Hashable, ...]:
+        return (self.channel_id, self.message_id), self.guild_id
+
+    def reindex(self) -> None:
+        """Rebuild `roles_by_emoji` after `entries` changed."""
+        self.roles_by_emoji = {emoji_key(entry.emoji): entry.role_id for entry in self.entries}
 
     @classmethod
-    def serialize(cls, record: Record, entries: typing.Optional[list[DatabaseReactionRoleEntry]] = None):
-        return DatabaseReactionRole(**record, entries=entries if entries else [])
+    async def load_index(cls) -> int:
+        """Load the messages that have reaction roles, so reactions on other messages are ignored without a query.
+
+        Returns
+        -------
+        int
+            The amount of indexed messages.
+        """
+        records = await cls.db.fetch(_fetch_index_sql)
+        # Messages created while the index was loading are kept, deleted ones only cost a query
+        cls.index = {(record[0], record[1]) for record in records} | (cls.index or set())
+        return len(cls.index)
 
-    def get_role_by_emoji(self, emoji: hikari.Emoji) -> hikari.Snowflake | None:
-        for entry in self.entries:
-            if entry.emoji == emoji:
-                return entry.role_id
+    @classmethod
+    def has_message(cls, channel: hikari.Snowflake, message: hikari.Snowflake) -> bool:
+        """Whether a message may have reaction roles. Always True while the index is not loaded."""
+        return cls.index is None or (channel, message) in cls.index
+
+    @classmethod
+    def _index_add(cls, channel: hikari.Snowflake, message: hikari.Snowflake) -> None:
+        if cls.index is not None:
+            cls.index.add((channel, message))
+
+    @classmethod
+    def _index_discard(cls, channel: hikari.Snowflake, message: hikari.Snowflake) -> None:
+        if cls.index is not None:
+            cls.index.discard((channel, message))
 
-        return None
+    def get_role(self, key: EmojiKey) -> hikari.Snowflake | None:
+        """The role of an emoji, by its custom emoji id or unicode string."""
+        return self.roles_by_emoji.get(key)
+
+    def get_role_by_emoji(self, emoji: hikari.Emoji) -> hikari.Snowflake | None:
+        return self.roles_by_emoji.get(emoji_key(emoji))
 
     @classmethod
     async def create(
@@ -86,15 +184,18 @@ class DatabaseReactionRole(BaseModel, DatabaseModel):
             roles: list[hikari.Snowflake],
             emojis: list[hikari.Emoji],
     ) -> DatabaseReactionRole:
-        model_id = await DatabaseReactionRole.db.fetchval(_insert_base_sql, guild, channel, message, role_type, max_roles)
-
-        entries = []
+        async with DatabaseReactionRole.db.transaction():
+            model_id = await DatabaseReactionRole.db.fetchval(_insert_base_sql,
+                                                              guild, channel, message, role_type, max_roles)
+            await DatabaseReactionRole.db.executemany(_insert_entry_base_sql,
+                                                      [(model_id, role, emoji.mention)
+                                                       for role, emoji in zip(roles, emojis)])
 
-        for role, emoji in zip(roles, emojis):
-            await DatabaseReactionRole.db.execute(_insert_entry_base_sql, model_id, role, emoji.mention)
-            entries.append(DatabaseReactionRoleEntry(id=model_id, role_id=role, emoji=emoji))
+        cls._index_add(channel, message)
+        entries = [DatabaseReactionRoleEntry(id=model_id, role_id=role, emoji=emoji)
+                   for role, emoji in zip(roles, emojis)]
 
-        await cache.delete(key=f"reaction_role:{channel}:{message}")
+        cls.cache.invalidate((channel, message), guild)
 
         return DatabaseReactionRole(id=model_id,
                                     guild_id=guild,
@@ -116,8 +217,7 @@ class DatabaseReactionRole(BaseModel, DatabaseModel):
 
         await DatabaseReactionRole.db.execute(sql,
                                               self.guild_id, self.channel_id, self.message_id, self.type, self.max)
-
-        await cache.delete(key=f"reaction_role:{self.channel_id}:{self.message_id}")
+        self._index_add(self.channel_id, self.message_id)
 
     async def delete(
             self
@@ -125,8 +225,7 @@ class DatabaseReactionRole(BaseModel, DatabaseModel):
 
         sql = """delete from reactionrole where channel_id=$1 and message_id=$2"""
         await DatabaseReactionRole.db.execute(sql, self.channel_id, self.message_id)
-
-        await cache.delete(key=f"reaction_role:{self.channel_id}:{self.message_id}")
+        self._index_discard(self.channel_id, self.message_id)
 
     async def add_entries(
             self,
@@ -136,7 +235,8 @@ class DatabaseReactionRole(BaseModel, DatabaseModel):
         sql = """insert into reactionrole_entry (id, role_id, emoji) VALUES ($1, $2, $3) ON CONFLICT DO NOTHING"""
         await self.db.executemany(sql, [(entry.id, entry.role_id, entry.emoji.mention) for entry in entries])
         self.entries.extend(entries)
-        await cache.delete(key=f"reaction_role:{self.channel_id}:{self.message_id}")
+        self.reindex()
+        self.cache.invalidate(*self.cache_keys())
 
     async def remove_entries(
             self,
@@ -144,14 +244,77 @@ class DatabaseReactionRole(BaseModel, DatabaseModel):
     ) -> None:
 
         sql = """delete from reactionrole_entry where id=$1 and role_id=$2 and emoji=$3"""
-        await self.db.executemany(sql, [(entry.id, entry.role_id, entry.emoji.mention) for entry in entries])
+        removed = set(entries)
+        remaining = [entry for entry in self.entries if entry not in removed]
 
-        self.entries = list(set(self.entries.copy()) - set(entries))
+        try:
+            async with self.db.transaction():
+                await self.db.executemany(sql, [(entry.id, entry.role_id, entry.emoji.mention) for entry in entries])
+                if not remaining:
+                    await self.delete()
+        except BaseException:
+            # The message may have been dropped from the index before the transaction was rolled back
+            self._index_add(self.channel_id, self.message_id)
+            raise
 
-        if not self.entries:
-            await self.delete()
+        self.entries = remaining
+        self.reindex()
 
-        await cache.delete(key=f"reaction_role:{self.channel_id}:{self.message_id}")
+        self.cache.invalidate(*self.cache_keys())
+
+    @classmethod
+    async def delete_by_messages(
+            cls,
+            channel: hikari.Snowflake,
+            messages: typing.Collection[hikari.Snowflake],
+    ) -> int:
+        """Delete the reaction roles of several messages of a channel at once, e.g. after a purge.
+
+        Returns
+        -------
+        int
+            The amount of deleted reaction role messages.
+        """
+        messages = [message for message in messages if cls.has_message(channel, message)]
+        if not messages:
+            return 0
+
+        records = await cls.db.fetch(_delete_messages_sql, channel, messages)
+        cls._evict(records)
+        return len(records)
+
+    @classmethod
+    async def delete_by_channels(cls, channels: typing.Collection[hikari.Snowflake]) -> int:
+        """Delete the reaction roles of every message in the given channels.
+
+        Returns
+        -------
+        int
+            The amount of deleted reaction role messages.
+        """
+        if not channels:
+            return 0
+
+        records = await cls.db.fetch(_delete_channels_sql, list(channels))
+        cls._evict(records)
+        return len(records)
+
+    @classmethod
+    def _evict(cls, records: list[Record]) -> None:
+        # The records of deleted reaction roles, as (guild_id, channel_id, message_id)
+        for guild_id, channel_id, message_id in records:
+            cls._index_discard(channel_id, message_id)
+            cls.cache.invalidate((channel_id, message_id), guild_id)
+
+    @classmethod
+    async def fetch_batch(
+            cls,
+            after: int = 0,
+            limit: int = 500
+    ) -> list[tuple[int, hikari.Snowflake, hikari.Snowflake]]:
+        """Get the (id, guild_id, channel_id) of stored reaction role messages with an id above `after`, by id."""
+        records = await cls.db.fetch(_fetch_batch_sql, after, limit)
+        return [(record[0], hikari.Snowflake(record[1]), hikari.Snowflake(record[2])) for record in records]
 
     @classmethod
     async def delete_all_by_role(
@@ -166,24 +329,26 @@ class DatabaseReactionRole(BaseModel, DatabaseModel):
             await model.remove_entries([entry for entry in model.entries if entry.role_id == role])
 
     @classmethod
-    @cache(ttl="24h", key="reaction_role:{channel}:{message}")
     async def fetch(
             cls,
             channel: hikari.Snowflake,
             message: hikari.Snowflake,
     ) -> DatabaseReactionRole | None:
+        # Concurrent reactions on an uncached message share a single query
+        return await cls.cache.get(
+            (channel, message),
+            lambda: cls._fetch(channel, message),
+            tags=lambda model: (guild_tag(model.guild_id),) if model else (),
+        )
 
-        sql = """select rr.*, re.id as entry_id, re.role_id, re.emoji from reactionrole rr 
-                                left join reactionrole_entry re on rr.id = re.id 
-                                where rr.channel_id=$1 and message_id=$2"""
-
-        records = await DatabaseReactionRole.db.fetch(sql, channel, message)
-        if not records:
-            return None
-        entries = [DatabaseReactionRoleEntry.serialize(record) for record in records]
-        model = cls.serialize(records[0], entries)
+    @classmethod
+    async def _fetch(
+            cls,
+            channel: hikari.Snowflake,
+            message: hikari.Snowflake,
+    ) -> DatabaseReactionRole | None:
 
-        return model
+        return await cls.db.fetch_one(_fetch_reaction_role, channel, message)
 
     @classmethod
     async def fetch_by_role(
@@ -192,46 +357,20 @@ class DatabaseReactionRole(BaseModel, DatabaseModel):
             role: hikari.Snowflake
     ) -> list[DatabaseReactionRole]:
 
-        select_sql = """select rr.*, re.id as entry_id, re.role_id, re.emoji from reactionrole as rr 
-                                    left join reactionrole_entry as  re on rr.id = re.id 
-                                    where rr.guild_id=$1 and re.role_id=$2"""
-
-        records = await DatabaseReactionRole.db.fetch(select_sql, guild, role)
-
-        parsed_records: dict[hikari.Snowflake, list[Record]] = {}
-
-        for record in records:
-            message_id = record.get("message_id")
-            if not parsed_records.get(message_id):
-                parsed_records[message_id] = [record]
-            else:
-                parsed_records[message_id].append(record)
-
-        models: list[DatabaseReactionRole] = []
-
-        for records in parsed_records.values():
-            entries: list[DatabaseReactionRoleEntry] = []
-            for record in records:
-                entries.append(DatabaseReactionRoleEntry.serialize(record))
-
-            model = DatabaseReactionRole.serialize(records[0], entries)
-
-            models.append(model)
-
-        return models
+        return await cls.db.fetch_many(_fetch_reaction_roles_by_role, guild, role)
 
     @classmethod
-    @cache(ttl="24h", key="reaction_role:{guild}")
     async def fetch_all(
             cls,
             guild: hikari.Snowflake
     ) -> list[DatabaseReactionRole]:
+        # Every write to a message evicts both its own key and the key of its guild, see `cache_keys`
+        return await cls.cache.get(guild, lambda: cls._fetch_all(guild), tags=(guild_tag(guild),))
 
-        sql = """select channel_id, message_id from reactionrole where guild_id=$1"""
-
-        records = await DatabaseReactionRole.db.fetch(sql, guild)
-        if not records:
-            return []
+    @classmethod
+    async def _fetch_all(
+            cls,
+            guild: hikari.Snowflake
+    ) -> list[DatabaseReactionRole]:
 
-        models = [await cls.fetch(record.get("channel_id"), record.get("message_id")) for record in records]
-        return models
+        return await cls.db.fetch_many(_fetch_guild_reaction_roles, guild)
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import typing
+
+import hikari
+
+from loguru import logger
+
+if typing.TYPE_CHECKING:
+    from airy.models.bot import Airy
+
+__all__ = ("RoleMutationBuffer",)
+
+_MemberKey = tuple[hikari.Snowflake, hikari.Snowflake]
+
+
+def _overlay(roles: set[hikari.Snowflake], changes: dict[hikari.Snowflake, bool]) -> None:
+    for role, add in changes.items():
+        if add:
+            roles.add(role)
+        else:
+            roles.discard(role)
+
+
+def _forget_confirmed(applied: dict[hikari.Snowflake, bool], role_ids: typing.Collection[hikari.Snowflake]) -> None:
+    for role, add in list(applied.items()):
+        if (role in role_ids) == add:
+            del applied[role]
+
+
+class RoleMutationBuffer:
+    """
+    Coalesces the role changes of a member and applies them with a single request.
+
+    Changes queued for the same member within `delay` seconds are merged, the last change of a role wins.
+    The new role list is computed from the cached roles of the member and set with one `edit_member` call,
+    changes that cancel each other out do not cause a request at all.
+
+    Sent changes stay on top of the cached roles until the gateway reports them, so a later edit does not
+    revert them. Only the roles changed by this buffer are overlaid, changes made by others are kept.
+    """
+
+    def __init__(self, *, delay: float = 0.5, confirm_timeout: float = 10.0) -> None:
+        """
+        Parameters
+        ----------
+        delay : float
+            The amount of seconds changes of a member are collected before they are applied.
+        confirm_timeout : float
+            The amount of seconds sent changes are overlaid at most while waiting for the gateway to report them.
+        """
+        self.delay: float = delay
+        self.confirm_timeout: float = confirm_timeout
+        self._app: Airy | None = None
+        self._pending: dict[_MemberKey, dict[hikari.Snowflake, bool]] = {}
+        # Changes that are being sent or were sent, but are not in the member cache yet
+        self._applied: dict[_MemberKey, dict[hikari.Snowflake, bool]] = {}
+        self._tasks: dict[_MemberKey, asyncio.Task[None]] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def start(self, app: Airy) -> None:
+        self._app = app
+
+    def stop(self) -> None:
+        """Cancel every running apply, dropping pending changes."""
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        self._applied.clear()
+
+        if self._pending:
+            logger.warning("Dropping pending role changes of {} members", len(self._pending))
+            self._pending.clear()
+
+    def put(self, guild: hikari.Snowflake, user: hikari.Snowflake, role: hikari.Snowflake, add: bool) -> None:
+        """Queue adding or removing a role of a member."""
+        key = (guild, user)
+        self._pending.setdefault(key, {})[role] = add
+
+        if key not in self._tasks:
+            self._tasks[key] = asyncio.create_task(self._apply_later(key))
+
+    def role_ids(self, member: hikari.Member) -> set[hikari.Snowflake]:
+        """The roles a member will have once its sent and pending changes are applied."""
+        key = (member.guild_id, member.id)
+        roles = set(member.role_ids)
+        _overlay(roles, self._applied.get(key, {}))
+        _overlay(roles, self._pending.get(key, {}))
+        return roles
+
+    async def _apply_later(self, key: _MemberKey) -> None:
+        assert self._app is not None
+        applied = self._applied.setdefault(key, {})
+        deadline = time.monotonic() + self.confirm_timeout
+        try:
+            while True:
+                await asyncio.sleep(self.delay)
+                changes = self._pending.pop(key, None)
+                if changes:
+                    try:
+                        await self._apply(*key, changes, applied)
+                    except Exception as error:
+                        logger.error("Failed to change roles of user {} in guild {}: {}", key[1], key[0], error)
+                    deadline = time.monotonic() + self.confirm_timeout
+                    continue
+
+                # Keep overlaying the sent changes until the member cache caught up with them
+                member = self._app.cache.get_member(*key)
+                if member:
+                    _forget_confirmed(applied, member.role_ids)
+                if not member or not applied or time.monotonic() >= deadline:
+                    return
+        finally:
+            self._tasks.pop(key, None)
+            self._applied.pop(key, None)
+
+    async def _apply(
+            self,
+            guild: hikari.Snowflake,
+            user: hikari.Snowflake,
+            changes: dict[hikari.Snowflake, bool],
+            applied: dict[hikari.Snowflake, bool],
+    ) -> None:
+        assert self._app is not None
+
+        member = self._app.cache.get_member(guild, user)
+        if not member:
+            return
+
+        current = set(member.role_ids)
+        # Earlier changes reported by the gateway are in the cache now, the others are added on top of it
+        _forget_confirmed(applied, current)
+        _overlay(current, applied)
+        current.discard(guild)  # The @everyone role can not be set
+
+        roles = current.copy()
+        _overlay(roles, changes)
+        if roles == current:
+            return
+
+        previous = applied.copy()
+        applied.update(changes)
+        try:
+            await self._app.rest.edit_member(guild, user, roles=roles, reason="Reaction role")
+        except BaseException as error:
+            # The roles did not change, forget about the changes again
+            applied.clear()
+            applied.update(previous)
+            if isinstance(error, (hikari.ForbiddenError, hikari.NotFoundError)):
+                return
+            raise
+
+        for role in roles - current:
+            logger.info("Add Reaction role {} to user {} in guild {}", role, user, guild)
+        for role in current - roles:
+            logger.info("Remove Reaction role {} from user {} in guild {}", role, user, guild)
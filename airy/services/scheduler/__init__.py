@@ -3,20 +3,29 @@ from __future__ import annotations
 import asyncio
 import copy
 import datetime
-import re
+import json
+import os
+import socket
+import time
 import traceback
 import typing
 
-import dateparser  # type: ignore
 import hikari
 
 from hikari.internal.enums import Enum
 from loguru import logger
 from tortoise.expressions import Q
 
+from airy.etc.settings import scheduler_settings
 from airy.models.db import DatabaseUser
+from airy.services.scheduler.dispatcher import TimerDispatcher
 from airy.services.scheduler.events import BaseTimerEvent, timers_dict_enum_to_class
+from airy.services.scheduler.metrics import SchedulerMetrics
 from airy.services.scheduler.models import DatabaseTimer, TimerEnum
+from airy.services.scheduler.parser import TimeParser
+from airy.services.scheduler.queue import TimerQueue
+from airy.services.scheduler.recurrence import Recurrence
+from airy.services.scheduler.writes import TimerWriteBuffer
 from airy.utils.tasks import IntervalLoop
 from airy.utils.time import utcnow
 
@@ -28,6 +37,54 @@ __all__ = ("ConversionMode",
 
 BaseTimerEventT = typing.TypeVar('BaseTimerEventT', bound=BaseTimerEvent)
 
+# Raw statements run through `Database`, the `execute_query` of Tortoise
+# returns no rows at all for statements starting with UPDATE or DELETE.
+
+# $3 is the lease owner when running in lease mode, NULL otherwise
+_claim_due_sql = """DELETE FROM timer
+                    WHERE id = ANY($1) AND expires <= $2 AND recurrence IS NULL
+                      AND ($3::text IS NULL OR lease_owner = $3)
+                    RETURNING *"""
+
+_advance_due_sql = """UPDATE timer AS t SET expires = v.next
+                      FROM unnest($1::int[], $4::timestamptz[]) AS v (id, next)
+                      WHERE t.id = v.id AND t.expires <= $2 AND t.recurrence IS NOT NULL
+                        AND ($3::text IS NULL OR t.lease_owner = $3)
+                      RETURNING t.*"""
+
+# Claims every timer of this node's shards in the window that is not leased by a live node,
+# SKIP LOCKED keeps nodes from blocking on rows another node is claiming at the same time.
+_lease_sql = """UPDATE timer SET lease_owner = $1, lease_expires = $2
+                WHERE id IN (
+                    SELECT id FROM timer
+                    WHERE expires < $3
+                      AND (lease_owner IS NULL OR lease_owner = $1 OR lease_expires < $4)
+                      AND (guild_id >> 22) % $5 = ANY($6)
+                    ORDER BY expires, id
+                    LIMIT $7
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING *"""
+
+_renew_leases_sql = """UPDATE timer SET lease_expires = $2 WHERE lease_owner = $1"""
+
+_release_leases_sql = """UPDATE timer SET lease_owner = NULL, lease_expires = NULL WHERE lease_owner = $1"""
+
+_find_claimable_sql = """SELECT 1 FROM timer
+                         WHERE expires < $2
+                           AND (lease_owner IS NULL OR (lease_owner != $1 AND lease_expires < $3))
+                           AND (guild_id >> 22) % $4 = ANY($5)
+                         LIMIT 1"""
+
+# Columns of claimed timers that are written back when they could not be dispatched
+_restore_columns = ("id", "guild_id", "user_id", "channel_id", "expires", "created", "event", "extra", "recurrence")
+_restore_types = ("int", "bigint", "bigint", "bigint", "timestamptz", "timestamptz", "smallint", "jsonb", "text")
+
+# Seconds `close` waits for pending events to be dispatched before handing them back to the database
+_CLOSE_TIMEOUT = 10.0
+
+_notify_channel = "timer_changes"  # See migrations/V3__Timer_notifications.sql
+
 
 class ConversionMode(int, Enum):
     """All possible time conversion modes."""
@@ -43,27 +100,95 @@ class SchedulerServiceT:
     Essentially the internal scheduler of the bot.
     """
 
-    def __init__(self):
+    def __init__(
+            self,
+            *,
+            window: datetime.timedelta = datetime.timedelta(hours=6),
+            max_queue_size: int = 10_000,
+            batch_size: int = 500,
+            dispatcher: TimerDispatcher | None = None,
+            lease: bool = False,
+            lease_ttl: datetime.timedelta = datetime.timedelta(minutes=5),
+            lease_owner: str | None = None,
+            notify: bool = False,
+            write_delay: float = 1.0,
+    ):
         self.app: Airy | None = None
         self._is_started: bool = False
         self._current_timer: DatabaseTimer | None = None  # Currently, active timer that is being awaited
         self._current_task: asyncio.Task | None = None  # Current task that is handling current_timer
         self._timer_loop: IntervalLoop | None = None
+        self._window: datetime.timedelta = window  # How far ahead timers are loaded into memory
+        self._queue: TimerQueue = TimerQueue(max_queue_size)
+        self._wakeup: asyncio.Event = asyncio.Event()  # Set whenever the head of the queue may have changed
+        self._needs_refill: bool = True
+        self._refill_changes: dict[int, DatabaseTimer | None] | None = None  # Changes made while refilling
+        self._batch_size: int = batch_size  # Maximum amount of due timers claimed in a single query
+        self._dispatcher: TimerDispatcher = dispatcher or TimerDispatcher()
+        # Lease mode, for running several bot processes against the same timer table
+        self._lease: bool = lease
+        self._lease_ttl: datetime.timedelta = lease_ttl
+        self._lease_loop: IntervalLoop | None = None
+        self._node_id: str = lease_owner or f"{socket.gethostname()}:{os.getpid()}"
+        self._shard_count: int = 1
+        self._shard_ids: list[int] = [0]
+        # Notify mode, timer changes are pushed by the database instead of polled for
+        self._notify: bool = notify
+        self._listen_task: asyncio.Task | None = None
+        self._closing: asyncio.Task[None] | None = None
+        self._writes: TimerWriteBuffer = TimerWriteBuffer(delay=write_delay)  # Coalesced timer updates
+        self.parser: TimeParser = TimeParser(self._fetch_timezone)
+        """The parser used to convert human-readable time."""
+        self.metrics: SchedulerMetrics = SchedulerMetrics(dispatch_lag=self._dispatcher.lag)
+        """Dispatch lag, database time and reschedule counters of this scheduler."""
 
     def current_timer(self):
         return self._current_timer
 
+    @property
+    def queue_depth(self) -> int:
+        """The amount of timers loaded into memory and waiting to expire."""
+        return len(self._queue)
+
+    def stats(self) -> dict[str, typing.Any]:
+        """Get the current metrics of the scheduler, including queue depths."""
+        return {
+            **self.metrics.summary(),
+            "queue_depth": self.queue_depth,
+            "dispatch_pending": self._dispatcher.pending,
+            "buffered_writes": len(self._writes),
+        }
+
     async def setup(self, event: hikari.StartedEvent):
         self.start(event.app)  # type: ignore
 
+    async def teardown(self, _: hikari.StoppingEvent) -> None:
+        """Keep the bot from closing the database before the scheduler handed its timers back."""
+        self.stop()
+        if self._closing is not None:
+            await self._closing
+
     def start(self, app: "Airy") -> None:
         """
         Start the scheduler.
         """
         self.app = app
-        self._timer_loop = IntervalLoop(self._wait_for_active_timers, hours=1.0)
-        self._timer_loop.start()
+        self._dispatcher.start(app)
+
+        if self._notify:
+            self._listen_task = asyncio.create_task(self._listen())
+        else:
+            self._timer_loop = IntervalLoop(self._wait_for_active_timers, hours=1.0)
+            self._timer_loop.start()
+
+        if self._lease:
+            self._shard_count = app.shard_count or 1
+            self._shard_ids = list(app.shards) or [0]
+            self._lease_loop = IntervalLoop(self._renew_leases, seconds=self._lease_ttl.total_seconds() / 3)
+            self._lease_loop.start()
+
         self._is_started = True
+        self._ensure_dispatching()
         logger.info("Scheduler startup complete.")
 
     def restart(self) -> None:
@@ -75,22 +200,97 @@ class SchedulerServiceT:
             self._current_task.cancel()
         self._current_task = None
         self._current_timer = None
-        self._timer_loop.cancel()
-        self._timer_loop.start()
+        self._queue.clear()
+        self._needs_refill = True
+        if self._timer_loop is not None:
+            self._timer_loop.cancel()
+            self._timer_loop.start()
         self._is_started = True
+        self._ensure_dispatching()
         logger.info("Scheduler restart complete.")
 
     def stop(self) -> None:
         """
-        Stop the scheduler.
+        Stop the scheduler. The timers it claimed but did not dispatch yet are handed back in the background,
+        see `close`.
+        """
+        if self._is_started and self._closing is None:
+            self._closing = asyncio.create_task(self.close())
+
+    async def close(self, timeout: float = _CLOSE_TIMEOUT) -> None:
+        """
+        Stop the scheduler, waiting up to `timeout` seconds for pending events to be dispatched.
+        Timers that were claimed but not dispatched in time are written back to the database,
+        so they fire after the next start instead of being lost.
         """
         self._is_started = False
-        self._timer_loop.cancel()
+        if self._timer_loop is not None:
+            self._timer_loop.cancel()
+        if self._listen_task is not None:
+            self._listen_task.cancel()
+            self._listen_task = None
         if self._current_task is not None:
             self._current_task.cancel()
+            # A claim in progress hands its timers to the dispatcher or back to the database first
+            await asyncio.wait([self._current_task], timeout=timeout)
+        self._current_task = None
         self._current_timer = None
+
+        undelivered = await self._dispatcher.close(timeout)
+        if undelivered:
+            try:
+                await self._restore([(event.timer, due) for event, due in undelivered])
+            except Exception as error:
+                logger.error("Failed to restore {} undelivered timers: {}", len(undelivered), error)
+            else:
+                logger.info("Restored {} undelivered timers", len(undelivered))
+
+        if len(self._writes):
+            try:
+                await asyncio.wait_for(self._writes.flush(), timeout=timeout)
+            except Exception as error:
+                logger.error("Failed to write {} buffered timer updates: {}", len(self._writes), error)
+        self._queue.clear()
+        self._needs_refill = True
+
+        if self._lease_loop is not None:
+            self._lease_loop.cancel()
+            self._lease_loop = None
+
+        if self._lease:
+            # Hand the timers over to the other nodes right away instead of letting the leases run out
+            try:
+                await self.app.db.execute(_release_leases_sql, self._node_id, timeout=timeout)
+            except Exception as error:
+                logger.error("Failed to release the timer leases, they run out on their own: {}", error)
+
+        self._closing = None
         logger.info("Scheduler shutdown complete.")
 
+    async def _restore(self, timers: list[tuple[DatabaseTimer, datetime.datetime]]) -> None:
+        """Write claimed timers back to the database at the occurrence that was due.
+
+        One-shot timers were deleted by their claim and are inserted again,
+        recurring timers were advanced and are moved back to the occurrence that did not fire.
+
+        Parameters
+        ----------
+        timers : list[tuple[DatabaseTimer, datetime.datetime]]
+            The timers to restore, with the time they were due at.
+        """
+        await self.app.db.insert_many(
+            "timer",
+            _restore_columns,
+            _restore_types,
+            [
+                (timer.id, timer.guild_id, timer.user_id, timer.channel_id, due, timer.created,
+                 int(timer.event), json.dumps(timer.extra), timer.recurrence)
+                for timer, due in timers
+            ],
+            conflict=("id",),
+            update=("expires",),
+        )
+
     async def get_latest_timer(self, days: int = 7) -> DatabaseTimer | None:
         """Gets the latest timer in the specified range of days.
 
@@ -108,70 +308,302 @@ class SchedulerServiceT:
         model = await DatabaseTimer.filter(Q(expires__lte=utcnow() + datetime.timedelta(days=days))).first()
         return model
 
-    async def _call_timer(self, timer: DatabaseTimer) -> None:
-        """Calls the provided timer, dispatches TimerCompleteEvent, and removes the timer object from
-        the database.
+    async def _refill(self) -> None:
+        """Load every timer expiring within the scheduling window into the in-memory queue."""
+        now = utcnow()
+        horizon = now + self._window
+        self._refill_changes = {}
+        try:
+            if self._lease:
+                records = await self.app.db.fetch(
+                    _lease_sql,
+                    self._node_id, now + self._lease_ttl, horizon, now,
+                    self._shard_count, self._shard_ids, self._queue.max_size + 1,
+                )
+                timers = [DatabaseTimer._init_from_db(**dict(record)) for record in records]
+            else:
+                timers = await (DatabaseTimer
+                                .filter(Q(expires__lt=horizon))
+                                .order_by("expires", "id")
+                                .limit(self._queue.max_size + 1))
+        finally:
+            changes, self._refill_changes = self._refill_changes, None
+
+        self._queue.load(timers, horizon)
+        # Replay changes that raced with the query, the snapshot may not contain them
+        for timer_id, timer in changes.items():
+            if timer is None:
+                self._queue.remove(timer_id)
+            else:
+                self._queue.push(timer)
+
+        self._needs_refill = False
+        self.metrics.refills += 1
+        logger.debug("Loaded {} timers expiring before {}", len(self._queue), self._queue.horizon)
+
+    def _requeue(self, timer_id: int, timer: DatabaseTimer | None = None) -> None:
+        """Insert, replace or remove a timer in the queue, waking the dispatcher if the next timer changed.
 
         Parameters
         ----------
-        timer : BaseTimerEvent
-            The timer to be called.
+        timer_id : int
+            The ID of the timer that changed.
+        timer : Optional[DatabaseTimer]
+            The new state of the timer, or None if it was removed.
         """
+        if timer is not None and not self._owns(timer):
+            timer = None
 
-        await timer.delete()
-        self._current_timer = None
-        try:
-            self_timer: typing.Type[BaseTimerEvent] = timers_dict_enum_to_class[timer.event]
-            event = self_timer(self.app, timer.guild_id, timer)
+        if self._refill_changes is not None:
+            self._refill_changes[timer_id] = timer
 
-            self.app.dispatch(event)
-            logger.info(f"Dispatched timer {event.__class__} (ID: {event.timer.id})")
-        except Exception as error:
-            exception_msg = "\n".join(traceback.format_exception(type(error), error, error.__traceback__))
-            logger.error(exception_msg)
+        head = self._queue.peek()
 
-    async def _dispatch_timers(self):
+        if timer is None:
+            self._queue.remove(timer_id)
+        else:
+            self._queue.push(timer)
+
+        if self._queue.peek() is not head:
+            logger.debug("Reshuffled timers, next timer is now {}", self._queue.peek())
+            self._wakeup.set()
+
+        self._ensure_dispatching()
+
+    def _owns(self, timer: DatabaseTimer) -> bool:
+        """Whether this node is responsible for dispatching the given timer."""
+        return not self._lease or timer.lease_owner == self._node_id
+
+    def _is_local_guild(self, guild_id: int) -> bool:
+        """Whether the guild belongs to one of the shards run by this node."""
+        return (guild_id >> 22) % self._shard_count in self._shard_ids
+
+    async def _renew_leases(self) -> None:
         """
-        A task that loops, waits for, and calls pending timers.
+        The lease heartbeat, see `_extend_leases`. Failures are retried with a growing delay,
+        the heartbeat never gives up while the scheduler is running.
         """
-        try:
-            while self.app.is_ready and self._is_started:
-                timer = await self.get_latest_timer(days=30)
-                self._current_timer = timer
+        failures = 0
+        while self._is_started:
+            try:
+                await self._extend_leases()
+                return
+            except Exception as error:
+                failures += 1
+                delay = min(self._lease_ttl.total_seconds() / 3, 2.0 ** failures)
+                logger.error("Failed to renew the timer leases, retrying in {}s: {}", delay, error)
+                # The leases may run out in the meantime, reload the timers this node still owns once it recovers
+                self._needs_refill = True
+                await asyncio.sleep(delay)
+
+    async def _extend_leases(self) -> None:
+        """
+        Extend the leases of every timer claimed by this node, and look for timers this node should pick up:
+        new timers created by other processes, or timers whose owner stopped renewing its leases.
+        """
+        now = utcnow()
+        await self.app.db.execute(_renew_leases_sql, self._node_id, now + self._lease_ttl)
 
-                now = utcnow()
+        if self._queue.horizon is None:
+            return
+
+        claimable = await self.app.db.fetchval(
+            _find_claimable_sql, self._node_id, self._queue.horizon, now, self._shard_count, self._shard_ids
+        )
+        if claimable:
+            logger.debug("Found unclaimed timers, reloading the timer queue")
+            self._needs_refill = True
+            self._wakeup.set()
+
+    async def _listen(self) -> None:
+        """
+        Hold a connection listening for timer changes, reconnecting whenever it is lost.
+        """
+        while self._is_started:
+            try:
+                async with self.app.db.acquire() as con:
+                    closed = asyncio.Event()
+                    con.add_termination_listener(lambda _: closed.set())
+                    await con.add_listener(_notify_channel, self._on_notification)
+
+                    # Changes made while not listening were missed, so start from a fresh snapshot
+                    self._needs_refill = True
+                    self._wakeup.set()
+                    # The dispatch task may have ended while the database was unreachable
+                    self._ensure_dispatching()
+                    logger.info("Listening for timer changes on channel '{}'", _notify_channel)
+
+                    await closed.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                logger.error("Timer change listener failed: {}", error)
+
+            logger.warning("Lost the timer change listener connection, reconnecting...")
+            await asyncio.sleep(5)
+
+    def _on_notification(self, _: typing.Any, __: int, ___: str, payload: str) -> None:
+        """Apply a timer change announced by the database to the in-memory queue."""
+        data = json.loads(payload)
+        timer_id: int = data["id"]
+
+        if data["op"] == "DELETE":
+            self._requeue(timer_id)
+            return
+
+        expires = datetime.datetime.fromisoformat(data["expires"])
+
+        if self._lease and data["lease_owner"] != self._node_id:
+            if data["lease_owner"] is None and self._is_local_guild(data["guild_id"]) and self._queue.covers(expires):
+                # A new timer for one of our guilds, claim it
+                self._needs_refill = True
+                self._wakeup.set()
+            else:
+                self._requeue(timer_id)
+            return
+
+        queued = self._queue.get(timer_id)
+        if queued is not None and queued.expires == expires:
+            return  # Most likely our own change
+
+        if not self._queue.covers(expires):
+            self._requeue(timer_id)
+            return
+
+        asyncio.create_task(self._fetch_and_requeue(timer_id))
+
+    async def _fetch_and_requeue(self, timer_id: int) -> None:
+        """Load the current state of a timer from the database and apply it to the queue."""
+        timer = await DatabaseTimer.filter(id=timer_id).first()
+        self._requeue(timer_id, timer)
+
+    def _ensure_dispatching(self) -> None:
+        """Start the dispatch task if it is not running."""
+        if self._is_started and (self._current_task is None or self._current_task.done()):
+            self._current_task = asyncio.create_task(self._dispatch_timers())
 
-                if not timer:
-                    break
+    async def _call_timers(self, timers: list[DatabaseTimer]) -> None:
+        """Removes the provided timers from the database and queues their events for dispatching.
+        Recurring timers are moved to their next occurrence instead, and stay queued.
 
-                if timer.expires >= now:
-                    sleep_time = (timer.expires - now).total_seconds()
-                    logger.info("Awaiting next timer: '{}' (ID: {}), which is in {}s",
-                                timer.event,
-                                timer.id,
-                                sleep_time)
+        Timers that were cancelled or postponed in the meantime are not returned by the queries and are skipped.
 
-                    await asyncio.sleep(sleep_time)
+        Parameters
+        ----------
+        timers : list[DatabaseTimer]
+            The due timers to be called.
+        """
+        started = time.perf_counter()
+        # Make sure buffered updates to these timers are written before they are claimed
+        if any(timer.id in self._writes for timer in timers):
+            await self._writes.flush()
+
+        now = utcnow()
+        # Only the owner of a lease may claim the timer, so a timer is never dispatched by two nodes
+        lease_owner = self._node_id if self._lease else None
+        one_shot = [timer.id for timer in timers if not timer.recurrence]
+        recurring = [timer for timer in timers if timer.recurrence]
+        due = {timer.id: timer.expires for timer in timers}
+        called: list[DatabaseTimer] = []
+
+        if one_shot:
+            records = await self.app.db.fetch(_claim_due_sql, one_shot, now, lease_owner)
+            called.extend(DatabaseTimer._init_from_db(**dict(record)) for record in records)
+
+        if recurring:
+            next_expires = [Recurrence.parse(timer.recurrence).next_after(timer.expires, now) for timer in recurring]
+            records = await self.app.db.fetch(
+                _advance_due_sql, [timer.id for timer in recurring], now, lease_owner, next_expires
+            )
+            for record in records:
+                timer = DatabaseTimer._init_from_db(**dict(record))
+                self._requeue(timer.id, timer)
+                called.append(timer)
+            self.metrics.reschedules += len(records)
+
+        self.metrics.db_time.observe(time.perf_counter() - started)
+        self.metrics.dispatched += len(called)
+        self._current_timer = None
 
-                # TODO: Maybe some sort of queue system so we do not spam out timers like crazy after restart?
-                logger.info(f"Dispatching timer: {timer.event.name} (ID: {timer.id})")
-                await self._call_timer(timer)
+        for index, timer in enumerate(called):
+            try:
+                self_timer: typing.Type[BaseTimerEvent] = timers_dict_enum_to_class[timer.event]
+                event = self_timer(self.app, timer.guild_id, timer)
 
-        except asyncio.CancelledError:
-            raise
+                # Recurring timers were already advanced, the lag is measured from the occurrence that fired
+                await self._dispatcher.put(event, due.get(timer.id))
+            except asyncio.CancelledError:
+                # Stopped while waiting for room in the dispatcher, the rest is not lost with the task
+                await self._restore([(timer, due.get(timer.id, timer.expires)) for timer in called[index:]])
+                raise
+            except Exception as error:
+                exception_msg = "\n".join(traceback.format_exception(type(error), error, error.__traceback__))
+                logger.error(exception_msg)
 
-        except (OSError, hikari.GatewayServerClosedConnectionError):
-            if self._current_task:
-                self._current_task.cancel()
+        logger.info("Dispatching {} timers ({} pending)", len(called), self._dispatcher.pending)
 
-            self._current_task = asyncio.create_task(self._dispatch_timers())
+    async def _dispatch_timers(self):
+        """
+        A task that loops, waits for, and calls pending timers.
+        """
+        await self.app.wait_until_started()
+        failures = 0
+
+        while self.app.is_ready and self._is_started:
+            try:
+                self._wakeup.clear()
+
+                if self._needs_refill or utcnow() >= self._queue.horizon:
+                    await self._refill()
+
+                timer = self._queue.peek()
+                self._current_timer = timer
+
+                now = utcnow()
+                wake_at = timer.expires if timer else self._queue.horizon
+
+                if wake_at > now:
+                    sleep_time = (wake_at - now).total_seconds()
+                    if timer:
+                        logger.info("Awaiting next timer: '{}' (ID: {}), which is in {}s",
+                                    timer.event,
+                                    timer.id,
+                                    sleep_time)
+
+                    # Sleep until the timer is due, unless the queue changes first
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=sleep_time)
+                    except asyncio.TimeoutError:
+                        pass
+                    failures = 0
+                    continue
+
+                # Claim every due timer at once, after a restart this catches up on the backlog in batches
+                timers = []
+                while len(timers) < self._batch_size and (timer := self._queue.peek()) and timer.expires <= now:
+                    timers.append(self._queue.pop())
+
+                await self._call_timers(timers)
+                failures = 0
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception as error:
+                # Popped timers that were not claimed are still in the database, the refill picks them up again
+                self._needs_refill = True
+                failures += 1
+                delay = min(60.0, 2.0 ** failures)
+                logger.error("Failed to dispatch timers, retrying in {}s: {}", delay, error)
+                await asyncio.sleep(delay)
 
     async def _wait_for_active_timers(self) -> None:
         """
-        Check every hour to see if new timers meet criteria in the database.
+        Reload the timer queue every hour to pick up timers written to the database by other means.
         """
-        if self._current_task is None:
-            self._current_task = asyncio.create_task(self._dispatch_timers())
+        self._needs_refill = True
+        self._wakeup.set()
+        self._ensure_dispatching()
 
     async def get_timer(self, timer_id: int) -> DatabaseTimer:
         """Retrieve a currently pending timer.
@@ -192,7 +624,9 @@ class SchedulerServiceT:
             The timer was not found.
         """
 
-        model = await DatabaseTimer.filter(id=timer_id).first()
+        model = (self._writes.get(timer_id)
+                 or self._queue.get(timer_id)
+                 or await DatabaseTimer.filter(id=timer_id).first())
 
         if model is None:
             raise ValueError("Invalid timer_id: Timer not found.")
@@ -208,6 +642,7 @@ class SchedulerServiceT:
             channel: hikari.SnowflakeishOr[hikari.TextableChannel] | None = None,
             *,
             extra: dict | None = None,
+            recurrence: Recurrence | str | None = None,
     ) -> DatabaseTimer:
         """Create a new timer and schedule it.
 
@@ -225,32 +660,42 @@ class SchedulerServiceT:
             The channel to bind this timer to, by default None
         extra : t.Optional[str], optional
             Optional parameters or data to include, by default None
+        recurrence : t.Optional[t.Union[Recurrence, str]], optional
+            The rule to repeat this timer by, by default None
 
         Returns
         -------
         Timer
             The timer object that got created.
+
+        Raises
+        ------
+        ValueError
+            The recurrence rule is invalid.
         """
         if not self._is_started:
             raise hikari.ComponentStateConflictError("The scheduler is not running.")
+        if recurrence is not None:
+            recurrence = Recurrence.parse(str(recurrence))
+
+        lease_owner = None
+        lease_expires = None
+        if self._lease and self._is_local_guild(hikari.Snowflake(guild)):
+            lease_owner = self._node_id
+            lease_expires = utcnow() + self._lease_ttl
+
         model = await DatabaseTimer.create(guild_id=guild,
                                            user_id=user,
                                            channel_id=channel,
                                            event=event,
                                            expires=expires.astimezone(datetime.timezone.utc),
                                            created=utcnow(),
-                                           extra=extra)
-
-        # If there is already a timer in queue, and it has an expiry that is further than the timer we just created
-        # then we restart the dispatch_timers() to re-check for the latest timer.
-        if self._current_timer and model.expires < self._current_timer.expires:
-            logger.debug("Reshuffled timers, created timer is now the latest timer.")
-            if self._current_task:
-                self._current_task.cancel()
-            self._current_task = asyncio.create_task(self._dispatch_timers())
+                                           extra=extra,
+                                           recurrence=str(recurrence) if recurrence else None,
+                                           lease_owner=lease_owner,
+                                           lease_expires=lease_expires)
 
-        elif self._current_timer is None:
-            self._current_task = asyncio.create_task(self._dispatch_timers())
+        self._requeue(model.id, model)
 
         return model
 
@@ -263,14 +708,10 @@ class SchedulerServiceT:
         timer : Timer
             The timer object to update.
         """
-        await timer.save()
-
-        if self._current_timer and timer.expires < self._current_timer.expires:
-            logger.debug("Reshuffled timers, created timer is now the latest timer.")
-            if self._current_timer and timer.expires <= self._current_timer.expires:
-                if self._current_task:
-                    self._current_task.cancel()
-                self._current_task = asyncio.create_task(self._dispatch_timers())
+        # Writes are coalesced, repeated updates to the same timer only hit the database once
+        await self._writes.put(timer)
+        self._requeue(timer.id, timer)
+        self.metrics.reschedules += 1
 
     async def cancel_timer(self, timer_id: int) -> DatabaseTimer | None:
         """Prematurely cancel a timer before expiry. Returns the cancelled timer.
@@ -290,15 +731,18 @@ class SchedulerServiceT:
         if model is None:
             return None
         copied = copy.deepcopy(model)
+        self._writes.discard(model.id)
         await model.delete()
 
-        if self._current_timer and self._current_timer.id == model.id:
-            if self._current_task:
-                self._current_task.cancel()
-            self._current_task = asyncio.create_task(self._dispatch_timers())
+        self._requeue(model.id)
 
         return copied
 
+    @staticmethod
+    async def _fetch_timezone(user_id: int) -> str:
+        model = await DatabaseUser.fetch(user_id)
+        return model.tz
+
     async def convert_time(
             self,
             time_str: str,
@@ -322,49 +766,7 @@ class SchedulerServiceT:
         logger.debug(f"String passed for time conversion: {time_str}")
 
         if not conversion_mode or conversion_mode == ConversionMode.RELATIVE:
-            # Relative time conversion Get any pair of <number><word> with a single optional space in between,
-            # and return them as a dict (sort of)
-            time_regex = re.compile(r"(\d+(?:[.,]\d+)?)\s?(\w+)")
-            time_letter_dict = {
-                "h": 3600,
-                "s": 1,
-                "m": 60,
-                "d": 86400,
-                "w": 86400 * 7,
-                "M": 86400 * 30,
-                "Y": 86400 * 365,
-                "y": 86400 * 365,
-            }
-            time_word_dict = {
-                "hour": 3600,
-                "second": 1,
-                "minute": 60,
-                "day": 86400,
-                "week": 86400 * 7,
-                "month": 86400 * 30,
-                "year": 86400 * 365,
-                "sec": 1,
-                "min": 60,
-            }
-            matches = time_regex.findall(time_str)
-            time = 0.0
-
-            for input_str, category in matches:
-                input_str = input_str.replace(",",
-                                              ".")  # Replace commas with periods to correctly register decimal places
-                # If this is a single letter
-
-                if len(category) == 1:
-                    if value := time_letter_dict.get(category):
-                        time += value * float(input_str)
-
-                else:
-                    for string, value in time_word_dict.items():
-                        if (
-                                category.lower() == string or category.lower()[:-1] == string
-                        ):  # Account for plural forms of the word
-                            time += value * float(input_str)
-                            break
+            time = self.parser.parse_relative(time_str)
 
             if time > 0:  # If we found time
                 return datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=time)
@@ -376,12 +778,9 @@ class SchedulerServiceT:
 
             timezone = "UTC"
             if user_id:
-                model = await DatabaseUser.fetch(user_id)
-                timezone = model.tz
+                timezone = await self.parser.get_timezone(user_id)
 
-            time_parsed = dateparser.parse(
-                time_str, settings={"RETURN_AS_TIMEZONE_AWARE": True, "TIMEZONE": timezone, "NORMALIZE": True}
-            )
+            time_parsed = self.parser.parse_absolute(time_str, timezone)
 
             if not time_parsed:
                 raise ValueError("Time could not be parsed. (absolute)")
@@ -394,12 +793,26 @@ class SchedulerServiceT:
         raise ValueError("Time conversion failed.")
 
 
-SchedulerService = SchedulerServiceT()
+SchedulerService = SchedulerServiceT(
+    dispatcher=TimerDispatcher(
+        concurrency=scheduler_settings.dispatch_concurrency,
+        global_rate=scheduler_settings.dispatch_rate,
+        guild_rate=scheduler_settings.dispatch_guild_rate,
+        guild_burst=scheduler_settings.dispatch_guild_burst,
+        max_pending=scheduler_settings.dispatch_max_pending,
+    ),
+    lease=scheduler_settings.lease,
+    lease_ttl=datetime.timedelta(seconds=scheduler_settings.lease_ttl),
+    lease_owner=scheduler_settings.lease_owner,
+    notify=scheduler_settings.notify,
+)
 
 
 def load(bot: "Airy"):
     bot.subscribe(hikari.StartedEvent, SchedulerService.setup)
+    bot.subscribe(hikari.StoppingEvent, SchedulerService.teardown)
 
 
-def unload(_: "Airy"):
+def unload(bot: "Airy"):
+    bot.unsubscribe(hikari.StoppingEvent, SchedulerService.teardown)
     SchedulerService.stop()
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import itertools
+import time
+import traceback
+import typing
+
+import hikari
+
+from loguru import logger
+
+from airy.utils.metrics import Histogram
+from airy.utils.time import utcnow
+
+if typing.TYPE_CHECKING:
+    from airy.models.bot import Airy
+    from airy.services.scheduler.events import BaseTimerEvent
+
+__all__ = ("TimerDispatcher",)
+
+
+class _TokenBucket:
+    """A token bucket that hands out reservations instead of rejecting requests."""
+
+    __slots__ = ("rate", "capacity", "_tokens", "_updated")
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate: float = rate
+        self.capacity: float = capacity
+        self._tokens: float = capacity
+        self._updated: float = time.monotonic()
+
+    @property
+    def is_idle(self) -> bool:
+        """Whether the bucket has refilled completely, meaning it can be dropped without losing state."""
+        return self._tokens + (time.monotonic() - self._updated) * self.rate >= self.capacity
+
+    def reserve(self) -> float:
+        """Take a token, returning how long the caller has to wait before using it."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        return max(0.0, -self._tokens / self.rate)
+
+
+class TimerDispatcher:
+    """
+    Dispatches timer events through a bounded queue, with a fixed amount of workers
+    and both a global and a per-guild dispatch rate.
+
+    Each worker waits for the listeners of an event to finish before taking the next one,
+    so at most `concurrency` timer listeners run at the same time. Events of a guild that is
+    over its rate are set aside until the guild may dispatch again, so they never hold up a worker.
+    """
+
+    def __init__(
+            self,
+            *,
+            concurrency: int = 8,
+            global_rate: float = 25.0,
+            guild_rate: float = 1.0,
+            guild_burst: int = 5,
+            max_pending: int = 1000,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        concurrency : int
+            The amount of events that may be handled at the same time.
+        global_rate : float
+            The maximum amount of events dispatched per second.
+        guild_rate : float
+            The maximum amount of events dispatched per second for a single guild.
+        guild_burst : int
+            The amount of events a single guild may dispatch at once before being limited.
+        max_pending : int
+            The maximum amount of pending events, `put` waits while this many are pending.
+        """
+        self.concurrency: int = concurrency
+        self.global_rate: float = global_rate
+        self.guild_rate: float = guild_rate
+        self.guild_burst: int = guild_burst
+
+        self._app: Airy | None = None
+        # Entries are (event, due, whether a guild token was already reserved for it)
+        self._queue: asyncio.Queue[tuple[BaseTimerEvent, datetime.datetime, bool]] = asyncio.Queue()
+        self._slots: asyncio.Semaphore = asyncio.Semaphore(max_pending)
+        self._deferred: dict[int, tuple[asyncio.TimerHandle, tuple[BaseTimerEvent, datetime.datetime, bool]]] = {}
+        self._keys: typing.Iterator[int] = itertools.count()
+        self._workers: list[asyncio.Task[None]] = []
+        self._global_bucket = _TokenBucket(global_rate, max(1.0, global_rate))
+        self._guild_buckets: dict[hikari.Snowflake, _TokenBucket] = {}
+        self.lag: Histogram = Histogram()
+        """Seconds between the time an event was due and the time it was dispatched."""
+
+    @property
+    def pending(self) -> int:
+        """The amount of events waiting to be dispatched."""
+        return self._queue.qsize() + len(self._deferred)
+
+    def start(self, app: Airy) -> None:
+        """Start the dispatch workers."""
+        self._app = app
+        if self._workers:
+            return
+
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    def stop(self) -> list[tuple[BaseTimerEvent, datetime.datetime]]:
+        """Stop the dispatch workers, dropping any pending events.
+
+        Returns
+        -------
+        list[tuple[BaseTimerEvent, datetime.datetime]]
+            The events that were not dispatched, with the time they were due at.
+        """
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
+
+        dropped: list[tuple[BaseTimerEvent, datetime.datetime]] = []
+        for handle, (event, due, _) in self._deferred.values():
+            handle.cancel()
+            dropped.append((event, due))
+            self._queue.task_done()
+            self._slots.release()
+        self._deferred.clear()
+
+        while not self._queue.empty():
+            event, due, _ = self._queue.get_nowait()
+            dropped.append((event, due))
+            self._queue.task_done()
+            self._slots.release()
+
+        return dropped
+
+    async def close(self, timeout: float) -> list[tuple[BaseTimerEvent, datetime.datetime]]:
+        """Wait up to `timeout` seconds for the pending events to be dispatched, then stop the workers.
+
+        Returns
+        -------
+        list[tuple[BaseTimerEvent, datetime.datetime]]
+            The events that were not dispatched in time, with the time they were due at.
+        """
+        if self._workers:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+        return self.stop()
+
+    async def put(self, event: BaseTimerEvent, due: datetime.datetime | None = None) -> None:
+        """Queue an event for dispatching, waiting if the queue is full.
+
+        `due` is the time the event should have fired at, it defaults to the expiry of its timer.
+        """
+        await self._slots.acquire()
+        self._queue.put_nowait((event, due or event.timer.expires, False))
+
+    async def join(self) -> None:
+        """Wait until every queued event has been dispatched."""
+        await self._queue.join()
+
+    def _defer(self, item: tuple[BaseTimerEvent, datetime.datetime, bool]) -> bool:
+        """Reserve a token of the guild of an event, setting the event aside if it has to wait for it.
+
+        The event stays unfinished in the queue while it is set aside, so `join` keeps waiting for it.
+        """
+        event, due, reserved = item
+        if reserved:
+            return False
+
+        bucket = self._guild_buckets.get(event.guild_id)
+        if bucket is None:
+            if len(self._guild_buckets) >= 1000:
+                self._guild_buckets = {key: value for key, value in self._guild_buckets.items() if not value.is_idle}
+            bucket = self._guild_buckets[event.guild_id] = _TokenBucket(self.guild_rate, self.guild_burst)
+
+        delay = bucket.reserve()
+        if delay <= 0:
+            return False
+
+        # Reservations of a guild are handed out in order, so its events are requeued in order as well
+        key = next(self._keys)
+        handle = asyncio.get_running_loop().call_later(delay, self._requeue, key)
+        self._deferred[key] = (handle, (event, due, True))
+        return True
+
+    def _requeue(self, key: int) -> None:
+        _, item = self._deferred.pop(key)
+        self._queue.put_nowait(item)
+        self._queue.task_done()  # Balances the unfinished entry the event kept while it was set aside
+
+    async def _worker(self) -> None:
+        while True:
+            item = await self._queue.get()
+            if self._defer(item):
+                continue
+
+            event, due, _ = item
+            try:
+                delay = self._global_bucket.reserve()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                self.lag.observe(max(0.0, (utcnow() - due).total_seconds()))
+                await self._app.dispatch(event)
+                logger.debug(f"Dispatched timer {event.__class__} (ID: {event.timer.id})")
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                exception_msg = "\n".join(traceback.format_exception(type(error), error, error.__traceback__))
+                logger.error(exception_msg)
+            finally:
+                self._queue.task_done()
+                self._slots.release()
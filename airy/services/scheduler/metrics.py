@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import typing
+
+import attr
+
+from airy.utils.metrics import Histogram
+
+__all__ = ("SchedulerMetrics",)
+
+
+@attr.define()
+class SchedulerMetrics:
+    """Counters and histograms collected by the scheduler since it was created or last reset."""
+
+    dispatch_lag: Histogram = attr.field(factory=Histogram)
+    """Seconds between the expiry of a timer and the dispatch of its event."""
+    db_time: Histogram = attr.field(factory=Histogram)
+    """Seconds spent in the database per batch of dispatched timers."""
+    dispatched: int = 0
+    """The amount of timers that were claimed and handed to the dispatcher."""
+    reschedules: int = 0
+    """The amount of times a timer was moved to another expiry, by an update or a recurrence."""
+    refills: int = 0
+    """The amount of times the in-memory queue was reloaded from the database."""
+
+    def reset(self) -> None:
+        self.dispatch_lag.reset()
+        self.db_time.reset()
+        self.dispatched = 0
+        self.reschedules = 0
+        self.refills = 0
+
+    def summary(self) -> dict[str, typing.Any]:
+        return {
+            "dispatch_lag": self.dispatch_lag.summary(),
+            "db_time": self.db_time.summary(),
+            "dispatched": self.dispatched,
+            "reschedules": self.reschedules,
+            "refills": self.refills,
+        }
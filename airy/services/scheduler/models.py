@@ -39,6 +39,15 @@ class DatabaseTimer(Model):
     extra: dict[str, typing.Any] = fields.JSONField()
     """Optional data for this timer. May be a JSON-serialized string depending on the event type."""
 
+    recurrence: str | None = fields.TextField(null=True, default=None)
+    """The rule this timer repeats by, see `Recurrence`. One-shot timers have none."""
+
+    lease_owner: str | None = fields.TextField(null=True, default=None)
+    """The scheduler node that claimed this timer, if leases are used."""
+
+    lease_expires: datetime.datetime | None = fields.DatetimeField(null=True, default=None)
+    """The moment the lease of this timer runs out unless it is renewed by its owner."""
+
     class Meta:
         """Metaclass to set table name and description"""
 
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import datetime
+import re
+import time
+import typing
+
+import dateparser  # type: ignore
+
+from lru import LRU  # type: ignore
+
+__all__ = ("TimeParser",)
+
+# Any pair of <number><word> with a single optional space in between
+_TIME_TOKEN = re.compile(r"(\d+(?:[.,]\d+)?)\s?(\w+)")
+
+# Single letter units are case-sensitive, "m" is a minute while "M" is a month
+_LETTER_UNITS: dict[str, int] = {
+    "h": 3600,
+    "s": 1,
+    "m": 60,
+    "d": 86400,
+    "w": 86400 * 7,
+    "M": 86400 * 30,
+    "Y": 86400 * 365,
+    "y": 86400 * 365,
+}
+
+_WORD_UNITS: dict[str, int] = {
+    "hour": 3600,
+    "second": 1,
+    "minute": 60,
+    "day": 86400,
+    "week": 86400 * 7,
+    "month": 86400 * 30,
+    "year": 86400 * 365,
+    "sec": 1,
+    "min": 60,
+}
+_WORD_UNITS.update({f"{word}s": value for word, value in _WORD_UNITS.items()})
+
+_DATEPARSER_SETTINGS = {"RETURN_AS_TIMEZONE_AWARE": True, "NORMALIZE": True}
+
+TimezoneLoaderT = typing.Callable[[int], typing.Awaitable[str]]
+
+
+class TimeParser:
+    """
+    Converts human-readable time expressions to datetimes.
+
+    Relative expressions are parsed with a precompiled grammar. Absolute expressions go through `dateparser`,
+    whose results are memoized per minute, and user timezones are cached for `timezone_ttl` seconds.
+    """
+
+    def __init__(
+            self,
+            timezone_loader: TimezoneLoaderT,
+            *,
+            cache_size: int = 1024,
+            timezone_cache_size: int = 4096,
+            timezone_ttl: float = 3600.0,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        timezone_loader : Callable[[int], Awaitable[str]]
+            A coroutine function returning the timezone of the user with the given ID.
+        cache_size : int
+            The amount of absolute parse results to remember.
+        timezone_cache_size : int
+            The amount of user timezones to remember.
+        timezone_ttl : float
+            The amount of seconds a cached user timezone is valid for.
+        """
+        self._timezone_loader: TimezoneLoaderT = timezone_loader
+        self._timezone_ttl: float = timezone_ttl
+        self._timezones: LRU = LRU(timezone_cache_size)  # user_id -> (timezone, expires_at)
+        self._absolute: LRU = LRU(cache_size)  # (text, timezone, minute) -> datetime | None
+
+    @staticmethod
+    def parse_relative(time_str: str) -> float:
+        """Get the total amount of seconds described by a relative time expression, 0 if there are none."""
+        seconds = 0.0
+
+        for amount, unit in _TIME_TOKEN.findall(time_str):
+            # If this is a single letter
+            if len(unit) == 1:
+                value = _LETTER_UNITS.get(unit)
+            else:
+                unit = unit.lower()
+                # Account for plural forms the table does not spell out
+                value = _WORD_UNITS.get(unit) or _WORD_UNITS.get(unit[:-1])
+
+            if value:
+                # Replace commas with periods to correctly register decimal places
+                seconds += value * float(amount.replace(",", "."))
+
+        return seconds
+
+    def parse_absolute(self, time_str: str, timezone: str = "UTC") -> datetime.datetime | None:
+        """Parse an absolute time expression in the given timezone, returning None if it could not be parsed.
+
+        Results are reused for the rest of the minute they were computed in.
+        """
+        key = (" ".join(time_str.casefold().split()), timezone, int(time.time() // 60))
+
+        try:
+            return self._absolute[key]
+        except KeyError:
+            pass
+
+        result = dateparser.parse(time_str, settings={**_DATEPARSER_SETTINGS, "TIMEZONE": timezone})
+        self._absolute[key] = result
+        return result
+
+    async def get_timezone(self, user_id: int) -> str:
+        """Get the timezone of a user, loading it if it is not cached."""
+        cached = self._timezones.get(user_id)
+        now = time.monotonic()
+
+        if cached is not None and cached[1] > now:
+            return cached[0]
+
+        timezone = await self._timezone_loader(user_id)
+        self._timezones[user_id] = (timezone, now + self._timezone_ttl)
+        return timezone
+
+    def invalidate_timezone(self, user_id: int) -> None:
+        """Forget the cached timezone of a user, call this after it changed."""
+        try:
+            del self._timezones[user_id]
+        except KeyError:
+            pass
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import datetime
+import heapq
+import itertools
+import typing
+
+from airy.services.scheduler.models import DatabaseTimer
+
+__all__ = ("TimerQueue",)
+
+# The amount of dead entries a heap may hold regardless of its size, so small queues are not rebuilt constantly
+_MIN_COMPACT_SIZE = 64
+
+
+class TimerQueue:
+    """
+    A bounded min-heap of pending timers ordered by expiry.
+
+    The queue mirrors every timer from the database that expires before `horizon`.
+    Timers expiring later are left in the database until the queue is refilled.
+    Removal is lazy: removed entries are only marked as dead and skipped when they reach the top of the heap.
+    The heap is rebuilt from the live entries once dead ones make up most of it.
+    """
+
+    __slots__ = ("max_size", "horizon", "_heap", "_entries", "_sequence")
+
+    def __init__(self, max_size: int = 10_000) -> None:
+        self.max_size: int = max_size
+        """The maximum amount of timers held in memory."""
+
+        self.horizon: datetime.datetime | None = None
+        """Every timer in the database expiring before this moment is guaranteed to be in the queue."""
+
+        # Entries are [expires, id, sequence, timer], the sequence keeps a timer pushed again with the same expiry
+        # from being compared to its own dead entry
+        self._heap: list[list[typing.Any]] = []
+        self._entries: dict[int, list[typing.Any]] = {}
+        self._sequence: typing.Iterator[int] = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, timer_id: int) -> bool:
+        return timer_id in self._entries
+
+    def covers(self, expires: datetime.datetime) -> bool:
+        """Whether a timer with the given expiry belongs into the queue."""
+        return self.horizon is not None and expires < self.horizon
+
+    def get(self, timer_id: int) -> DatabaseTimer | None:
+        """Get a queued timer by its ID."""
+        entry = self._entries.get(timer_id)
+        return entry[3] if entry else None
+
+    def load(self, timers: typing.Sequence[DatabaseTimer], horizon: datetime.datetime) -> None:
+        """Replace the contents of the queue with freshly loaded timers.
+
+        Parameters
+        ----------
+        timers : Sequence[DatabaseTimer]
+            All timers expiring before `horizon`, as fetched from the database.
+        horizon : datetime.datetime
+            The moment up to which `timers` is complete.
+        """
+        self._heap = [[timer.expires, timer.id, next(self._sequence), timer] for timer in timers]
+        self._entries = {entry[1]: entry for entry in self._heap}
+        heapq.heapify(self._heap)
+        self.horizon = horizon
+        self._trim()
+
+    def push(self, timer: DatabaseTimer) -> bool:
+        """Insert or replace a timer. Returns `True` if the timer is now queued."""
+        self.remove(timer.id)
+
+        if not self.covers(timer.expires):
+            return False
+
+        entry = [timer.expires, timer.id, next(self._sequence), timer]
+        self._entries[timer.id] = entry
+        heapq.heappush(self._heap, entry)
+        self._trim()
+        return timer.id in self._entries
+
+    def remove(self, timer_id: int) -> DatabaseTimer | None:
+        """Remove a timer from the queue, returning it if it was queued."""
+        entry = self._entries.pop(timer_id, None)
+        if entry is None:
+            return None
+
+        timer = entry[3]
+        entry[3] = None
+        # Updated timers are removed and pushed again, without this the heap grows with every update
+        if len(self._heap) > 2 * len(self._entries) + _MIN_COMPACT_SIZE:
+            self._compact()
+        return timer
+
+    def peek(self) -> DatabaseTimer | None:
+        """Get the timer that expires first without removing it."""
+        while self._heap and self._heap[0][3] is None:
+            heapq.heappop(self._heap)
+
+        return self._heap[0][3] if self._heap else None
+
+    def pop(self) -> DatabaseTimer | None:
+        """Remove and return the timer that expires first."""
+        timer = self.peek()
+        if timer is not None:
+            heapq.heappop(self._heap)
+            del self._entries[timer.id]
+        return timer
+
+    def clear(self) -> None:
+        """Drop every queued timer and forget the horizon."""
+        self._heap = []
+        self._entries = {}
+        self.horizon = None
+
+    def _compact(self) -> None:
+        """Drop the dead entries from the heap."""
+        self._heap = [entry for entry in self._heap if entry[3] is not None]
+        heapq.heapify(self._heap)
+
+    def _trim(self) -> None:
+        """Shrink the queue back to `max_size`, pulling the horizon in to the first dropped timer."""
+        if len(self._entries) <= self.max_size:
+            return
+
+        kept = heapq.nsmallest(self.max_size + 1, (entry for entry in self._heap if entry[3] is not None))
+        self.horizon = kept.pop()[0]
+        # Timers sharing the new horizon are reloaded together on the next refill.
+        kept = [entry for entry in kept if entry[0] < self.horizon]
+
+        self._heap = kept
+        self._entries = {entry[1]: entry for entry in kept}
+        heapq.heapify(self._heap)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import datetime
+import functools
+
+__all__ = ("Recurrence",)
+
+# (name, minimum, maximum) of every cron field, in order
+_CRON_FIELDS = (("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7))
+
+# Give up looking for the next occurrence of a cron rule after this many years, e.g. for "0 0 30 2 *"
+_CRON_SEARCH_YEARS = 5
+
+
+def _parse_cron_field(value: str, minimum: int, maximum: int) -> frozenset[int]:
+    result: set[int] = set()
+
+    for part in value.split(","):
+        part, _, step_str = part.partition("/")
+        step = int(step_str) if step_str else 1
+
+        if part == "*":
+            start, end = minimum, maximum
+        elif "-" in part:
+            start_str, end_str = part.split("-", 1)
+            start, end = int(start_str), int(end_str)
+        else:
+            start = int(part)
+            end = maximum if step_str else start
+
+        if step < 1 or start < minimum or end > maximum or start > end:
+            raise ValueError(f"Invalid cron field: {value!r}")
+
+        result.update(range(start, end + 1, step))
+
+    return frozenset(result)
+
+
+class Recurrence:
+    """
+    A compact schedule for recurring timers, stored as text in `timer.recurrence`.
+
+    Two kinds of rules are supported:
+    - `@every <seconds>`, repeating at a fixed interval from the original expiry
+    - a five field cron expression (minute, hour, day of month, month, day of week), evaluated in UTC
+    """
+
+    __slots__ = ("rule", "_interval", "_cron", "_any_day", "_any_weekday")
+
+    def __init__(self, rule: str) -> None:
+        self.rule: str = " ".join(rule.split())
+        self._interval: datetime.timedelta | None = None
+        self._cron: tuple[frozenset[int], ...] = ()
+        self._any_day: bool = False
+        self._any_weekday: bool = False
+
+        if self.rule.startswith("@every "):
+            seconds = float(self.rule[len("@every "):])
+            if seconds < 1:
+                raise ValueError("The interval of a recurring timer must be at least one second.")
+            self._interval = datetime.timedelta(seconds=seconds)
+            return
+
+        fields = self.rule.split(" ")
+        if len(fields) != len(_CRON_FIELDS):
+            raise ValueError(f"Invalid recurrence rule: {rule!r}")
+
+        minutes, hours, days, months, weekdays = (
+            _parse_cron_field(value, minimum, maximum) for value, (_, minimum, maximum) in zip(fields, _CRON_FIELDS)
+        )
+        # Sunday may be written as either 0 or 7
+        self._cron = (minutes, hours, days, months, frozenset(weekday % 7 for weekday in weekdays))
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def __str__(self) -> str:
+        return self.rule
+
+    def __repr__(self) -> str:
+        return f"Recurrence({self.rule!r})"
+
+    @classmethod
+    def every(cls, interval: datetime.timedelta) -> Recurrence:
+        """Create a rule repeating at a fixed interval."""
+        return cls(f"@every {int(interval.total_seconds())}")
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def parse(rule: str) -> Recurrence:
+        """Parse a stored rule, reusing previously parsed rules.
+
+        Raises
+        ------
+        ValueError
+            The rule is invalid.
+        """
+        return Recurrence(rule)
+
+    def next_after(self, expires: datetime.datetime, now: datetime.datetime) -> datetime.datetime:
+        """Get the first occurrence after `now` of a timer that last expired at `expires`.
+
+        Occurrences missed while the bot was offline are skipped.
+        """
+        if self._interval is not None:
+            # In UTC, adding to a local time would add wall clock time and shift by an hour across DST
+            expires = expires.astimezone(datetime.timezone.utc)
+            missed = max(0, (now - expires) // self._interval)
+            return expires + self._interval * (missed + 1)
+
+        return self._next_cron(max(expires, now))
+
+    def _matches_day(self, moment: datetime.datetime) -> bool:
+        in_days = moment.day in self._cron[2]
+        in_weekdays = (moment.isoweekday() % 7) in self._cron[4]
+
+        # Like cron, a restricted day of month and day of week match if either of them does
+        if not self._any_day and not self._any_weekday:
+            return in_days or in_weekdays
+        return in_days and in_weekdays
+
+    def _next_cron(self, after: datetime.datetime) -> datetime.datetime:
+        minutes, hours, _, months, _ = self._cron
+        moment = after.astimezone(datetime.timezone.utc).replace(second=0, microsecond=0)
+        moment += datetime.timedelta(minutes=1)
+        limit = moment.year + _CRON_SEARCH_YEARS
+
+        while moment.year <= limit:
+            if moment.month not in months:
+                year, month = divmod(moment.month, 12)
+                moment = moment.replace(year=moment.year + year, month=month + 1, day=1, hour=0, minute=0)
+            elif not self._matches_day(moment):
+                moment = moment.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+            elif moment.hour not in hours:
+                moment = moment.replace(minute=0) + datetime.timedelta(hours=1)
+            elif moment.minute not in minutes:
+                moment += datetime.timedelta(minutes=1)
+            else:
+                return moment
+
+        raise ValueError(f"Recurrence rule {self.rule!r} never matches.")
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+from loguru import logger
+
+from airy.services.scheduler.models import DatabaseTimer
+from airy.utils.time import utcnow
+
+__all__ = ("TimerWriteBuffer",)
+
+_update_timers_sql = """UPDATE timer AS t
+                        SET guild_id = v.guild_id, user_id = v.user_id, channel_id = v.channel_id,
+                            expires = v.expires, event = v.event, extra = v.extra, recurrence = v.recurrence
+                        FROM unnest($1::int[], $2::bigint[], $3::bigint[], $4::bigint[],
+                                    $5::timestamptz[], $6::smallint[], $7::jsonb[], $8::text[])
+                            AS v (id, guild_id, user_id, channel_id, expires, event, extra, recurrence)
+                        WHERE t.id = v.id"""
+
+
+class TimerWriteBuffer:
+    """
+    Coalesces timer updates and writes them in batches.
+
+    Updates to the same timer within `delay` seconds are merged into one write,
+    and every pending update is written in a single statement. An update is always written
+    at least `margin` seconds before the timer expires.
+    """
+
+    def __init__(self, *, delay: float = 1.0, margin: float = 5.0) -> None:
+        """
+        Parameters
+        ----------
+        delay : float
+            The maximum amount of seconds an update may stay in the buffer.
+        margin : float
+            The minimum amount of seconds between writing an update and the expiry of its timer.
+        """
+        self.delay: float = delay
+        self.margin: float = margin
+        self._pending: dict[int, DatabaseTimer] = {}
+        self._deadline: float | None = None  # Loop time at which the buffer has to be flushed
+        self._rescheduled: asyncio.Event = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._lock: asyncio.Lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def __contains__(self, timer_id: int) -> bool:
+        return timer_id in self._pending
+
+    def get(self, timer_id: int) -> DatabaseTimer | None:
+        """Get the pending state of a timer, if it has unwritten changes."""
+        return self._pending.get(timer_id)
+
+    def discard(self, timer_id: int) -> None:
+        """Drop the pending changes of a timer, e.g. because it was deleted."""
+        self._pending.pop(timer_id, None)
+
+    async def put(self, timer: DatabaseTimer) -> None:
+        """Buffer the current state of a timer to be written."""
+        self._pending[timer.id] = timer
+
+        delay = min(self.delay, (timer.expires - utcnow()).total_seconds() - self.margin)
+        if delay <= 0:
+            await self.flush()
+            return
+
+        deadline = asyncio.get_running_loop().time() + delay
+        if self._deadline is None or deadline < self._deadline:
+            self._deadline = deadline
+            self._rescheduled.set()
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_later())
+
+    async def flush(self) -> None:
+        """Write every pending update now."""
+        async with self._lock:
+            batch, self._pending = self._pending, {}
+            self._deadline = None
+            if not batch:
+                return
+
+            timers = list(batch.values())
+            try:
+                await DatabaseTimer._meta.db.execute_query(
+                    _update_timers_sql,
+                    [
+                        [timer.id for timer in timers],
+                        [timer.guild_id for timer in timers],
+                        [timer.user_id for timer in timers],
+                        [timer.channel_id for timer in timers],
+                        [timer.expires for timer in timers],
+                        [int(timer.event) for timer in timers],
+                        [json.dumps(timer.extra) for timer in timers],
+                        [timer.recurrence for timer in timers],
+                    ],
+                )
+            except BaseException:
+                # Keep the updates, unless they were superseded in the meantime
+                for timer_id, timer in batch.items():
+                    self._pending.setdefault(timer_id, timer)
+
+                if self._task is None:
+                    self._deadline = asyncio.get_running_loop().time() + self.delay
+                    self._task = asyncio.create_task(self._flush_later())
+                raise
+
+            logger.debug("Wrote {} buffered timer updates", len(timers))
+
+    async def _flush_later(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while self._pending:
+            delay = (self._deadline or loop.time()) - loop.time()
+            if delay > 0:
+                self._rescheduled.clear()
+                try:
+                    await asyncio.wait_for(self._rescheduled.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self.flush()
+            except Exception as error:
+                logger.error("Failed to write buffered timer updates, retrying: {}", error)
+                self._deadline = loop.time() + self.delay
+
+        self._task = None
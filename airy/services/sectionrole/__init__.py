@@ -16,6 +16,18 @@ from .models import HierarchyRoles, DatabaseSectionRole, DatabaseEntrySectionRol
 if typing.TYPE_CHECKING:
     from airy.models.bot import Airy
 
+# Fast path for member updates, one round trip without building ORM models
+_fetch_guild_section_roles_sql = """SELECT s.role_id, s.hierarchy,
+                                           array_remove(array_agg(e.entry_id), NULL) AS entries
+                                    FROM sectionrole s
+                                    LEFT JOIN sectionrole_entry e ON e.role_id = s.role_id
+                                    WHERE s.guild_id = $1
+                                    GROUP BY s.id"""
+_delete_section_role_sql = """DELETE FROM sectionrole WHERE guild_id = $1 AND role_id = $2"""
+_delete_section_entries_sql = """DELETE FROM sectionrole_entry e
+                                 USING sectionrole s
+                                 WHERE e.role_id = s.role_id AND s.guild_id = $1 AND e.entry_id = $2"""
+
 
 class ChangedRoleStatus(IntEnum):
     ADDED = 0
@@ -51,17 +63,10 @@ class SectionRolesService(BaseService):
 
     @classmethod
     async def on_role_delete(cls, event: hikari.RoleDeleteEvent):
-        sc_roles: list[DatabaseSectionRole] = (await DatabaseSectionRole
-                                               .filter(guild_id=event.guild_id)
-                                               .prefetch_related("entries"))
-
-        for sc_role in sc_roles:
-            if sc_role.role_id == event.role_id:
-                await sc_role.delete()
-            else:
-                for entry in sc_role.entries:
-                    if event.role_id == entry.entry_id:
-                        await entry.delete()
+        # Entries of a deleted section role are removed by the foreign key cascade
+        async with cls.bot.db.transaction():
+            await cls.bot.db.execute(_delete_section_role_sql, event.guild_id, event.role_id)
+            await cls.bot.db.execute(_delete_section_entries_sql, event.guild_id, event.role_id)
 
     @classmethod
     async def on_member_update(cls, event: hikari.MemberUpdateEvent):
@@ -79,40 +84,39 @@ class SectionRolesService(BaseService):
         if changed_role.id is None:
             return
 
-        role_models: list[DatabaseSectionRole] = (await DatabaseSectionRole
-                                                  .filter(guild_id=event.guild_id)
-                                                  .prefetch_related("entries"))
+        records = await cls.bot.db.fetch(_fetch_guild_section_roles_sql, event.guild_id)
 
-        for role_model in role_models:
-            entries = {entry.entry_id for entry in role_model.entries}
+        for record in records:
+            role_id = hikari.Snowflake(record["role_id"])
+            entries = set(record["entries"])
             diff = entries - set(event.member.role_ids)
-            group_role = cls.bot.cache.get_role(role_model.role_id)
+            group_role = cls.bot.cache.get_role(role_id)
 
             if not group_role:
                 return
 
             # Если нет необходимой одной роли, то удаляем секционную роль
             if diff == entries:
-                await cls._remove_role(event.member, role_model.role_id)
+                await cls._remove_role(event.member, role_id)
             else:
                 # Ветка TopDown. Если есть роль выше секционной, то добавляем
-                if role_model.hierarchy == HierarchyRoles.TopDown:
+                if record["hierarchy"] == HierarchyRoles.TopDown:
                     if group_role.position < event.member.get_top_role().position:
-                        await cls._add_role(event.member, role_model.role_id)
+                        await cls._add_role(event.member, role_id)
                     else:
-                        await cls._remove_role(event.member, role_model.role_id)
+                        await cls._remove_role(event.member, role_id)
 
                 # Если роль, которая изменилась секционная, то добавляем
-                elif role_model.hierarchy == HierarchyRoles.Missing:
-                    await cls._add_role(event.member, role_model.role_id)
+                elif record["hierarchy"] == HierarchyRoles.Missing:
+                    await cls._add_role(event.member, role_id)
 
-                elif role_model.hierarchy == HierarchyRoles.BottomTop:
+                elif record["hierarchy"] == HierarchyRoles.BottomTop:
                     # Если секционная роль не самая низкая, то добавляем
                     min_role = sorted(event.member.get_roles(), key=lambda r: r.position)[1]
                     if group_role.position > min_role.position:
-                        await cls._add_role(event.member, role_model.role_id)
+                        await cls._add_role(event.member, role_id)
                     else:
-                        await cls._remove_role(event.member, role_model.role_id)
+                        await cls._remove_role(event.member, role_id)
 
     @classmethod
     async def _add_role(cls, member: hikari.Member, role_id: hikari.Snowflake):
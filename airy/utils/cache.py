@@ -0,0 +1,430 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+import contextvars
+import functools
+import time
+import typing as t
+import weakref
+
+import attr
+
+__all__ = (
+    "AsyncCache",
+    "CacheStats",
+    "ExpiringCache",
+    "LRUCache",
+    "MISSING",
+    "invalidate_tag",
+    "memoize",
+    "reset_stats",
+    "stats",
+)
+
+K = t.TypeVar("K")
+V = t.TypeVar("V")
+T = t.TypeVar("T")
+
+_caches: weakref.WeakSet[AsyncCache[t.Any, t.Any]] = weakref.WeakSet()
+
+
+class _Missing:
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+    def __bool__(self) -> bool:
+        return False
+
+
+MISSING: t.Final[t.Any] = _Missing()
+"""Returned by lookups that found nothing, as None is a valid cached value."""
+
+
+@attr.define()
+class CacheStats:
+    """Lookup counters of a cache."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    """Entries dropped to stay within the size limit. Expired entries are not counted."""
+    coalesced: int = 0
+    """Misses that waited for a load already in flight instead of starting their own."""
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def reset(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "coalesced": self.coalesced,
+            "hit_rate": self.hit_rate,
+        }
+
+
+class LRUCache(t.Generic[K, V]):
+    """
+    A size-bounded mapping that drops the least recently used entry when full,
+    and optionally forgets entries after a time to live.
+    """
+
+    __slots__ = ("maxsize", "ttl", "stats", "on_evict", "_data")
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float | None = None,
+        *,
+        on_evict: t.Callable[[K], None] | None = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        maxsize : int
+            The maximum amount of entries.
+        ttl : Optional[float]
+            The default amount of seconds an entry stays valid for, None to keep entries until they are evicted.
+        on_evict : Optional[Callable[[K], None]]
+            Called with the key of every entry dropped because it expired or the cache was full.
+        """
+        self.maxsize: int = maxsize
+        self.ttl: float | None = ttl
+        self.stats: CacheStats = CacheStats()
+        self.on_evict: t.Callable[[K], None] | None = on_evict
+        self._data: collections.OrderedDict[K, tuple[V, float | None]] = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and not self._is_expired(entry)
+
+    @staticmethod
+    def _is_expired(entry: tuple[t.Any, float | None]) -> bool:
+        return entry[1] is not None and entry[1] <= time.monotonic()
+
+    def get(self, key: K, default: t.Any = MISSING) -> V | t.Any:
+        """Get the value of a key, marking it as recently used. Returns `default` if it is missing or expired."""
+        entry = self._data.get(key)
+
+        if entry is None:
+            self.stats.misses += 1
+            return default
+
+        if self._is_expired(entry):
+            del self._data[key]
+            if self.on_evict is not None:
+                self.on_evict(key)
+            self.stats.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.stats.hits += 1
+        return entry[0]
+
+    def set(self, key: K, value: V, *, ttl: float | None | _Missing = MISSING) -> None:
+        """Store a value, evicting the least recently used entry if the cache is full.
+
+        `ttl` overrides the default time to live of the cache for this entry.
+        """
+        ttl = self.ttl if ttl is MISSING else ttl
+        self._data[key] = (value, time.monotonic() + ttl if ttl is not None else None)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            evicted, _ = self._data.popitem(last=False)
+            self.stats.evictions += 1
+            if self.on_evict is not None:
+                self.on_evict(evicted)
+
+    def pop(self, key: K, default: t.Any = None) -> V | t.Any:
+        """Remove a key, returning its value if it was present and not expired."""
+        entry = self._data.pop(key, None)
+        if entry is None or self._is_expired(entry):
+            return default
+        return entry[0]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def keys(self) -> list[K]:
+        return list(self._data.keys())
+
+
+class ExpiringCache(dict):  # type: ignore[type-arg]
+    """A plain dict that forgets its keys `seconds` after they were set."""
+
+    def __init__(self, seconds: float) -> None:
+        self.__ttl: float = seconds
+        super().__init__()
+
+    def __verify_cache_integrity(self) -> None:
+        # Have to do this in two steps, the dict can't change size while it is iterated over
+        current_time = time.monotonic()
+        to_remove = [k for (k, (_, stored)) in super().items() if current_time > (stored + self.__ttl)]
+        for k in to_remove:
+            del self[k]
+
+    def __contains__(self, key: object) -> bool:
+        self.__verify_cache_integrity()
+        return super().__contains__(key)
+
+    def __getitem__(self, key: t.Any) -> t.Any:
+        self.__verify_cache_integrity()
+        return super().__getitem__(key)[0]
+
+    def get(self, key: t.Any, default: t.Any = None) -> t.Any:
+        self.__verify_cache_integrity()
+        entry = super().get(key)
+        return default if entry is None else entry[0]
+
+    def __setitem__(self, key: t.Any, value: t.Any) -> None:
+        super().__setitem__(key, (value, time.monotonic()))
+
+
+class AsyncCache(t.Generic[K, V]):
+    """
+    A read-through cache for coroutines, backed by an `LRUCache`.
+
+    Concurrent misses for the same key share one call of the loader, so a burst of events
+    all asking for the same uncached row results in a single query.
+    Entries can be stored with tags, evicting a tag evicts every entry it was given to,
+    also across caches with the module-level `invalidate_tag`.
+    """
+
+    def __init__(
+        self,
+        *,
+        name: str | None = None,
+        maxsize: int = 1024,
+        ttl: float | None = None,
+        negative_ttl: float | None | _Missing = MISSING,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        name : Optional[str]
+            The name the cache is reported under in `stats`.
+        maxsize : int
+            The maximum amount of cached keys.
+        ttl : Optional[float]
+            The amount of seconds an entry stays valid for, None to keep it until it is invalidated.
+        negative_ttl : Optional[float]
+            The amount of seconds a None result is remembered for, defaults to `ttl`.
+        """
+        self.name: str | None = name
+        self.negative_ttl: float | None | _Missing = negative_ttl
+        self._entries: LRUCache[K, V | None] = LRUCache(maxsize, ttl, on_evict=self._untag)
+        self._inflight: dict[K, asyncio.Future[V | None]] = {}
+        self._tags: dict[t.Hashable, set[K]] = {}
+        self._key_tags: dict[K, tuple[t.Hashable, ...]] = {}
+        # Bumped on every invalidation, so a load that raced with one does not store stale data
+        self._generation: int = 0
+        _caches.add(self)
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        if self.name is None:
+            self.name = owner.__name__
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._entries
+
+    @property
+    def stats(self) -> CacheStats:
+        return self._entries.stats
+
+    async def get(
+        self,
+        key: K,
+        loader: t.Callable[[], t.Awaitable[V | None]],
+        *,
+        tags: t.Iterable[t.Hashable] | t.Callable[[V | None], t.Iterable[t.Hashable]] = (),
+    ) -> V | None:
+        """
+        Get the value stored under `key`, calling `loader` to produce it on a miss.
+
+        Parameters
+        ----------
+        key : K
+            The key of the value.
+        loader : Callable[[], Awaitable[Optional[V]]]
+            Produces the value if it is not cached and no other caller is already loading it.
+        tags : Union[Iterable[Hashable], Callable[[Optional[V]], Iterable[Hashable]]]
+            The tags to store the loaded value with, or a function building them from it.
+        """
+        value = self._entries.get(key)
+        if value is not MISSING:
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            # The load runs as its own task, so a cancelled caller does not cancel it for everyone else.
+            # Its result is shared, so it runs in an empty context, outside any transaction of the caller.
+            task = asyncio.get_running_loop().create_task(self._load(key, loader, tags), context=contextvars.Context())
+            task.add_done_callback(functools.partial(self._load_done, key))
+            self._inflight[key] = task
+        else:
+            self.stats.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    async def _load(
+        self,
+        key: K,
+        loader: t.Callable[[], t.Awaitable[V | None]],
+        tags: t.Iterable[t.Hashable] | t.Callable[[V | None], t.Iterable[t.Hashable]],
+    ) -> V | None:
+        generation = self._generation
+        value = await loader()
+        if generation == self._generation:
+            self.set(key, value, tags=tags(value) if callable(tags) else tags)
+        return value
+
+    def _load_done(self, key: K, task: asyncio.Future[V | None]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+        # Mark a failure as retrieved, every caller waiting for it may have been cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def set(self, key: K, value: V | None, *, tags: t.Iterable[t.Hashable] = ()) -> None:
+        """Store a value, None results are kept for `negative_ttl` seconds."""
+        self._untag(key)
+        self._entries.set(key, value, ttl=self.negative_ttl if value is None else MISSING)
+
+        tags = tuple(tags)
+        if tags:
+            self._key_tags[key] = tags
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+
+    def invalidate(self, *keys: K) -> None:
+        """Forget the given keys, call this after writing to the data they belong to."""
+        self._generation += 1
+        for key in keys:
+            self._entries.pop(key)
+            self._untag(key)
+            # Callers arriving after this start a fresh load instead of waiting for a stale one
+            self._inflight.pop(key, None)
+
+    def invalidate_tag(self, *tags: t.Hashable) -> None:
+        """Forget every key stored with any of the given tags."""
+        keys: set[K] = set()
+        for tag in tags:
+            keys.update(self._tags.get(tag, ()))
+
+        if keys:
+            self.invalidate(*keys)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+        self._inflight.clear()
+        self._tags.clear()
+        self._key_tags.clear()
+
+    def _untag(self, key: K) -> None:
+        for tag in self._key_tags.pop(key, ()):
+            keys = self._tags.get(tag)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del self._tags[tag]
+
+
+def _make_key(args: tuple[t.Any, ...], kwargs: dict[str, t.Any]) -> t.Hashable:
+    if not kwargs:
+        return args[0] if len(args) == 1 else args
+    return args, tuple(sorted(kwargs.items()))
+
+
+def memoize(
+    *,
+    maxsize: int = 1024,
+    ttl: float | None = None,
+    negative_ttl: float | None | _Missing = MISSING,
+    key: t.Callable[..., t.Hashable] | None = None,
+    tags: t.Callable[..., t.Iterable[t.Hashable]] | None = None,
+) -> t.Callable[[t.Callable[..., t.Awaitable[T]]], t.Callable[..., t.Awaitable[T]]]:
+    """
+    Cache the results of a coroutine function in an `AsyncCache`, reachable as its `cache` attribute.
+
+    Parameters
+    ----------
+    maxsize : int
+        The maximum amount of cached results.
+    ttl : Optional[float]
+        The amount of seconds a result stays valid for, None to keep it until it is invalidated.
+    negative_ttl : Optional[float]
+        The amount of seconds a None result is remembered for, defaults to `ttl`.
+    key : Optional[Callable[..., Hashable]]
+        Builds the cache key from the call arguments, defaults to the arguments themselves.
+    tags : Optional[Callable[..., Iterable[Hashable]]]
+        Builds the tags of a result from the call arguments.
+
+    Example
+    -------
+    ```py
+    @memoize(ttl=600, tags=lambda guild_id: [f"guild:{guild_id}"])
+    async def fetch_settings(guild_id: int) -> Settings:
+        ...
+
+    invalidate_tag("guild:1234")
+    ```
+    """
+
+    def decorator(func: t.Callable[..., t.Awaitable[T]]) -> t.Callable[..., t.Awaitable[T]]:
+        store: AsyncCache[t.Hashable, T] = AsyncCache(
+            name=func.__qualname__, maxsize=maxsize, ttl=ttl, negative_ttl=negative_ttl
+        )
+
+        @functools.wraps(func)
+        async def wrapper(*args: t.Any, **kwargs: t.Any) -> T:
+            cache_key = key(*args, **kwargs) if key is not None else _make_key(args, kwargs)
+            cache_tags = tags(*args, **kwargs) if tags is not None else ()
+            return await store.get(cache_key, lambda: func(*args, **kwargs), tags=cache_tags)  # type: ignore
+
+        wrapper.cache = store  # type: ignore
+        return wrapper
+
+    return decorator
+
+
+def invalidate_tag(*tags: t.Hashable) -> None:
+    """Evict every entry stored with any of the given tags, from all caches."""
+    for cache in list(_caches):
+        cache.invalidate_tag(*tags)
+
+
+def stats() -> dict[str, dict[str, float]]:
+    """The lookup counters and sizes of all named caches."""
+    return {
+        cache.name: {**cache.stats.summary(), "size": len(cache)}
+        for cache in sorted(_caches, key=lambda cache: cache.name or "")
+        if cache.name is not None
+    }
+
+
+def reset_stats() -> None:
+    """Reset the lookup counters of all caches."""
+    for cache in list(_caches):
+        cache.stats.reset()
@@ -1,12 +1,17 @@
+from __future__ import annotations
+
 import logging
+import typing
 
 import hikari
 import lightbulb
 
-from airy.models.bot import Airy
 from airy.models.context import AirySlashContext
 from airy.etc import RespondEmojiEnum, get_perm_str
 
+if typing.TYPE_CHECKING:
+    from airy.models.bot import Airy
+
 
 REQUIRED_PERMISSIONS = (
     hikari.Permissions.VIEW_AUDIT_LOG
@@ -1,5 +1,6 @@
 import asyncio
 import datetime
+import itertools
 import json
 import os
 import re
@@ -13,6 +14,7 @@ import asyncpg  # type: ignore
 import click
 
 from airy.config import db_config
+from airy.extensions.reminder.menu import _count_reminders_sql, _fetch_first_reminders_sql, _fetch_next_reminders_sql
 
 
 class Revisions(typing.TypedDict):
@@ -26,6 +28,12 @@ class Revisions(typing.TypedDict):
 
 REVISION_FILE = re.compile(r'(?P<kind>V|U)(?P<version>[0-9]+)__(?P<description>.+).sql')
 
+# Revisions with this header line are applied statement by statement outside of a transaction,
+# e.g. for CREATE INDEX CONCURRENTLY. Statements in such files have to end with a semicolon at the end of a line.
+NO_TRANSACTION_HEADER = re.compile(r'^--\s*Transaction:\s*none\s*$', re.IGNORECASE | re.MULTILINE)
+STATEMENT_END = re.compile(r';\s*$', re.MULTILINE)
+PARAMETER = re.compile(r'\$(\d+)')
+
 
 class Revision:
     __slots__ = ('kind', 'version', 'description', 'file')
@@ -42,6 +50,23 @@ class Revision:
             kind=match.group('kind'), version=int(match.group('version')), description=match.group('description'), file=file
         )
 
+    @property
+    def sql(self) -> str:
+        return self.file.read_text('utf-8')
+
+    @property
+    def transactional(self) -> bool:
+        return NO_TRANSACTION_HEADER.search(self.sql) is None
+
+    def statements(self) -> list[str]:
+        """Split the revision into its statements, skipping the ones that are only comments."""
+        statements = []
+        for chunk in STATEMENT_END.split(self.sql):
+            lines = [line for line in chunk.splitlines() if line.strip() and not line.strip().startswith('--')]
+            if lines:
+                statements.append('\n'.join(lines))
+        return statements
+
 
 class Migrations:
     def __init__(self, *, filename: str = 'migrations/revisions.json'):
@@ -116,17 +141,30 @@ class Migrations:
         return Revision(kind=kind, description=reason, version=self.version + 1, file=path)
 
     async def upgrade(self, connection: asyncpg.Connection) -> int:
-        ordered = self.ordered_revisions
+        pending = [revision for revision in self.ordered_revisions if revision.version > self.version]
         successes = 0
-        async with connection.transaction():
-            for revision in ordered:
-                if revision.version > self.version:
-                    sql = revision.file.read_text('utf-8')
-                    await connection.execute(sql)
+
+        # Consecutive transactional revisions are applied together, the others one statement at a time.
+        # The version is saved after every step, as those are not rolled back when a later one fails.
+        for transactional, group in itertools.groupby(pending, key=lambda r: r.transactional):
+            revisions = list(group)
+            if transactional:
+                async with connection.transaction():
+                    for revision in revisions:
+                        await connection.execute(revision.sql)
+
+                successes += len(revisions)
+                self.version += len(revisions)
+                self.save()
+            else:
+                for revision in revisions:
+                    for statement in revision.statements():
+                        await connection.execute(statement)
+
                     successes += 1
+                    self.version += 1
+                    self.save()
 
-        self.version += successes
-        self.save()
         return successes
 
     def display(self) -> None:
@@ -233,3 +271,63 @@ def log(reverse):
     for rev in revs:
         as_yellow = click.style(f'V{rev.version:>03}', fg='yellow')
         click.echo(f'{as_yellow} {rev.description.replace("_", " ")}')
+
+
+# The hot timer queries and the index each of them is expected to use, checked by `db explain`.
+# Queries with parameters are checked with their generic plan, the one used for every set of arguments.
+HOT_QUERIES: list[tuple[str, str, str]] = [
+    ('reminder list (count)', 'timer_member_event_expires_idx', _count_reminders_sql),
+    ('reminder list (first page)', 'timer_member_event_expires_idx', _fetch_first_reminders_sql),
+    ('reminder list (next page)', 'timer_member_event_expires_idx', _fetch_next_reminders_sql),
+    (
+        'mute lookup',
+        'timer_mute_extra_idx',
+        """SELECT id FROM timer WHERE event = 2 AND extra @> $1::jsonb""",
+    ),
+]
+
+
+def _plan_indexes(plan: dict[str, typing.Any]) -> set[str]:
+    indexes = {plan['Index Name']} if 'Index Name' in plan else set()
+    for child in plan.get('Plans', []):
+        indexes |= _plan_indexes(child)
+    return indexes
+
+
+async def run_explain(migrations: Migrations, as_is: bool) -> bool:
+    connection: asyncpg.Connection = await asyncpg.connect(migrations.database_uri)  # type: ignore
+    ok = True
+    try:
+        async with connection.transaction():
+            if not as_is:
+                # Small development tables are cheaper to scan, check that the indexes can be used at all
+                await connection.execute('SET LOCAL enable_seqscan = off')
+            await connection.execute('SET LOCAL plan_cache_mode = force_generic_plan')
+
+            for number, (name, index, query) in enumerate(HOT_QUERIES):
+                await connection.execute(f'PREPARE hot_query_{number} AS {query}')
+                parameters = max((int(parameter) for parameter in PARAMETER.findall(query)), default=0)
+                arguments = f'({", ".join(["NULL"] * parameters)})' if parameters else ''
+                result = await connection.fetchval(f'EXPLAIN (FORMAT JSON) EXECUTE hot_query_{number}{arguments}')
+                plan = json.loads(result)[0]['Plan']
+                used = _plan_indexes(plan)
+
+                if index in used:
+                    click.echo(f'{click.style("OK", fg="green")}   {name}: uses {index}')
+                else:
+                    ok = False
+                    click.echo(f'{click.style("FAIL", fg="red")} {name}: expected {index}, '
+                               f'got {", ".join(sorted(used)) or plan["Node Type"]}')
+    finally:
+        await connection.close()
+
+    return ok
+
+
+@db.command()
+@click.option('--as-is', help='Keep the planner settings, sequential scans may win on small tables.', is_flag=True)
+def explain(as_is):
+    """Checks that the hot queries use their indexes"""
+    migrations = Migrations()
+    if not asyncio.run(run_explain(migrations, as_is)):
+        raise SystemExit(1)
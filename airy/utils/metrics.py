@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import bisect
+import math
+import typing
+
+__all__ = ("Histogram", "exponential_buckets")
+
+
+def exponential_buckets(start: float, factor: float, count: int) -> tuple[float, ...]:
+    """Get `count` bucket upper bounds, starting at `start` and growing by `factor`."""
+    return tuple(start * factor ** i for i in range(count))
+
+
+# From 1ms to roughly 4.5 minutes
+DEFAULT_BUCKETS = exponential_buckets(0.001, 2, 19)
+
+
+class Histogram:
+    """
+    A fixed-bucket histogram for latencies and other non-negative measurements.
+
+    Observing a value is O(log n) in the amount of buckets and the memory use is constant,
+    quantiles are estimated by interpolating inside the bucket they fall into.
+    """
+
+    __slots__ = ("bounds", "counts", "count", "total", "min", "max")
+
+    def __init__(self, bounds: typing.Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """
+        Parameters
+        ----------
+        bounds : Sequence[float]
+            The upper bounds of the buckets, in ascending order. Larger values go into an overflow bucket.
+        """
+        self.bounds: tuple[float, ...] = tuple(bounds)
+        self.counts: list[int] = [0] * (len(self.bounds) + 1)
+        self.count: int = 0
+        self.total: float = 0.0
+        self.min: float = math.inf
+        self.max: float = -math.inf
+
+    def __repr__(self) -> str:
+        return f"Histogram(count={self.count}, mean={self.mean:.4f}, p99={self.quantile(0.99):.4f})"
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def observe(self, value: float) -> None:
+        """Record a single measurement."""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Estimate the value below which the fraction `q` of all measurements fall."""
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.bounds[index - 1] if index > 0 else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else self.max
+                estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(max(estimate, self.min), self.max)
+            seen += bucket_count
+
+        return self.max
+
+    def reset(self) -> None:
+        """Forget every measurement."""
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def summary(self) -> dict[str, float]:
+        """Get the count, mean, common quantiles and maximum of the measurements."""
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "max": self.max if self.count else 0.0,
+        }
@@ -20,7 +20,7 @@ class IntervalLoop:
             seconds = seconds or 0
             minutes = minutes or 0
             hours = hours or 0
-            days = hours or 0
+            days = days or 0
 
         self._coro = callback
         self._task: t.Optional[asyncio.Task] = None
@@ -46,6 +46,7 @@ class IntervalLoop:
                 else:
                     raise RuntimeError(f"Task failed repeatedly, stopping it. Exception: {e}")
             else:
+                self._failed = 0  # Only consecutive failures stop the loop
                 await asyncio.sleep(self._sleep)
         self.cancel()
 
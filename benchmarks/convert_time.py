@@ -0,0 +1,94 @@
+"""
+Micro-benchmark of the time conversion used by `/reminder create`.
+
+Compares the previous inline implementation of `SchedulerService.convert_time` with `TimeParser`.
+The user timezone lookup is simulated with a fixed delay standing in for the database round trip.
+
+Usage: python -m benchmarks.convert_time [iterations]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import re
+import sys
+import time
+
+import dateparser  # type: ignore
+
+from airy.services.scheduler.parser import TimeParser
+
+DB_ROUND_TRIP = 0.001
+
+RELATIVE_INPUTS = ["10 minutes", "2h 30m", "1 day 4 hours", "3 weeks", "45 secs", "1,5 hours"]
+ABSOLUTE_INPUTS = ["tomorrow at 20:00", "2030-04-01", "next friday 9am", "December 24 18:00"]
+
+
+async def _load_timezone(_: int) -> str:
+    await asyncio.sleep(DB_ROUND_TRIP)
+    return "Europe/Berlin"
+
+
+async def legacy_convert_time(time_str: str, user_id: int) -> datetime.datetime | None:
+    """The implementation `convert_time` used before `TimeParser`, kept as the baseline."""
+    time_regex = re.compile(r"(\d+(?:[.,]\d+)?)\s?(\w+)")
+    time_letter_dict = {
+        "h": 3600, "s": 1, "m": 60, "d": 86400, "w": 86400 * 7, "M": 86400 * 30, "Y": 86400 * 365, "y": 86400 * 365,
+    }
+    time_word_dict = {
+        "hour": 3600, "second": 1, "minute": 60, "day": 86400, "week": 86400 * 7, "month": 86400 * 30,
+        "year": 86400 * 365, "sec": 1, "min": 60,
+    }
+    seconds = 0.0
+
+    for input_str, category in time_regex.findall(time_str):
+        input_str = input_str.replace(",", ".")
+        if len(category) == 1:
+            if value := time_letter_dict.get(category):
+                seconds += value * float(input_str)
+        else:
+            for string, value in time_word_dict.items():
+                if category.lower() == string or category.lower()[:-1] == string:
+                    seconds += value * float(input_str)
+                    break
+
+    if seconds > 0:
+        return datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=seconds)
+
+    timezone = await _load_timezone(user_id)
+    return dateparser.parse(
+        time_str, settings={"RETURN_AS_TIMEZONE_AWARE": True, "TIMEZONE": timezone, "NORMALIZE": True}
+    )
+
+
+async def parser_convert_time(parser: TimeParser, time_str: str, user_id: int) -> datetime.datetime | None:
+    seconds = parser.parse_relative(time_str)
+    if seconds > 0:
+        return datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=seconds)
+
+    return parser.parse_absolute(time_str, await parser.get_timezone(user_id))
+
+
+async def _measure(name: str, func, inputs: list[str], iterations: int) -> float:
+    start = time.perf_counter()
+    for i in range(iterations):
+        await func(inputs[i % len(inputs)], i % 50)
+    elapsed = (time.perf_counter() - start) / iterations
+    print(f"{name:<28} {elapsed * 1e6:>10.1f} us/call")
+    return elapsed
+
+
+async def main(iterations: int) -> None:
+    parser = TimeParser(_load_timezone)
+
+    for label, inputs in (("relative", RELATIVE_INPUTS), ("absolute", ABSOLUTE_INPUTS)):
+        legacy = await _measure(f"legacy ({label})", legacy_convert_time, inputs, iterations)
+        current = await _measure(
+            f"TimeParser ({label})", lambda text, user: parser_convert_time(parser, text, user), inputs, iterations
+        )
+        print(f"{'speedup':<28} {legacy / current:>10.1f}x\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
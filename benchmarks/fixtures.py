@@ -0,0 +1,159 @@
+"""
+Seed data for tests and benchmarks, written through the `Database` interface.
+
+Works against Postgres and against `SQLiteDatabase`, so benchmarks can run offline:
+
+    db = SQLiteDatabase()
+    await db.connect()
+    seeded = await seed(db, Scale(guilds=10))
+"""
+
+from __future__ import annotations
+
+import datetime
+import random
+
+import attr
+
+from airy.models.db.impl import Database
+
+__all__ = ("Scale", "Seeded", "seed")
+
+EMOJIS = ("👍", "👎", "🎉", "🔥", "❤️", "⭐", "✅", "❌", "🎮", "🎵")
+
+
+@attr.define()
+class Scale:
+    """How much data `seed` writes. Everything except `guilds` is per guild."""
+
+    guilds: int = 10
+    reaction_roles: int = 5
+    reaction_role_entries: int = 5
+    section_roles: int = 5
+    section_role_entries: int = 3
+    autoroles: int = 3
+    users: int = 100
+    timers: int = 200
+
+
+@attr.define()
+class Seeded:
+    """The ids written by `seed`, for looking the rows up again."""
+
+    guild_ids: list[int]
+    reaction_role_messages: list[tuple[int, int, int]]
+    """(guild_id, channel_id, message_id) of every reaction role message."""
+    section_role_ids: list[tuple[int, int]]
+    """(guild_id, role_id) of every section role."""
+    autorole_ids: list[tuple[int, int]]
+    """(guild_id, role_id) of every autorole."""
+    user_ids: list[int]
+
+
+def _snowflake(guild: int, kind: int, index: int) -> int:
+    # Unique per guild and kind, shaped like a real snowflake so shard routing works on them
+    return ((1_000_000 + guild) << 22) | (kind << 16) | index
+
+
+async def seed(db: Database, scale: Scale | None = None, *, seed_value: int = 0) -> Seeded:
+    """Write guilds with reaction roles, section roles, autoroles, users and timers.
+
+    Parameters
+    ----------
+    db : Database
+        The database to write to, its tables are expected to be empty.
+    scale : Optional[Scale]
+        How much data to write.
+    seed_value : int
+        Seeds the random expiry of timers, so runs are repeatable.
+    """
+    scale = scale or Scale()
+    rng = random.Random(seed_value)
+    now = datetime.datetime.now(datetime.timezone.utc)
+
+    guild_ids = [_snowflake(guild, 0, 0) for guild in range(scale.guilds)]
+    user_ids = [_snowflake(0, 1, user) for user in range(scale.users)]
+
+    messages = [
+        (guild_id, _snowflake(guild, 2, message), _snowflake(guild, 3, message))
+        for guild, guild_id in enumerate(guild_ids)
+        for message in range(scale.reaction_roles)
+    ]
+    section_roles = [
+        (guild_id, _snowflake(guild, 4, role))
+        for guild, guild_id in enumerate(guild_ids)
+        for role in range(scale.section_roles)
+    ]
+    autoroles = [
+        (guild_id, _snowflake(guild, 5, role))
+        for guild, guild_id in enumerate(guild_ids)
+        for role in range(scale.autoroles)
+    ]
+
+    async with db.transaction():
+        await db.insert_many("guild", ("guild_id",), ("bigint",), [(guild_id,) for guild_id in guild_ids])
+        await db.insert_many("users", ("id", "tz"), ("bigint", "text"), [(user_id, "UTC") for user_id in user_ids])
+
+        await db.insert_many(
+            "reactionrole",
+            ("guild_id", "channel_id", "message_id", "type", "max"),
+            ("bigint", "bigint", "bigint", "smallint", "smallint"),
+            [(guild_id, channel_id, message_id, 0, 0) for guild_id, channel_id, message_id in messages],
+        )
+        records = await db.fetch("""SELECT id, message_id FROM reactionrole""")
+        reaction_role_ids = {record["message_id"]: record["id"] for record in records}
+        await db.insert_many(
+            "reactionrole_entry",
+            ("id", "role_id", "emoji"),
+            ("int", "bigint", "text"),
+            [
+                (reaction_role_ids[message_id], message_id + 1 + entry, EMOJIS[entry % len(EMOJIS)])
+                for _, _, message_id in messages
+                for entry in range(scale.reaction_role_entries)
+            ],
+        )
+
+        await db.insert_many(
+            "sectionrole",
+            ("guild_id", "role_id", "hierarchy"),
+            ("bigint", "bigint", "smallint"),
+            [(guild_id, role_id, index % 3) for index, (guild_id, role_id) in enumerate(section_roles)],
+        )
+        await db.insert_many(
+            "sectionrole_entry",
+            ("role_id", "entry_id"),
+            ("bigint", "bigint"),
+            [
+                (role_id, role_id + 1 + entry)
+                for _, role_id in section_roles
+                for entry in range(scale.section_role_entries)
+            ],
+        )
+
+        await db.insert_many("autorole", ("guild_id", "role_id"), ("bigint", "bigint"), autoroles)
+
+        await db.insert_many(
+            "timer",
+            ("guild_id", "user_id", "channel_id", "expires", "event", "extra"),
+            ("bigint", "bigint", "bigint", "timestamptz", "smallint", "jsonb"),
+            [
+                (
+                    guild_id,
+                    rng.choice(user_ids) if user_ids else 0,
+                    guild_id,
+                    now + datetime.timedelta(seconds=rng.uniform(60, 7 * 86400)),
+                    1,  # TimerEnum.REMINDER
+                    {"message": f"Reminder {index}"},
+                )
+                for guild_id in guild_ids
+                for index in range(scale.timers)
+            ],
+        )
+
+    return Seeded(
+        guild_ids=guild_ids,
+        reaction_role_messages=messages,
+        section_role_ids=section_roles,
+        autorole_ids=autoroles,
+        user_ids=user_ids,
+    )
@@ -0,0 +1,120 @@
+"""
+Dispatch benchmark of `SchedulerServiceT` against the Postgres database configured in `.env`.
+
+Loads a batch of synthetic timers expiring within a short window, runs the scheduler with a fake
+application that only counts dispatched events and reports throughput, dispatch lag and database time.
+
+The timer table of the target database is truncated, point it at a scratch database with the migrations applied.
+
+Usage: python -m benchmarks.scheduler [--timers N] [--spread SECONDS] [--batch-size N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import json
+import time
+
+from tortoise import Tortoise
+
+from airy.models.db.impl import Database
+from airy.services.scheduler import SchedulerServiceT
+from airy.services.scheduler.dispatcher import TimerDispatcher
+from airy.services.scheduler.models import TimerEnum
+from airy.utils.time import utcnow
+
+# Seconds between loading the timers and the first of them expiring
+START_DELAY = 5.0
+
+_insert_timers_sql = """INSERT INTO timer (guild_id, user_id, channel_id, expires, created, event, extra)
+                        SELECT v.guild_id, v.user_id, v.channel_id, v.expires, now(), $5, '{}'::jsonb
+                        FROM unnest($1::bigint[], $2::bigint[], $3::bigint[], $4::timestamptz[])
+                            AS v (guild_id, user_id, channel_id, expires)"""
+
+
+class FakeApp:
+    """Just enough of `Airy` for the scheduler to run, events are counted instead of dispatched."""
+
+    is_ready = True
+    shard_count = 1
+    shards = {0: None}
+
+    def __init__(self, db: Database, expected: int) -> None:
+        self.db: Database = db
+        self.expected: int = expected
+        self.dispatched: int = 0
+        self.done: asyncio.Event = asyncio.Event()
+
+    async def wait_until_started(self) -> None:
+        return
+
+    async def dispatch(self, _) -> None:
+        self.dispatched += 1
+        if self.dispatched >= self.expected:
+            self.done.set()
+
+
+async def load_timers(db: Database, count: int, spread: float) -> datetime.datetime:
+    """Replace the contents of the timer table with `count` timers spread over `spread` seconds."""
+    first = utcnow() + datetime.timedelta(seconds=START_DELAY)
+    step = spread / max(count - 1, 1)
+
+    await db.execute("TRUNCATE timer RESTART IDENTITY")
+    await db.execute(
+        _insert_timers_sql,
+        [1000 + i % 500 for i in range(count)],
+        [2000 + i for i in range(count)],
+        [3000 + i % 500 for i in range(count)],
+        [first + datetime.timedelta(seconds=i * step) for i in range(count)],
+        int(TimerEnum.REMINDER),
+    )
+    return first
+
+
+async def main(args: argparse.Namespace) -> None:
+    db = Database(None)  # type: ignore
+    await db.connect()
+    # The scheduler loads timers through Tortoise and claims them through `Database`, both on the same pool
+    await Tortoise.init(db_url=db.dsn, modules={"models": ["airy.services.scheduler.models"]})
+    db.bind_tortoise()
+
+    try:
+        first = await load_timers(db, args.timers, args.spread)
+        print(f"Loaded {args.timers} timers expiring over {args.spread}s")
+
+        dispatcher = TimerDispatcher(
+            concurrency=32, global_rate=1e9, guild_rate=1e9, guild_burst=args.timers, max_pending=10_000
+        )
+        scheduler = SchedulerServiceT(
+            max_queue_size=max(args.timers, 10_000), batch_size=args.batch_size, dispatcher=dispatcher
+        )
+        app = FakeApp(db, args.timers)
+
+        scheduler.start(app)  # type: ignore
+        await asyncio.sleep(max(0.0, (first - utcnow()).total_seconds()))
+
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(app.done.wait(), timeout=args.spread + args.timeout)
+        except asyncio.TimeoutError:
+            print(f"Timed out with {app.dispatched} of {args.timers} timers dispatched")
+        elapsed = time.perf_counter() - started
+        stats = scheduler.stats()
+        await scheduler.close()
+
+        print(f"Dispatched {app.dispatched} timers in {elapsed:.2f}s ({app.dispatched / elapsed:.0f}/s)")
+        print(json.dumps(stats, indent=2))
+    finally:
+        await db.close()
+        await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--timers", type=int, default=100_000, help="The amount of timers to load.")
+    parser.add_argument("--spread", type=float, default=10.0, help="The seconds the expiries are spread over.")
+    parser.add_argument("--batch-size", type=int, default=500, help="The maximum amount of timers claimed at once.")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Extra seconds to wait for stragglers.")
+    asyncio.run(main(parser.parse_args()))
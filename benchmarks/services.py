@@ -0,0 +1,102 @@
+"""
+Benchmark of the database lookups done by the event handlers of the role services.
+
+Runs offline against `SQLiteDatabase` by default. Pass `--postgres` to run against the database configured
+in `.env` instead, it has to be a scratch database with the migrations applied and no guilds in it.
+Every lookup is measured uncached, with the model caches cleared before each call, and cached.
+The burst case fires `--burst` concurrent reaction lookups for the same uncached message.
+
+Usage: python -m benchmarks.services [--postgres] [--guilds N] [--iterations N] [--burst N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+import typing as t
+
+from airy.models.db import DatabaseGuild
+from airy.models.db.impl import Database
+from airy.models.db.impl.sqlite import SQLiteDatabase
+from airy.services.autorole.models import DatabaseAutoRole
+from airy.services.reactionrole.models import DatabaseReactionRole
+from airy.services.sectionrole import _fetch_guild_section_roles_sql
+from benchmarks.fixtures import Scale, Seeded, seed
+
+
+async def connect(postgres: bool) -> Database:
+    db = Database(None) if postgres else SQLiteDatabase()  # type: ignore
+    await db.connect()
+
+    if await db.fetchval("""SELECT count(*) FROM guild"""):
+        await db.close()
+        raise SystemExit(f"Refusing to seed {db.dsn}, it already holds guilds.")
+
+    return db
+
+
+def clear_caches() -> None:
+    for model in (DatabaseGuild, DatabaseAutoRole, DatabaseReactionRole):
+        model.cache.clear()
+
+
+async def measure(name: str, func: t.Callable[[], t.Awaitable[t.Any]], iterations: int, *, cold: bool) -> None:
+    timings = []
+    for _ in range(iterations):
+        if cold:
+            clear_caches()
+        start = time.perf_counter()
+        await func()
+        timings.append(time.perf_counter() - start)
+
+    timings.sort()
+    print(
+        f"{name:<28} {'cold' if cold else 'warm'}  median {statistics.median(timings) * 1e6:>9.1f} us"
+        f"   p99 {timings[int(len(timings) * 0.99) - 1] * 1e6:>9.1f} us"
+    )
+
+
+async def burst(seeded: Seeded, size: int) -> None:
+    _, channel_id, message_id = seeded.reaction_role_messages[0]
+    clear_caches()
+    before = DatabaseReactionRole.cache.stats.coalesced
+    start = time.perf_counter()
+    await asyncio.gather(*(DatabaseReactionRole.fetch(channel_id, message_id) for _ in range(size)))
+    elapsed = time.perf_counter() - start
+    coalesced = DatabaseReactionRole.cache.stats.coalesced - before
+    print(f"{'reaction burst':<28} {size} lookups in {elapsed * 1e3:.2f} ms, {size - coalesced} queries")
+
+
+async def main(args: argparse.Namespace) -> None:
+    db = await connect(args.postgres)
+    try:
+        seeded = await seed(db, Scale(guilds=args.guilds))
+        print(f"Seeded {args.guilds} guilds on {'postgres' if args.postgres else 'sqlite'}")
+
+        guild_id = seeded.guild_ids[0]
+        _, channel_id, message_id = seeded.reaction_role_messages[0]
+        lookups: dict[str, t.Callable[[], t.Awaitable[t.Any]]] = {
+            "guild": lambda: DatabaseGuild.fetch(guild_id),
+            "reaction role": lambda: DatabaseReactionRole.fetch(channel_id, message_id),
+            "reaction roles of guild": lambda: DatabaseReactionRole.fetch_all(guild_id),
+            "autoroles of guild": lambda: DatabaseAutoRole.fetch_all(guild_id),
+            "section roles of guild": lambda: db.fetch(_fetch_guild_section_roles_sql, guild_id),
+        }
+        for name, func in lookups.items():
+            await measure(name, func, args.iterations, cold=True)
+            await measure(name, func, args.iterations, cold=False)
+
+        await burst(seeded, args.burst)
+    finally:
+        await db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--postgres", action="store_true", help="Run against the configured Postgres database.")
+    parser.add_argument("--guilds", type=int, default=50, help="The amount of seeded guilds.")
+    parser.add_argument("--iterations", type=int, default=2000, help="The amount of lookups per variant.")
+    parser.add_argument("--burst", type=int, default=200, help="The amount of concurrent lookups in the burst.")
+    asyncio.run(main(parser.parse_args()))
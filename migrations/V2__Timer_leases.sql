@@ -0,0 +1,9 @@
+-- Revises: V1
+-- Creation Date: 2026-10-16 09:12:44.318210 UTC
+-- Reason: Timer leases
+
+ALTER TABLE timer ADD COLUMN IF NOT EXISTS lease_owner text;
+ALTER TABLE timer ADD COLUMN IF NOT EXISTS lease_expires timestamp with time zone;
+
+
+CREATE INDEX IF NOT EXISTS timer_lease_expires_idx ON timer (lease_expires) WHERE lease_owner IS NOT NULL;
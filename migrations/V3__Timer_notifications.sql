@@ -0,0 +1,40 @@
+-- Revises: V2
+-- Creation Date: 2026-10-16 10:47:03.552871 UTC
+-- Reason: Timer notifications
+
+CREATE OR REPLACE FUNCTION notify_timer_change() RETURNS trigger AS $$
+DECLARE
+    rec timer;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        rec := OLD;
+    ELSE
+        rec := NEW;
+    END IF;
+
+    PERFORM pg_notify('timer_changes', json_build_object(
+        'op', TG_OP,
+        'id', rec.id,
+        'guild_id', rec.guild_id,
+        'expires', rec.expires,
+        'lease_owner', rec.lease_owner
+    )::text);
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+
+DROP TRIGGER IF EXISTS timer_notify_insert_delete ON timer;
+CREATE TRIGGER timer_notify_insert_delete
+    AFTER INSERT OR DELETE ON timer
+    FOR EACH ROW EXECUTE FUNCTION notify_timer_change();
+
+
+-- Lease renewals and changes to extra do not affect scheduling and are not announced
+DROP TRIGGER IF EXISTS timer_notify_update ON timer;
+CREATE TRIGGER timer_notify_update
+    AFTER UPDATE ON timer
+    FOR EACH ROW
+    WHEN (OLD.expires IS DISTINCT FROM NEW.expires OR OLD.lease_owner IS DISTINCT FROM NEW.lease_owner)
+    EXECUTE FUNCTION notify_timer_change();
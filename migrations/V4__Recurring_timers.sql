@@ -0,0 +1,5 @@
+-- Revises: V3
+-- Creation Date: 2026-10-16 12:05:31.904417 UTC
+-- Reason: Recurring timers
+
+ALTER TABLE timer ADD COLUMN IF NOT EXISTS recurrence text;
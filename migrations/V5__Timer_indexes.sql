@@ -0,0 +1,14 @@
+-- Revises: V4
+-- Creation Date: 2026-10-16 13:21:48.310925 UTC
+-- Reason: Timer indexes
+-- Transaction: none
+
+-- Indexes are built concurrently so the timer table stays writable, which cannot happen inside a transaction.
+-- Every statement runs on its own, a failed build leaves an invalid index behind that is dropped on the next run.
+
+DROP INDEX CONCURRENTLY IF EXISTS timer_member_event_expires_idx;
+CREATE INDEX CONCURRENTLY timer_member_event_expires_idx ON timer (guild_id, user_id, event, expires, id);
+
+-- Mute timers are looked up by the contents of extra, other timer types never are
+DROP INDEX CONCURRENTLY IF EXISTS timer_mute_extra_idx;
+CREATE INDEX CONCURRENTLY timer_mute_extra_idx ON timer USING gin (extra jsonb_path_ops) WHERE event = 2;
@@ -30,6 +30,7 @@ async def main():
     from airy.models.bot import Airy
 
     bot = Airy()
+    starlette_app.state.bot = bot
 
     webserver = uvicorn.Server(
         config=uvicorn.Config(
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+import types
+import typing
+
+import pytest
+
+# The `config` and `airy.config` modules hold deployment secrets and are not part of the repository, the code
+# under test only needs them to be importable.
+if importlib.util.find_spec("config") is None:
+    sys.modules["config"] = types.ModuleType("config")
+if importlib.util.find_spec("airy.config") is None:
+    sys.modules["airy.config"] = types.ModuleType("airy.config")
+    sys.modules["airy.config"].db_config = None  # type: ignore
+
+from tortoise import Tortoise  # noqa: E402
+
+from airy.models.db.impl.sqlite import SQLiteDatabase  # noqa: E402
+
+
+@pytest.fixture()
+async def db() -> typing.AsyncIterator[SQLiteDatabase]:
+    database = SQLiteDatabase()
+    await database.connect()
+    yield database
+    await database.close()
+
+
+@pytest.fixture()
+async def tortoise() -> typing.AsyncIterator[None]:
+    """Initialize Tortoise, so models can be built from rows. Its own database is not used."""
+    await Tortoise.init(db_url="sqlite://:memory:", modules={"models": ["airy.services.scheduler.models"]})
+    yield
+    await Tortoise.close_connections()
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+
+import pytest
+
+from airy.utils.cache import AsyncCache, invalidate_tag
+
+
+class Loader:
+    """Counts its calls, each returns the call number after waiting for `release`."""
+
+    def __init__(self) -> None:
+        self.calls: int = 0
+        self.release: asyncio.Event = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self) -> int:
+        self.calls += 1
+        call = self.calls
+        await self.release.wait()
+        return call
+
+
+async def test_concurrent_misses_share_one_load():
+    cache: AsyncCache[str, int] = AsyncCache()
+    loader = Loader()
+    loader.release.clear()
+
+    lookups = [asyncio.create_task(cache.get("key", loader)) for _ in range(10)]
+    await asyncio.sleep(0)
+    loader.release.set()
+
+    assert await asyncio.gather(*lookups) == [1] * 10
+    assert loader.calls == 1
+    assert cache.stats.coalesced == 9
+    assert await cache.get("key", loader) == 1
+    assert cache.stats.hits == 1
+
+
+async def test_cancelled_caller_does_not_cancel_the_load():
+    cache: AsyncCache[str, int] = AsyncCache()
+    loader = Loader()
+    loader.release.clear()
+
+    first = asyncio.create_task(cache.get("key", loader))
+    second = asyncio.create_task(cache.get("key", loader))
+    await asyncio.sleep(0)
+    first.cancel()
+    loader.release.set()
+
+    assert await second == 1
+    assert loader.calls == 1
+
+
+async def test_failed_load_is_not_cached():
+    cache: AsyncCache[str, int] = AsyncCache()
+
+    async def fail() -> int:
+        raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        await cache.get("key", fail)
+
+    assert await cache.get("key", Loader()) == 1
+
+
+async def test_invalidate_tag_evicts_tagged_keys_of_every_cache():
+    guilds: AsyncCache[str, int] = AsyncCache()
+    members: AsyncCache[str, int] = AsyncCache()
+    guilds.set("guild", 1, tags=("guild:1",))
+    members.set("member", 2, tags=("guild:1", "user:2"))
+    members.set("other", 3, tags=("guild:2",))
+
+    invalidate_tag("guild:1")
+
+    assert "guild" not in guilds
+    assert "member" not in members
+    assert "other" in members
+
+    # The evicted key is untagged as well, storing it again without tags keeps it from later evictions
+    members.set("member", 4)
+    members.invalidate_tag("user:2")
+    assert "member" in members
+
+
+async def test_invalidation_discards_racing_load():
+    cache: AsyncCache[str, int] = AsyncCache()
+    loader = Loader()
+    loader.release.clear()
+
+    lookup = asyncio.create_task(cache.get("key", loader))
+    while not loader.calls:
+        await asyncio.sleep(0)
+    cache.invalidate("key")
+    loader.release.set()
+
+    assert await lookup == 1
+    assert "key" not in cache
+    assert await cache.get("key", loader) == 2
+
+
+async def test_load_runs_outside_the_callers_context():
+    cache: AsyncCache[str, str | None] = AsyncCache()
+    variable: contextvars.ContextVar[str | None] = contextvars.ContextVar("variable", default=None)
+
+    async def loader() -> str | None:
+        return variable.get()
+
+    # E.g. the connection of a transaction, a shared load must not run on it
+    variable.set("transaction")
+    assert await cache.get("key", loader) is None
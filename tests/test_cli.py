@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import json
+import typing
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import pytest
+
+from airy.utils.cli import Migrations
+
+
+class FakeConnection:
+    """Logs statements and transaction boundaries, failing on statements containing `FAIL`."""
+
+    def __init__(self) -> None:
+        self.log: list[str] = []
+
+    @asynccontextmanager
+    async def transaction(self) -> typing.AsyncIterator[None]:
+        self.log.append("begin")
+        try:
+            yield
+        except BaseException:
+            self.log.append("rollback")
+            raise
+        self.log.append("commit")
+
+    async def execute(self, query: str) -> str:
+        if "FAIL" in query:
+            raise RuntimeError(query)
+        self.log.append(query)
+        return "OK"
+
+
+def make_migrations(root: Path, revisions: dict[str, str]) -> Migrations:
+    for name, sql in revisions.items():
+        (root / name).write_text(sql, "utf-8")
+
+    filename = root / "revisions.json"
+    filename.write_text(json.dumps({"version": 0, "database_uri": "postgres://"}), "utf-8")
+    return Migrations(filename=str(filename))
+
+
+async def test_upgrade_groups_transactional_revisions(tmp_path: Path):
+    migrations = make_migrations(
+        tmp_path,
+        {
+            "V1__a.sql": "A1;",
+            "V2__b.sql": "B1;",
+            "V3__c.sql": "-- Transaction: none\nC1;\n-- A comment only\n;\nC2;",
+            "V4__d.sql": "D1;",
+        },
+    )
+    connection = FakeConnection()
+
+    assert await migrations.upgrade(connection) == 4  # type: ignore
+
+    assert connection.log == ["begin", "A1;", "B1;", "commit", "C1", "C2", "begin", "D1;", "commit"]
+    assert json.loads((tmp_path / "revisions.json").read_text("utf-8"))["version"] == 4
+
+
+async def test_upgrade_keeps_applied_revisions_on_failure(tmp_path: Path):
+    migrations = make_migrations(
+        tmp_path,
+        {"V1__a.sql": "A1;", "V2__b.sql": "-- transaction: NONE\nB1;\nFAIL;", "V3__c.sql": "C1;"},
+    )
+    connection = FakeConnection()
+
+    with pytest.raises(RuntimeError):
+        await migrations.upgrade(connection)  # type: ignore
+
+    # V1 was committed on its own, V2 is left half applied and is not counted
+    assert connection.log == ["begin", "A1;", "commit", "B1"]
+    assert json.loads((tmp_path / "revisions.json").read_text("utf-8"))["version"] == 1
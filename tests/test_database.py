@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import types
+import typing
+from contextlib import asynccontextmanager
+
+import pytest
+
+import config
+from airy.models.db.impl import Database
+from airy.models.db.impl.resilience import BreakerState, RetryPolicy
+from airy.models.db.impl.sqlite import SQLiteDatabase
+
+
+class FakeConnection:
+    """
+    Logs statements and transaction boundaries, nested transactions are savepoints like in asyncpg.
+
+    Statements fail with the errors in `failures` until it is empty.
+    """
+
+    def __init__(self, log: list[str], failures: list[BaseException]) -> None:
+        self.log: list[str] = log
+        self.failures: list[BaseException] = failures
+        self._depth: int = 0
+
+    @asynccontextmanager
+    async def transaction(self) -> typing.AsyncIterator[None]:
+        kind = "savepoint" if self._depth else "transaction"
+        self._depth += 1
+        self.log.append(f"begin {kind}")
+        try:
+            yield
+        except BaseException:
+            self.log.append(f"rollback {kind}")
+            raise
+        else:
+            self.log.append(f"commit {kind}")
+        finally:
+            self._depth -= 1
+
+    def _run(self, query: str) -> None:
+        self.log.append(query)
+        if self.failures:
+            raise self.failures.pop(0)
+
+    async def execute(self, query: str, *args, timeout: float | None = None) -> str:
+        self._run(query)
+        return "OK"
+
+    async def fetch(self, query: str, *args, timeout: float | None = None) -> list[typing.Any]:
+        self._run(query)
+        return []
+
+    async def fetchval(self, query: str, *args, column: int = 0, timeout: float | None = None) -> typing.Any:
+        self._run(query)
+        return 1
+
+
+class FakePool:
+    def __init__(self) -> None:
+        self.log: list[str] = []
+        self.failures: list[BaseException] = []
+        self.acquired: int = 0
+        self.released: int = 0
+
+    async def acquire(self) -> FakeConnection:
+        self.acquired += 1
+        return FakeConnection(self.log, self.failures)
+
+    async def release(self, con: FakeConnection) -> None:
+        self.released += 1
+
+
+@pytest.fixture()
+def pool(monkeypatch: pytest.MonkeyPatch) -> FakePool:
+    monkeypatch.setattr(config, "database", types.SimpleNamespace(), raising=False)
+    return FakePool()
+
+
+@pytest.fixture()
+def database(pool: FakePool) -> Database:
+    database = Database(None)  # type: ignore
+    database._pool = pool  # type: ignore
+    database.retry = RetryPolicy(attempts=3, base_delay=0.0)
+    return database
+
+
+async def test_transaction_runs_on_one_connection(database: Database, pool: FakePool):
+    async with database.transaction() as con:
+        await database.execute("A")
+        async with database.acquire() as acquired:
+            assert acquired is con
+        await database.execute("B")
+
+    assert pool.log == ["begin transaction", "A", "B", "commit transaction"]
+    assert pool.acquired == pool.released == 1
+
+
+async def test_nested_transaction_rolls_back_to_savepoint(database: Database, pool: FakePool):
+    async with database.transaction():
+        await database.execute("A")
+        with pytest.raises(ValueError):
+            async with database.transaction():
+                await database.execute("B")
+                raise ValueError
+        await database.execute("C")
+
+    assert pool.log == [
+        "begin transaction", "A", "begin savepoint", "B", "rollback savepoint", "C", "commit transaction"
+    ]
+    assert pool.acquired == 1
+
+
+async def test_transaction_rolls_back_on_error(database: Database, pool: FakePool):
+    with pytest.raises(ValueError):
+        async with database.transaction():
+            await database.execute("A")
+            raise ValueError
+
+    # Statements after the block get a connection of their own again
+    await database.execute("B")
+
+    assert pool.log == ["begin transaction", "A", "rollback transaction", "B"]
+    assert pool.acquired == pool.released == 2
+
+
+async def test_health_check_probes_half_open_breaker(database: Database, pool: FakePool):
+    database.breaker.failure_threshold = 1
+    database.breaker.reset_timeout = 0.0
+    database.breaker.record_failure(OSError("connection refused"))
+
+    # Nothing else runs on an idle bot, the healthcheck itself has to let the trial statement through
+    assert not database.is_healthy
+    assert await database.check_health()
+    assert pool.log == ["SELECT 1"]
+
+
+async def test_acquire_records_the_outcome_of_the_block(database: Database):
+    database.breaker.failure_threshold = 1
+
+    with pytest.raises(ConnectionResetError):
+        async with database.acquire():
+            raise ConnectionResetError
+
+    assert database.breaker.state is not BreakerState.CLOSED
+
+
+async def test_read_is_retried_on_transient_error(database: Database, pool: FakePool):
+    pool.failures.append(ConnectionResetError())
+
+    assert await database.fetch("SELECT 1") == []
+    assert pool.log == ["SELECT 1", "SELECT 1"]
+    assert pool.acquired == pool.released == 2
+
+
+async def test_write_is_not_retried(database: Database, pool: FakePool):
+    pool.failures.append(ConnectionResetError())
+
+    # The connection may have broken after the server applied the write
+    with pytest.raises(ConnectionResetError):
+        await database.execute("UPDATE timer SET expires = now()")
+    assert len(pool.log) == 1
+
+
+async def test_read_is_not_retried_on_statement_error(database: Database, pool: FakePool):
+    pool.failures.append(ValueError())
+
+    with pytest.raises(ValueError):
+        await database.fetch("SELECT 1")
+    assert pool.log == ["SELECT 1"]
+
+
+async def test_read_is_not_retried_in_transaction(database: Database, pool: FakePool):
+    with pytest.raises(ConnectionResetError):
+        async with database.transaction():
+            pool.failures.append(ConnectionResetError())
+            await database.fetch("SELECT 1")
+
+    assert pool.log == ["begin transaction", "SELECT 1", "rollback transaction"]
+
+
+async def test_retries_stop_after_the_last_attempt(database: Database, pool: FakePool):
+    database.breaker.failure_threshold = 10
+    pool.failures.extend(ConnectionResetError() for _ in range(5))
+
+    with pytest.raises(ConnectionResetError):
+        await database.fetch("SELECT 1")
+    assert pool.log == ["SELECT 1"] * 3
+    assert database.breaker.failures == 3
+
+
+async def test_sqlite_nested_transaction_rollback(db: SQLiteDatabase):
+    async with db.transaction():
+        await db.execute("INSERT INTO guild (guild_id) VALUES ($1)", 1)
+        with pytest.raises(ValueError):
+            async with db.transaction():
+                await db.execute("INSERT INTO guild (guild_id) VALUES ($1)", 2)
+                raise ValueError
+        await db.execute("INSERT INTO guild (guild_id) VALUES ($1)", 3)
+
+    assert [record[0] for record in await db.fetch("SELECT guild_id FROM guild ORDER BY guild_id")] == [1, 3]
+
+    with pytest.raises(ValueError):
+        async with db.transaction():
+            await db.execute("DELETE FROM guild")
+            raise ValueError
+
+    assert await db.fetchval("SELECT count(*) FROM guild") == 2
+
+
+async def test_insert_many(db: SQLiteDatabase):
+    rows = [(1, "Europe/Berlin"), (2, "UTC")]
+
+    assert await db.insert_many("users", ("id", "tz"), ("bigint", "text"), rows) == 2
+    assert await db.insert_many("users", ("id", "tz"), ("bigint", "text"), []) == 0
+
+    users = await db.fetch("SELECT id, tz FROM users ORDER BY id")
+    assert [tuple(record) for record in users] == rows
+
+
+async def test_insert_many_skips_conflicts(db: SQLiteDatabase):
+    await db.insert_many("users", ("id", "tz"), ("bigint", "text"), [(1, "UTC")])
+
+    inserted = await db.insert_many(
+        "users", ("id", "tz"), ("bigint", "text"), [(1, "Europe/Berlin"), (2, "UTC")], conflict=("id",)
+    )
+
+    assert inserted == 1
+    assert await db.fetchval("SELECT tz FROM users WHERE id = $1", 1) == "UTC"
+
+
+async def test_insert_many_updates_conflicts(db: SQLiteDatabase):
+    await db.insert_many("users", ("id", "tz"), ("bigint", "text"), [(1, "UTC")])
+
+    updated = await db.insert_many(
+        "users", ("id", "tz"), ("bigint", "text"), [(1, "Europe/Berlin"), (2, "UTC")], conflict=("id",), update=("tz",)
+    )
+
+    assert updated == 2
+    assert await db.fetchval("SELECT tz FROM users WHERE id = $1", 1) == "Europe/Berlin"
+
+
+async def test_insert_many_needs_a_type_per_column(db: SQLiteDatabase):
+    with pytest.raises(ValueError):
+        await db.insert_many("users", ("id", "tz"), ("bigint",), [(1, "UTC")])
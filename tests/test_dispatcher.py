@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import types
+
+import pytest
+
+from airy.services.scheduler.dispatcher import TimerDispatcher
+from airy.utils.time import utcnow
+
+
+class FakeApp:
+    def __init__(self) -> None:
+        self.dispatched: list[types.SimpleNamespace] = []
+
+    async def dispatch(self, event: types.SimpleNamespace) -> None:
+        self.dispatched.append(event)
+
+
+def make_event(timer_id: int, guild_id: int) -> types.SimpleNamespace:
+    """An object with the attributes of a timer event the dispatcher uses."""
+    return types.SimpleNamespace(guild_id=guild_id, timer=types.SimpleNamespace(id=timer_id, expires=utcnow()))
+
+
+@pytest.fixture()
+def app() -> FakeApp:
+    return FakeApp()
+
+
+async def test_throttled_guild_does_not_block_others(app: FakeApp):
+    dispatcher = TimerDispatcher(concurrency=1, guild_rate=10.0, guild_burst=1)
+    dispatcher.start(app)  # type: ignore
+    for timer_id, guild_id in enumerate((1, 1, 1, 2)):
+        await dispatcher.put(make_event(timer_id, guild_id))  # type: ignore
+
+    await asyncio.wait_for(dispatcher.join(), timeout=1.0)
+    dispatcher.stop()
+
+    # Events of guild 1 are set aside while it is over its rate, in their original order
+    assert [event.timer.id for event in app.dispatched] == [0, 3, 1, 2]
+
+
+async def test_global_rate_is_respected(app: FakeApp):
+    dispatcher = TimerDispatcher(concurrency=4, global_rate=20.0, guild_burst=1)
+    loop = asyncio.get_running_loop()
+    dispatcher.start(app)  # type: ignore
+
+    started = loop.time()
+    for timer_id in range(30):
+        await dispatcher.put(make_event(timer_id, timer_id))  # type: ignore
+    await asyncio.wait_for(dispatcher.join(), timeout=2.0)
+    dispatcher.stop()
+
+    # A burst of 20 events, the remaining 10 at 20 per second
+    assert len(app.dispatched) == 30
+    assert loop.time() - started >= 0.45
+
+
+async def test_put_waits_while_the_queue_is_full(app: FakeApp):
+    dispatcher = TimerDispatcher(max_pending=2)
+    await dispatcher.put(make_event(1, 1))  # type: ignore
+    await dispatcher.put(make_event(2, 2))  # type: ignore
+
+    blocked = asyncio.create_task(dispatcher.put(make_event(3, 3)))  # type: ignore
+    await asyncio.sleep(0.01)
+    assert not blocked.done() and dispatcher.pending == 2
+
+    dispatcher.start(app)  # type: ignore
+    await asyncio.wait_for(blocked, timeout=1.0)
+    await asyncio.wait_for(dispatcher.join(), timeout=1.0)
+    dispatcher.stop()
+
+    assert len(app.dispatched) == 3
+
+
+async def test_stop_returns_undispatched_events(app: FakeApp):
+    dispatcher = TimerDispatcher(concurrency=1, guild_rate=0.001, guild_burst=1)
+    due = utcnow() - datetime.timedelta(minutes=1)
+    dispatcher.start(app)  # type: ignore
+    for timer_id in range(3):
+        await dispatcher.put(make_event(timer_id, 1), due)  # type: ignore
+    await asyncio.sleep(0.01)
+
+    assert dispatcher.pending == 2
+    dropped = await dispatcher.close(timeout=0.01)
+
+    assert [event.timer.id for event in app.dispatched] == [0]
+    assert sorted((event.timer.id, event_due) for event, event_due in dropped) == [(1, due), (2, due)]
+    assert dispatcher.pending == 0
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import datetime
+
+from airy.services.scheduler.models import DatabaseTimer, TimerEnum
+from airy.services.scheduler.queue import TimerQueue
+from airy.utils.time import utcnow
+
+NOW = utcnow()
+
+
+def make_timer(timer_id: int, seconds: float) -> DatabaseTimer:
+    return DatabaseTimer(
+        id=timer_id, guild_id=1, user_id=1, expires=NOW + datetime.timedelta(seconds=seconds), event=TimerEnum.REMINDER
+    )
+
+
+def drain(queue: TimerQueue) -> list[int]:
+    return [queue.pop().id for _ in range(len(queue))]
+
+
+def test_pops_in_expiry_order():
+    queue = TimerQueue()
+    queue.load([make_timer(1, 30), make_timer(2, 10)], NOW + datetime.timedelta(minutes=1))
+    queue.push(make_timer(3, 20))
+    queue.push(make_timer(4, 120))  # Beyond the horizon, left in the database
+
+    assert 4 not in queue
+    assert drain(queue) == [2, 3, 1]
+    assert queue.peek() is None
+
+
+def test_replaced_and_removed_timers_are_skipped():
+    queue = TimerQueue()
+    queue.load([make_timer(1, 10), make_timer(2, 20)], NOW + datetime.timedelta(minutes=1))
+
+    queue.push(make_timer(1, 30))
+    queue.push(make_timer(2, 20))  # The same expiry as the entry it replaces
+    assert queue.remove(3) is None
+
+    assert drain(queue) == [2, 1]
+
+
+def test_trim_pulls_in_the_horizon():
+    queue = TimerQueue(max_size=2)
+    queue.load([make_timer(i, i) for i in range(1, 5)], NOW + datetime.timedelta(minutes=1))
+
+    assert len(queue) == 2
+    assert queue.horizon == NOW + datetime.timedelta(seconds=3)
+    assert not queue.push(make_timer(5, 3))
+    assert drain(queue) == [1, 2]
+
+
+def test_heap_is_compacted_under_update_churn():
+    queue = TimerQueue()
+    queue.load([make_timer(i, i) for i in range(10)], NOW + datetime.timedelta(hours=1))
+
+    for round_ in range(1000):
+        for i in range(10):
+            queue.push(make_timer(i, (i * 7 + round_) % 600))
+
+    assert len(queue) == 10
+    assert len(queue._heap) <= 2 * len(queue) + 64
+    expires = [queue.get(timer_id).expires for timer_id in range(10)]
+    assert [timer.expires for timer in (queue.pop() for _ in range(10))] == sorted(expires)
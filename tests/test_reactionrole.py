@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import asyncio
+import types
+
+import hikari
+import pytest
+
+from airy.models.db.impl.sqlite import SQLiteDatabase
+from airy.services.reactionrole import ReactionRolesServiceT
+from airy.services.reactionrole.mutations import RoleMutationBuffer
+
+GUILD_ID = hikari.Snowflake(1_000_000 << 22)
+UNAVAILABLE_GUILD_ID = hikari.Snowflake(1_000_001 << 22)
+USER_ID = hikari.Snowflake(10)
+ROLE_A, ROLE_B, ROLE_C = hikari.Snowflake(101), hikari.Snowflake(102), hikari.Snowflake(103)
+
+
+def make_member(*role_ids: hikari.Snowflake) -> types.SimpleNamespace:
+    return types.SimpleNamespace(guild_id=GUILD_ID, id=USER_ID, role_ids=[GUILD_ID, *role_ids])
+
+
+class FakeRest:
+    """Records `edit_member` calls, which wait for `release` while it is cleared."""
+
+    def __init__(self) -> None:
+        self.edits: list[set[hikari.Snowflake]] = []
+        self.release: asyncio.Event = asyncio.Event()
+        self.release.set()
+
+    async def edit_member(self, guild, user, *, roles, reason) -> None:
+        await self.release.wait()
+        self.edits.append(set(roles))
+
+
+class FakeCache:
+    def __init__(self, member: types.SimpleNamespace) -> None:
+        self.member = member
+
+    def get_member(self, guild, user) -> types.SimpleNamespace | None:
+        return self.member
+
+
+@pytest.fixture()
+def member() -> types.SimpleNamespace:
+    return make_member(ROLE_C)
+
+
+@pytest.fixture()
+def app(member: types.SimpleNamespace) -> types.SimpleNamespace:
+    return types.SimpleNamespace(cache=FakeCache(member), rest=FakeRest())
+
+
+@pytest.fixture()
+def buffer(app: types.SimpleNamespace) -> RoleMutationBuffer:
+    buffer = RoleMutationBuffer(delay=0.01, confirm_timeout=0.2)
+    buffer.start(app)  # type: ignore
+    yield buffer
+    buffer.stop()
+
+
+async def wait_for_tasks(buffer: RoleMutationBuffer) -> None:
+    while buffer._tasks:
+        await asyncio.gather(*buffer._tasks.values())
+
+
+async def test_mutations_are_coalesced(app, buffer: RoleMutationBuffer):
+    buffer.put(GUILD_ID, USER_ID, ROLE_A, True)
+    buffer.put(GUILD_ID, USER_ID, ROLE_B, True)
+    buffer.put(GUILD_ID, USER_ID, ROLE_A, False)
+    await wait_for_tasks(buffer)
+
+    assert app.rest.edits == [{ROLE_B, ROLE_C}]
+
+
+async def test_cancelling_mutations_send_nothing(app, buffer: RoleMutationBuffer):
+    buffer.put(GUILD_ID, USER_ID, ROLE_A, True)
+    buffer.put(GUILD_ID, USER_ID, ROLE_A, False)
+    await wait_for_tasks(buffer)
+
+    assert app.rest.edits == []
+
+
+async def test_role_ids_include_in_flight_mutations(app, member, buffer: RoleMutationBuffer):
+    app.rest.release.clear()
+    buffer.put(GUILD_ID, USER_ID, ROLE_A, True)
+    buffer.put(GUILD_ID, USER_ID, ROLE_C, False)
+    await asyncio.sleep(0.05)
+
+    assert not buffer._pending  # The edit is in flight
+    assert buffer.role_ids(member) == {GUILD_ID, ROLE_A}
+
+    app.rest.release.set()
+    await wait_for_tasks(buffer)
+    assert app.rest.edits == [{ROLE_A}]
+
+
+async def test_sent_mutations_survive_stale_cache(app, member, buffer: RoleMutationBuffer):
+    buffer.put(GUILD_ID, USER_ID, ROLE_A, True)
+    await asyncio.sleep(0.05)
+    assert app.rest.edits == [{ROLE_A, ROLE_C}]
+
+    # Someone else removes ROLE_C, the gateway has not reported ROLE_A yet
+    app.cache.member = make_member()
+    buffer.put(GUILD_ID, USER_ID, ROLE_B, True)
+    await wait_for_tasks(buffer)
+
+    assert app.rest.edits[-1] == {ROLE_A, ROLE_B}
+
+
+async def test_confirmed_mutations_are_forgotten(app, member, buffer: RoleMutationBuffer):
+    buffer.put(GUILD_ID, USER_ID, ROLE_A, True)
+    await asyncio.sleep(0.05)
+    assert buffer._applied
+
+    app.cache.member = make_member(ROLE_A, ROLE_C)
+    await asyncio.sleep(0.05)
+
+    assert not buffer._tasks and not buffer._applied
+
+
+class FakeSweepBot:
+    """Caches the text channels and active threads of `channels`, the channels missing from it are deleted."""
+
+    def __init__(self, channels: dict[int, str]) -> None:
+        self.channels = channels
+        self.fetched: list[int] = []
+        self.cache = types.SimpleNamespace(
+            get_guilds_view=lambda: {GUILD_ID: None, UNAVAILABLE_GUILD_ID: None},
+            get_unavailable_guilds_view=lambda: {UNAVAILABLE_GUILD_ID: None},
+            get_guild_channel=lambda channel: object() if channels.get(channel) == "text" else None,
+            get_thread=lambda channel: object() if channels.get(channel) == "thread" else None,
+        )
+        self.rest = types.SimpleNamespace(fetch_channel=self.fetch_channel)
+
+    async def fetch_channel(self, channel: int) -> object:
+        self.fetched.append(channel)
+        if channel not in self.channels:
+            raise hikari.NotFoundError(url="", headers={}, raw_body=b"")
+        return object()
+
+
+async def test_sweep_orphans_keeps_threads(db: SQLiteDatabase, monkeypatch: pytest.MonkeyPatch):
+    text, thread, archived_thread, deleted, unavailable = 1, 2, 3, 4, 5
+    bot = FakeSweepBot({text: "text", thread: "thread", archived_thread: "archived"})
+    monkeypatch.setattr(ReactionRolesServiceT, "bot", bot)
+
+    for guild_id in (GUILD_ID, UNAVAILABLE_GUILD_ID):
+        await db.execute("INSERT INTO guild (guild_id) VALUES ($1)", guild_id)
+    for channel_id in (text, thread, archived_thread, deleted):
+        await db.execute("INSERT INTO reactionrole (guild_id, channel_id, message_id) VALUES ($1, $2, $3)",
+                         GUILD_ID, channel_id, channel_id * 10)
+    await db.execute("INSERT INTO reactionrole (guild_id, channel_id, message_id) VALUES ($1, $2, $3)",
+                     UNAVAILABLE_GUILD_ID, unavailable, unavailable * 10)
+
+    assert await ReactionRolesServiceT.sweep_orphans() == 1
+
+    remaining = await db.fetch("SELECT channel_id FROM reactionrole ORDER BY channel_id")
+    assert [record["channel_id"] for record in remaining] == [text, thread, archived_thread, unavailable]
+    assert sorted(bot.fetched) == [archived_thread, deleted]
+
+
+async def test_reaction_in_thread(db: SQLiteDatabase, member, monkeypatch: pytest.MonkeyPatch):
+    thread, message = hikari.Snowflake(7), hikari.Snowflake(70)
+    member.role_ids.append(ROLE_A)
+    # Threads are not guild channels of the cache, the guild has to come from the event
+    bot = types.SimpleNamespace(
+        user_id=hikari.Snowflake(1),
+        cache=types.SimpleNamespace(get_guild_channel=lambda channel: None, get_member=lambda guild, user: member),
+    )
+    mutations = types.SimpleNamespace(puts=[], role_ids=lambda member: set(member.role_ids))
+    mutations.put = lambda *args: mutations.puts.append(args)
+    monkeypatch.setattr(ReactionRolesServiceT, "bot", bot)
+    monkeypatch.setattr(ReactionRolesServiceT, "mutations", mutations)
+    monkeypatch.setattr("lightbulb.utils.permissions_for", lambda member: hikari.Permissions.MANAGE_ROLES)
+
+    await db.execute("INSERT INTO guild (guild_id) VALUES ($1)", GUILD_ID)
+    reaction_role_id = await db.fetchval(
+        "INSERT INTO reactionrole (guild_id, channel_id, message_id) VALUES ($1, $2, $3) RETURNING id",
+        GUILD_ID, thread, message,
+    )
+    await db.execute("INSERT INTO reactionrole_entry (id, role_id, emoji) VALUES ($1, $2, $3)",
+                     reaction_role_id, ROLE_A, "👍")
+
+    event = hikari.GuildReactionDeleteEvent(
+        app=None, shard=None, user_id=USER_ID, guild_id=GUILD_ID, channel_id=thread, message_id=message,
+        emoji_name="👍", emoji_id=None,
+    )
+    await ReactionRolesServiceT._process(event, added=False)
+
+    assert mutations.puts == [(GUILD_ID, USER_ID, ROLE_A, False)]
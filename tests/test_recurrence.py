@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import datetime
+import zoneinfo
+
+import pytest
+
+from airy.services.scheduler.recurrence import Recurrence
+
+UTC = datetime.timezone.utc
+BERLIN = zoneinfo.ZoneInfo("Europe/Berlin")
+
+
+def at(*args: int, tz: datetime.tzinfo = UTC) -> datetime.datetime:
+    return datetime.datetime(*args, tzinfo=tz)
+
+
+@pytest.mark.parametrize("rule", ["* * *", "60 * * * *", "* 24 * * *", "*/0 * * * *", "5-1 * * * *", "@every 0.5"])
+def test_invalid_rules(rule: str):
+    with pytest.raises(ValueError):
+        Recurrence(rule)
+
+
+def test_every_skips_missed_occurrences():
+    rule = Recurrence.every(datetime.timedelta(minutes=10))
+    expires = at(2026, 1, 1, 12, 0)
+
+    assert str(rule) == "@every 600"
+    assert rule.next_after(expires, expires) == at(2026, 1, 1, 12, 10)
+    # Offline for 35 minutes, the three missed occurrences are not fired one after another
+    assert rule.next_after(expires, at(2026, 1, 1, 12, 35)) == at(2026, 1, 1, 12, 40)
+
+
+def test_every_keeps_its_interval_across_dst():
+    rule = Recurrence("@every 3600")
+    # Clocks in Berlin jump from 02:00 to 03:00 on this night
+    expires = at(2026, 3, 29, 1, 30, tz=BERLIN)
+
+    # 00:30 UTC, an hour later it is 03:30 in Berlin
+    assert rule.next_after(expires, expires) == at(2026, 3, 29, 1, 30)
+
+
+@pytest.mark.parametrize(
+    ("rule", "now", "expected"),
+    [
+        ("30 9 * * *", at(2026, 1, 1, 9, 30), at(2026, 1, 2, 9, 30)),
+        ("*/15 * * * *", at(2026, 1, 1, 9, 31, 20), at(2026, 1, 1, 9, 45)),
+        ("0 0 1 */3 *", at(2026, 2, 10), at(2026, 4, 1)),
+        ("0 12 * * 1-5", at(2026, 1, 2, 13), at(2026, 1, 5, 12)),  # Friday afternoon to Monday
+        ("0 0 * * 7", at(2026, 1, 1), at(2026, 1, 4)),  # 7 is Sunday, like 0
+        ("0 0 13 * 5", at(2026, 1, 1), at(2026, 1, 2)),  # Day of month or day of week, like cron
+        ("0 0 29 2 *", at(2026, 3, 1), at(2028, 2, 29)),
+    ],
+)
+def test_cron(rule: str, now: datetime.datetime, expected: datetime.datetime):
+    assert Recurrence.parse(rule).next_after(now, now) == expected
+
+
+def test_cron_is_evaluated_in_utc_across_dst():
+    rule = Recurrence("0 9 * * *")
+    before = rule.next_after(at(2026, 3, 28, 12, tz=BERLIN), at(2026, 3, 28, 12, tz=BERLIN))
+    after = rule.next_after(before, before)
+
+    assert (before, after) == (at(2026, 3, 29, 9), at(2026, 3, 30, 9))
+    assert after - before == datetime.timedelta(days=1)
+
+
+def test_cron_that_never_matches():
+    with pytest.raises(ValueError):
+        Recurrence("0 0 30 2 *").next_after(at(2026, 1, 1), at(2026, 1, 1))
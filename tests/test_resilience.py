@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from airy.models.db.impl.resilience import BreakerState, CircuitBreaker, RetryPolicy, is_transient
+from airy.models.errors import DatabaseUnavailableError
+
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60.0)
+
+    for _ in range(2):
+        breaker.record_failure(OSError("connection refused"))
+        breaker.before_call()
+    breaker.record_failure(OSError("connection refused"))
+
+    assert breaker.state is BreakerState.OPEN
+    with pytest.raises(DatabaseUnavailableError):
+        breaker.before_call()
+
+
+def test_success_resets_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2)
+
+    breaker.record_failure(OSError())
+    breaker.record_success()
+    breaker.record_failure(OSError())
+
+    assert breaker.state is BreakerState.CLOSED
+
+
+def test_half_open_breaker_lets_one_trial_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure(OSError())
+
+    assert breaker.state is BreakerState.HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(DatabaseUnavailableError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state is BreakerState.CLOSED
+    breaker.before_call()
+
+
+def test_failed_trial_reopens_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60.0)
+    breaker.record_failure(OSError())
+    breaker.reset_timeout = 0.0
+    breaker.before_call()
+
+    breaker.reset_timeout = 60.0
+    breaker.record_failure(OSError())
+
+    assert breaker.state is BreakerState.OPEN
+
+
+def test_released_trial_lets_the_next_one_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure(OSError())
+    breaker.before_call()
+
+    breaker.release_trial()
+
+    breaker.before_call()
+
+
+@pytest.mark.parametrize("attempt", range(8))
+def test_retry_delay_is_bounded(attempt: int):
+    policy = RetryPolicy(base_delay=0.1, max_delay=2.0)
+
+    for _ in range(100):
+        assert 0 <= policy.delay(attempt) <= min(2.0, 0.1 * 2**attempt)
+
+
+def test_timeouts_are_not_transient():
+    assert is_transient(ConnectionResetError())
+    assert not is_transient(asyncio.TimeoutError())
+    assert not is_transient(ValueError())
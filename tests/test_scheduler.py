@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+
+import pytest
+
+from airy.models.db.impl.sqlite import SQLiteDatabase
+from airy.services.scheduler import SchedulerServiceT
+from airy.services.scheduler.dispatcher import TimerDispatcher
+from airy.services.scheduler.events import ReminderEvent
+from airy.services.scheduler.models import DatabaseTimer, TimerEnum
+from airy.utils.time import utcnow
+
+GUILD_ID = 1_000_000 << 22
+
+
+class FakeApp:
+    """The parts of `Airy` the scheduler uses, recording dispatched events."""
+
+    def __init__(self, db: SQLiteDatabase) -> None:
+        self.db = db
+        self.dispatched: list[ReminderEvent] = []
+
+    async def dispatch(self, event: ReminderEvent) -> None:
+        self.dispatched.append(event)
+
+
+@pytest.fixture()
+async def app(db: SQLiteDatabase, tortoise: None) -> FakeApp:
+    return FakeApp(db)
+
+
+@pytest.fixture()
+async def scheduler(app: FakeApp) -> SchedulerServiceT:
+    scheduler = SchedulerServiceT(dispatcher=TimerDispatcher())
+    scheduler.app = app  # type: ignore
+    scheduler._dispatcher.start(app)  # type: ignore
+    yield scheduler
+    scheduler._dispatcher.stop()
+
+
+async def insert_timer(db: SQLiteDatabase, expires: datetime.datetime, **columns) -> DatabaseTimer:
+    columns = {"guild_id": GUILD_ID, "user_id": 1, "event": int(TimerEnum.REMINDER), "extra": {}, **columns}
+    names = ", ".join(["expires", *columns])
+    values = ", ".join(f"${index}" for index in range(1, len(columns) + 2))
+    record = await db.fetchrow(f"INSERT INTO timer ({names}) VALUES ({values}) RETURNING *", expires, *columns.values())
+    return DatabaseTimer._init_from_db(**dict(record))
+
+
+async def wait_for_dispatch(app: FakeApp, count: int) -> None:
+    for _ in range(100):
+        if len(app.dispatched) >= count:
+            return
+        await asyncio.sleep(0.01)
+
+
+async def test_due_timer_reaches_dispatcher(db: SQLiteDatabase, app: FakeApp, scheduler: SchedulerServiceT):
+    timer = await insert_timer(db, utcnow() - datetime.timedelta(seconds=1))
+
+    await scheduler._call_timers([timer])
+    await wait_for_dispatch(app, 1)
+
+    assert [event.timer.id for event in app.dispatched] == [timer.id]
+    assert scheduler.metrics.dispatched == 1
+    assert await db.fetchval("SELECT count(*) FROM timer") == 0
+
+
+async def test_claim_skips_postponed_timer(db: SQLiteDatabase, app: FakeApp, scheduler: SchedulerServiceT):
+    timer = await insert_timer(db, utcnow() + datetime.timedelta(hours=1))
+
+    await scheduler._call_timers([timer])
+    await asyncio.sleep(0.05)
+
+    assert app.dispatched == []
+    assert await db.fetchval("SELECT count(*) FROM timer") == 1
+
+
+async def test_recurring_timer_is_advanced(db: SQLiteDatabase, app: FakeApp, scheduler: SchedulerServiceT):
+    now = utcnow()
+    timer = await insert_timer(db, now - datetime.timedelta(seconds=1), recurrence="@every 60")
+    scheduler._queue.load([], now + datetime.timedelta(hours=1))
+
+    await scheduler._call_timers([timer])
+    await wait_for_dispatch(app, 1)
+
+    assert [event.timer.id for event in app.dispatched] == [timer.id]
+    assert scheduler.metrics.reschedules == 1
+
+    expires = await db.fetchval("SELECT expires FROM timer WHERE id = $1", timer.id)
+    assert now < expires <= now + datetime.timedelta(seconds=60)
+    assert scheduler._queue.get(timer.id).expires == expires
+
+
+async def test_lease_refill_claims_local_timers(db: SQLiteDatabase, app: FakeApp):
+    scheduler = SchedulerServiceT(lease=True, lease_owner="node-a")
+    scheduler.app = app  # type: ignore
+    scheduler._shard_count, scheduler._shard_ids = 2, [0]
+    now = utcnow()
+
+    local = await insert_timer(db, now + datetime.timedelta(minutes=1))
+    remote = await insert_timer(db, now + datetime.timedelta(minutes=1), guild_id=(1_000_001 << 22))
+    taken = await insert_timer(
+        db, now + datetime.timedelta(minutes=2), lease_owner="node-b", lease_expires=now + datetime.timedelta(minutes=5)
+    )
+    expired = await insert_timer(
+        db, now + datetime.timedelta(minutes=3), lease_owner="node-b", lease_expires=now - datetime.timedelta(minutes=1)
+    )
+
+    await scheduler._refill()
+
+    assert [scheduler._queue.pop().id for _ in range(len(scheduler._queue))] == [local.id, expired.id]
+    owners = {record["id"]: record["lease_owner"] for record in await db.fetch("SELECT id, lease_owner FROM timer")}
+    assert owners == {local.id: "node-a", remote.id: None, taken.id: "node-b", expired.id: "node-a"}
+
+    scheduler._is_started = True
+    await scheduler._renew_leases()
+    assert not scheduler._needs_refill
+
+    await db.execute("UPDATE timer SET lease_expires = $1 WHERE id = $2", now - datetime.timedelta(seconds=1), taken.id)
+    await scheduler._renew_leases()
+    assert scheduler._needs_refill
+
+
+async def test_close_restores_undelivered_timers(db: SQLiteDatabase, app: FakeApp):
+    scheduler = SchedulerServiceT(dispatcher=TimerDispatcher(guild_rate=0.001, guild_burst=1))
+    scheduler.app = app  # type: ignore
+    scheduler._dispatcher.start(app)  # type: ignore
+    scheduler._is_started = True
+    now = utcnow()
+    due = now - datetime.timedelta(seconds=1)
+    timers = [
+        await insert_timer(db, due),
+        await insert_timer(db, due),
+        await insert_timer(db, due, recurrence="@every 60"),
+    ]
+
+    await scheduler._call_timers(timers)
+    await wait_for_dispatch(app, 1)
+    await scheduler.close(timeout=0.05)
+
+    # The guild may only dispatch one event, the others are written back as they were due
+    assert len(app.dispatched) == 1
+    rows = {record["id"]: record["expires"] for record in await db.fetch("SELECT id, expires FROM timer")}
+    assert rows == {timer.id: due for timer in timers if timer.id != app.dispatched[0].timer.id}
+
+    await scheduler.close(timeout=1.0)
+    assert await db.fetchval("SELECT count(*) FROM timer WHERE lease_owner = $1", "node-a") == 0
+
+
+async def test_lease_heartbeat_retries(db: SQLiteDatabase, app: FakeApp, monkeypatch: pytest.MonkeyPatch):
+    scheduler = SchedulerServiceT(lease=True, lease_owner="node-a", lease_ttl=datetime.timedelta(seconds=0.3))
+    scheduler.app = app  # type: ignore
+    scheduler._is_started = True
+    scheduler._needs_refill = False
+    timer = await insert_timer(db, utcnow() + datetime.timedelta(minutes=1), lease_owner="node-a")
+
+    execute = db.execute
+    failures = [OSError("connection lost")] * 2
+
+    async def flaky_execute(query: str, *args, **kwargs) -> str:
+        if failures:
+            raise failures.pop()
+        return await execute(query, *args, **kwargs)
+
+    monkeypatch.setattr(db, "execute", flaky_execute)
+    await scheduler._renew_leases()
+
+    assert not failures
+    assert scheduler._needs_refill
+    assert await db.fetchval("SELECT lease_expires FROM timer WHERE id = $1", timer.id) > utcnow()
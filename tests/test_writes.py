@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+
+import pytest
+
+from airy.services.scheduler.models import DatabaseTimer, TimerEnum
+from airy.services.scheduler.writes import TimerWriteBuffer
+from airy.utils.time import utcnow
+
+
+class FakeClient:
+    """Records the timer ids and expiries of every batch written, failing while `failures` is not empty."""
+
+    def __init__(self) -> None:
+        self.batches: list[dict[int, datetime.datetime]] = []
+        self.failures: list[BaseException] = []
+
+    async def execute_query(self, query: str, values: list[list]) -> None:
+        if self.failures:
+            raise self.failures.pop()
+        self.batches.append(dict(zip(values[0], values[4])))
+
+
+@pytest.fixture()
+def client(tortoise: None, monkeypatch: pytest.MonkeyPatch) -> FakeClient:
+    client = FakeClient()
+    monkeypatch.setattr(DatabaseTimer._meta.db, "execute_query", client.execute_query)
+    return client
+
+
+def make_timer(timer_id: int, expires_in: float) -> DatabaseTimer:
+    return DatabaseTimer(
+        id=timer_id,
+        guild_id=1,
+        user_id=1,
+        expires=utcnow() + datetime.timedelta(seconds=expires_in),
+        event=TimerEnum.REMINDER,
+        extra={},
+    )
+
+
+async def test_updates_are_coalesced(client: FakeClient):
+    buffer = TimerWriteBuffer(delay=0.05, margin=1.0)
+    first, second = make_timer(1, 60), make_timer(2, 60)
+    latest = make_timer(1, 120)
+
+    await buffer.put(first)
+    await buffer.put(second)
+    await buffer.put(latest)
+    assert buffer.get(1) is latest and client.batches == []
+
+    await asyncio.sleep(0.1)
+    assert client.batches == [{1: latest.expires, 2: second.expires}]
+    assert len(buffer) == 0
+
+
+async def test_update_close_to_expiry_is_written_at_once(client: FakeClient):
+    buffer = TimerWriteBuffer(delay=10.0, margin=5.0)
+    timer = make_timer(1, 3)
+
+    await buffer.put(timer)
+
+    assert client.batches == [{1: timer.expires}]
+
+
+async def test_discarded_update_is_not_written(client: FakeClient):
+    buffer = TimerWriteBuffer(delay=0.01)
+
+    await buffer.put(make_timer(1, 60))
+    buffer.discard(1)
+    await buffer.flush()
+
+    assert client.batches == []
+
+
+async def test_failed_write_keeps_newer_updates(client: FakeClient):
+    buffer = TimerWriteBuffer(delay=0.05)
+    client.failures.append(OSError("connection lost"))
+    stale = make_timer(1, 60)
+    await buffer.put(stale)
+
+    with pytest.raises(OSError):
+        await buffer.flush()
+
+    # Superseded while the write was failing, the retry must not bring the stale state back
+    newer = make_timer(1, 90)
+    await buffer.put(newer)
+    await asyncio.sleep(0.1)
+
+    assert client.batches == [{1: newer.expires}]